@@ -80,24 +80,52 @@ from ray._raylet import (
 
 _config = _Config()
 
-from ray.profiling import profile  # noqa: E402
-from ray.state import (jobs, nodes, actors, objects, timeline,
-                       object_transfer_timeline, cluster_resources,
-                       available_resources)  # noqa: E402
-from ray.worker import (  # noqa: F401
-    LOCAL_MODE, SCRIPT_MODE, WORKER_MODE, RESTORE_WORKER_MODE,
-    SPILL_WORKER_MODE, cancel, connect, disconnect, get, get_actor,
-    get_gpu_ids, get_resource_ids, get_dashboard_url, init, is_initialized,
-    put, kill, remote, shutdown, show_in_dashboard, wait,
-)  # noqa: E402
-import ray.internal  # noqa: E402
-# We import ray.actor because some code is run in actor.py which initializes
-# some functions in the worker.
-import ray.actor  # noqa: F401
-from ray.actor import method  # noqa: E402
-from ray.cross_language import java_function, java_actor_class  # noqa: E402
-from ray.runtime_context import get_runtime_context  # noqa: E402
-from ray import util  # noqa: E402
+from ray._private.lazy_import import lazy_attributes  # noqa: E402
+
+# The public API is imported on first use, so that `import ray` doesn't
+# import the worker, redis, the state API and ray.util, e.g. in short-lived
+# CLI commands.
+lazy_attributes(
+    __name__, {
+        "LOCAL_MODE": "ray.worker:LOCAL_MODE",
+        "SCRIPT_MODE": "ray.worker:SCRIPT_MODE",
+        "WORKER_MODE": "ray.worker:WORKER_MODE",
+        "RESTORE_WORKER_MODE": "ray.worker:RESTORE_WORKER_MODE",
+        "SPILL_WORKER_MODE": "ray.worker:SPILL_WORKER_MODE",
+        "cancel": "ray.worker:cancel",
+        "connect": "ray.worker:connect",
+        "disconnect": "ray.worker:disconnect",
+        "get": "ray.worker:get",
+        "get_actor": "ray.worker:get_actor",
+        "get_gpu_ids": "ray.worker:get_gpu_ids",
+        "get_resource_ids": "ray.worker:get_resource_ids",
+        "get_dashboard_url": "ray.worker:get_dashboard_url",
+        "init": "ray.worker:init",
+        "is_initialized": "ray.worker:is_initialized",
+        "put": "ray.worker:put",
+        "put_many": "ray.worker:put_many",
+        "kill": "ray.worker:kill",
+        "remote": "ray.worker:remote",
+        "shutdown": "ray.worker:shutdown",
+        "show_in_dashboard": "ray.worker:show_in_dashboard",
+        "wait": "ray.worker:wait",
+        "jobs": "ray.state:jobs",
+        "nodes": "ray.state:nodes",
+        "actors": "ray.state:actors",
+        "objects": "ray.state:objects",
+        "timeline": "ray.state:timeline",
+        "object_transfer_timeline": "ray.state:object_transfer_timeline",
+        "cluster_resources": "ray.state:cluster_resources",
+        "available_resources": "ray.state:available_resources",
+        "profile": "ray.profiling:profile",
+        "actor": "ray.actor",
+        "method": "ray.actor:method",
+        "internal": "ray.internal",
+        "java_function": "ray.cross_language:java_function",
+        "java_actor_class": "ray.cross_language:java_actor_class",
+        "get_runtime_context": "ray.runtime_context:get_runtime_context",
+        "util": "ray.util",
+    })
 
 # Replaced with the current commit when building the wheels.
 __commit__ = "{{RAY_COMMIT_SHA}}"
@@ -134,6 +162,7 @@ __all__ = [
     "object_transfer_timeline",
     "profile",
     "put",
+    "put_many",
     "remote",
     "shutdown",
     "show_in_dashboard",
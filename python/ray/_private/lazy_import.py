@@ -0,0 +1,52 @@
+import importlib
+import importlib.util
+import sys
+import types
+
+
+def lazy_attributes(module_name, attributes):
+    """Import the attributes of a module on first access.
+
+    Submodules of the module that aren't listed are also imported on first
+    access, so that code that only imports the package keeps finding the
+    submodules that eager imports used to load.
+
+    Args:
+        module_name (str): The name of the module, usually __name__.
+        attributes (dict): Map from attribute name to "module:attribute", or
+            to "module" if the attribute is a module.
+    """
+    module = sys.modules[module_name]
+
+    def __getattr__(name):
+        if name in attributes:
+            source_name, _, source_attribute = attributes[name].partition(":")
+            value = importlib.import_module(source_name)
+            if source_attribute:
+                value = getattr(value, source_attribute)
+        elif not name.startswith("__") and importlib.util.find_spec(
+                f"{module_name}.{name}") is not None:
+            value = importlib.import_module(f"{module_name}.{name}")
+        else:
+            raise AttributeError(
+                f"module '{module_name}' has no attribute '{name}'")
+        # Further accesses don't go through __getattr__.
+        setattr(module, name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(module.__dict__) | set(attributes))
+
+    if sys.version_info >= (3, 7):
+        module.__getattr__ = __getattr__
+        module.__dir__ = __dir__
+    else:
+        # Module __getattr__ (PEP 562) is only supported from Python 3.7.
+        class LazyModule(types.ModuleType):
+            def __getattr__(self, name):
+                return __getattr__(name)
+
+            def __dir__(self):
+                return __dir__()
+
+        module.__class__ = LazyModule
@@ -1257,7 +1257,8 @@ def start_raylet(redis_address,
                  socket_to_use=None,
                  head_node=False,
                  start_initial_python_workers_for_first_job=False,
-                 code_search_path=None):
+                 code_search_path=None,
+                 worker_preload_modules=None):
     """Start a raylet, which is a combined local scheduler and object manager.
 
     Args:
@@ -1297,6 +1298,8 @@ def start_raylet(redis_address,
         code_search_path (list): Code search path for worker. code_search_path
             is added to worker command in non-multi-tenancy mode and job_config
             in multi-tenancy mode.
+        worker_preload_modules (list): Modules imported by the Python workers
+            before they register with the raylet.
     Returns:
         ProcessInfo for the process that was started.
     """
@@ -1375,6 +1378,9 @@ def start_raylet(redis_address,
     ]
     if code_search_path:
         start_worker_command.append(f"--code-search-path={code_search_path}")
+    if worker_preload_modules:
+        start_worker_command.append(
+            f"--preload-modules={','.join(worker_preload_modules)}")
     if redis_password:
         start_worker_command += [f"--redis-password={redis_password}"]
 
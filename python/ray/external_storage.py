@@ -1,15 +1,206 @@
 import abc
+import contextlib
+import io
+import json
+import logging
 import os
+import shutil
+import threading
+import time
 import urllib
-from collections import namedtuple
-from typing import List, IO, Tuple
+import zlib
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, IO, Optional, Tuple
 
 import ray
 from ray.ray_constants import DEFAULT_OBJECT_PREFIX
 from ray._raylet import ObjectRef
 
+try:
+    import fcntl
+except ImportError:
+    # Windows, where IO workers don't lock the spill file index.
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
 ParsedURL = namedtuple("ParsedURL", "base_url, offset, size")
 
+# Each spilled object is stored in the fused file as
+#   metadata_len (8 bytes) | buf_len (8 bytes) | metadata | buf
+# The top byte of metadata_len holds the ID of the codec used to compress
+# buf, 0 meaning uncompressed. Compressed objects have an additional 8 bytes
+# with the uncompressed length after buf_len (which is then the compressed
+# length). Files spilled without compression are therefore unchanged.
+_CODEC_ID_SHIFT = 56
+_METADATA_LEN_MASK = (1 << _CODEC_ID_SHIFT) - 1
+
+# Objects smaller than this are never compressed by default.
+DEFAULT_COMPRESSION_MIN_SIZE = 64 * 1024
+# Size of the prefix of an object compressed to estimate its compressibility.
+_COMPRESSION_PROBE_SIZE = 64 * 1024
+# Objects are stored uncompressed unless the probe compresses below this
+# fraction of its size.
+_COMPRESSION_MAX_RATIO = 0.9
+
+# FileSystemStorage keeps the offsets of the deleted objects of a fused file
+# in a file with this suffix. Once the file is compacted, its live objects
+# are moved to the file with the compacted suffix, and their new offsets are
+# stored in the file with the forward suffix.
+_DELETED_SUFFIX = ".deleted"
+_COMPACTED_SUFFIX = ".compacted"
+_FORWARD_SUFFIX = ".forward"
+# Fused files are compacted when the fraction of their objects that are
+# still alive drops below this.
+DEFAULT_COMPACTION_THRESHOLD = 0.25
+# Size of the chunks objects are copied in when compacting a fused file.
+_COMPACTION_CHUNK_SIZE = 4 * 1024 * 1024
+
+Codec = namedtuple("Codec", "codec_id, compress, decompress")
+
+
+def _get_available_codecs() -> Dict[str, Codec]:
+    """Codecs that can be used to compress spilled objects.
+
+    zlib is always available, lz4 and zstd if the lz4 and zstandard packages
+    are installed.
+    """
+    codecs = {
+        "zlib": Codec(1, lambda data: zlib.compress(data, 1), zlib.decompress),
+    }
+    try:
+        import lz4.frame
+        codecs["lz4"] = Codec(2, lz4.frame.compress, lz4.frame.decompress)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        codecs["zstd"] = Codec(
+            3,
+            lambda data: zstandard.ZstdCompressor(level=1).compress(data),
+            lambda data: zstandard.ZstdDecompressor().decompress(data))
+    except ImportError:
+        pass
+    return codecs
+
+
+def _get_codec(name: str) -> Codec:
+    """Return the codec with the given name.
+
+    "auto" chooses the fastest available codec.
+    """
+    codecs = _get_available_codecs()
+    if name == "auto":
+        for candidate in ["lz4", "zstd", "zlib"]:
+            if candidate in codecs:
+                return codecs[candidate]
+    if name not in codecs:
+        raise ValueError(f"Unknown or unavailable compression codec {name}, "
+                         f"available codecs are {list(codecs.keys())}.")
+    return codecs[name]
+
+
+def _get_decompress_fn(codec_id: int) -> Callable[[bytes], bytes]:
+    for codec in _get_available_codecs().values():
+        if codec.codec_id == codec_id:
+            return codec.decompress
+    raise ValueError(f"The spilled object was compressed with codec ID "
+                     f"{codec_id}, which is not available.")
+
+
+def _read_exactly(f: IO, num_bytes: int) -> bytes:
+    data = f.read(num_bytes)
+    # Unbuffered files may return less than requested.
+    while len(data) < num_bytes:
+        chunk = f.read(num_bytes - len(data))
+        if not chunk:
+            raise ValueError("Unexpected end of the spilled object file.")
+        data += chunk
+    return data
+
+
+def _read_object_size(f: IO) -> int:
+    """Read the header of a spilled object, return the object's size."""
+    header = _read_exactly(f, 16)
+    metadata_len = int.from_bytes(header[:8], byteorder="little")
+    codec_id = metadata_len >> _CODEC_ID_SHIFT
+    buf_len = int.from_bytes(header[8:], byteorder="little")
+    header_size = 16 if codec_id == 0 else 24
+    return header_size + (metadata_len & _METADATA_LEN_MASK) + buf_len
+
+
+def _num_fused_objects(path: str) -> Optional[int]:
+    """Number of objects in a file written by FileSystemStorage.
+
+    Returns None if the file name doesn't have the expected format.
+    """
+    try:
+        return int(path.rsplit("-multi-", 1)[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def _remove_if_exists(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _scan_files(directory_path: str) -> List[Tuple[os.DirEntry, int, float]]:
+    """List the files of a directory with their size and mtime.
+
+    Files removed while scanning are skipped.
+    """
+    files = []
+    for entry in os.scandir(directory_path):
+        try:
+            if entry.is_file():
+                stat = entry.stat()
+                files.append((entry, stat.st_size, stat.st_mtime))
+        except FileNotFoundError:
+            pass
+    return files
+
+
+# Count of spilled/restored bytes and gauge of the bandwidth of the last
+# spill/restore, created on first use.
+_io_metrics = None
+
+
+def _record_io(operation: str, num_bytes: int, duration_s: float) -> None:
+    """Record the bytes moved by a spill, restore or migration.
+
+    Args:
+        operation(str): "spill", "restore" or "migrate".
+        num_bytes(int): Number of bytes written or read.
+        duration_s(float): Time the operation took.
+    """
+    global _io_metrics
+    if _io_metrics is None:
+        from ray.util import metrics
+        _io_metrics = (
+            metrics.Count(
+                "object_spilling_bytes",
+                description=("Number of bytes spilled, restored or "
+                             "migrated between tiers."),
+                tag_keys=("operation", )),
+            metrics.Gauge(
+                "object_spilling_bandwidth_mb_per_s",
+                description=("Bandwidth of the last spill, restore or "
+                             "migration."),
+                tag_keys=("operation", )),
+        )
+    bytes_count, bandwidth_gauge = _io_metrics
+    tags = {"operation": operation}
+    bytes_count.record(num_bytes, tags=tags)
+    if duration_s > 0:
+        bandwidth_mb_per_s = num_bytes / duration_s / 1e6
+        bandwidth_gauge.record(bandwidth_mb_per_s, tags=tags)
+        logger.debug(f"Object spilling: {operation} of {num_bytes} bytes "
+                     f"at {bandwidth_mb_per_s:.2f} MB/s.")
+
 
 def create_url_with_offset(*, url: str, offset: int, size: int) -> str:
     """Methods to create a URL with offset.
@@ -77,6 +268,42 @@ class ExternalStorage(metaclass=abc.ABCMeta):
             the external storage is invalid.
     """
 
+    # Codec used to compress spilled objects, None to disable compression.
+    # Set by _setup_compression.
+    _codec: Optional[Codec] = None
+    _compression_min_size: int = DEFAULT_COMPRESSION_MIN_SIZE
+
+    def _setup_compression(self, compression: Optional[str],
+                           compression_min_size: int) -> None:
+        """Validate and set the compression options.
+
+        Args:
+            compression(str): Name of the codec ("zlib", "lz4", "zstd" or
+                "auto") used to compress spilled objects, None to disable
+                compression.
+            compression_min_size(int): Objects smaller than this are not
+                compressed.
+        """
+        self._codec = None if compression is None else _get_codec(compression)
+        self._compression_min_size = compression_min_size
+
+    def _maybe_compress(self, buf: memoryview) -> Optional[bytes]:
+        """Compress buf if it's large and compressible enough.
+
+        The compressibility is estimated by compressing a prefix of buf.
+        Returns None if buf should be stored uncompressed.
+        """
+        if self._codec is None or len(buf) < self._compression_min_size:
+            return None
+        probe = buf[:_COMPRESSION_PROBE_SIZE]
+        max_probe_size = _COMPRESSION_MAX_RATIO * len(probe)
+        if len(self._codec.compress(probe)) > max_probe_size:
+            return None
+        compressed = self._codec.compress(buf)
+        if len(compressed) > _COMPRESSION_MAX_RATIO * len(buf):
+            return None
+        return compressed
+
     def _get_objects_from_store(self, object_refs):
         worker = ray.worker.global_worker
         ray_object_pairs = worker.core_worker.get_objects(
@@ -106,25 +333,71 @@ class ExternalStorage(metaclass=abc.ABCMeta):
             The order of returned keys are equivalent to the one
             with given object_refs.
         """
+        start = time.perf_counter()
         keys = []
         offset = 0
         ray_object_pairs = self._get_objects_from_store(object_refs)
         for ref, (buf, metadata) in zip(object_refs, ray_object_pairs):
             metadata_len = len(metadata)
-            buf_len = len(buf)
-            # 16 bytes to store metadata and buffer length.
-            data_size_in_bytes = metadata_len + buf_len + 16
-            f.write(metadata_len.to_bytes(8, byteorder="little"))
-            f.write(buf_len.to_bytes(8, byteorder="little"))
-            f.write(metadata)
-            f.write(memoryview(buf))
+            buf = memoryview(buf)
+            compressed = self._maybe_compress(buf)
+            if compressed is None:
+                header = (metadata_len.to_bytes(8, byteorder="little") +
+                          len(buf).to_bytes(8, byteorder="little"))
+            else:
+                header = ((metadata_len
+                           | self._codec.codec_id << _CODEC_ID_SHIFT).to_bytes(
+                               8, byteorder="little") +
+                          len(compressed).to_bytes(8, byteorder="little") +
+                          len(buf).to_bytes(8, byteorder="little"))
+                buf = compressed
+            data_size_in_bytes = len(header) + metadata_len + len(buf)
+            # Write the header with a single call, the buffer is written
+            # directly from the object store if it's not compressed.
+            f.write(header + metadata)
+            f.write(buf)
             url_with_offset = create_url_with_offset(
                 url=url, offset=offset, size=data_size_in_bytes)
             keys.append(url_with_offset.encode())
             offset += data_size_in_bytes
+        _record_io("spill", offset, time.perf_counter() - start)
         return keys
 
-    def _size_check(self, metadata_len, buffer_len, obtained_data_size):
+    def _read_object(self, f: IO, parsed_result: ParsedURL,
+                     object_ref: ObjectRef) -> None:
+        """Restore an object from a file positioned at its header.
+
+        Args:
+            f(IO): File handle to read the object from.
+            parsed_result(ParsedURL): The parsed url_with_offset of the
+                object.
+            object_ref(ObjectRef): The object to restore.
+        """
+        header = _read_exactly(f, 16)
+        metadata_len = int.from_bytes(header[:8], byteorder="little")
+        codec_id = metadata_len >> _CODEC_ID_SHIFT
+        metadata_len &= _METADATA_LEN_MASK
+        buf_len = int.from_bytes(header[8:], byteorder="little")
+        if codec_id == 0:
+            self._size_check(metadata_len, buf_len, parsed_result.size)
+            metadata = _read_exactly(f, metadata_len)
+            # read remaining data to our buffer
+            self._put_object_to_store(metadata, buf_len, f, object_ref)
+        else:
+            uncompressed_len = int.from_bytes(
+                _read_exactly(f, 8), byteorder="little")
+            self._size_check(
+                metadata_len, buf_len, parsed_result.size, header_size=24)
+            metadata = _read_exactly(f, metadata_len)
+            data = _get_decompress_fn(codec_id)(_read_exactly(f, buf_len))
+            self._put_object_to_store(metadata, uncompressed_len,
+                                      io.BytesIO(data), object_ref)
+
+    def _size_check(self,
+                    metadata_len,
+                    buffer_len,
+                    obtained_data_size,
+                    header_size=16):
         """Check whether or not the obtained_data_size is as expected.
 
         Args:
@@ -132,12 +405,14 @@ class ExternalStorage(metaclass=abc.ABCMeta):
              buffer_len(int): Actual buffer length of the object.
              obtained_data_size(int): Data size specified in the
                 url_with_offset.
+             header_size(int): Size of the header storing the lengths, 16
+                bytes, or 24 for compressed objects.
 
         Raises:
             ValueError if obtained_data_size is different from
-            metadata_len + buffer_len + 16(first 8 bytes to store length).
+            metadata_len + buffer_len + header_size.
         """
-        data_size_in_bytes = metadata_len + buffer_len + 16
+        data_size_in_bytes = metadata_len + buffer_len + header_size
         if data_size_in_bytes != obtained_data_size:
             raise ValueError(
                 f"Obtained data has a size of {data_size_in_bytes}, "
@@ -190,18 +465,51 @@ class NullStorage(ExternalStorage):
 class FileSystemStorage(ExternalStorage):
     """The class for filesystem-like external storage.
 
+    Args:
+        directory_path(str): Directory to store the spilled objects in.
+        io_threads(int): Maximum number of fused files read in parallel
+            when restoring objects.
+        compression(str): Codec used to compress the spilled objects that
+            are large and compressible enough: "zlib", "lz4", "zstd" or
+            "auto" for the fastest available one. Defaults to None (no
+            compression).
+        compression_min_size(int): Objects smaller than this are never
+            compressed.
+        compaction_threshold(float): Fused files whose fraction of live
+            objects drops below this are compacted, i.e. their live objects
+            are copied to a new file and the old file is removed. 0 to
+            disable compaction, files are then only removed once all their
+            objects are deleted.
+
     Raises:
         ValueError: Raises directory path to
             spill objects doesn't exist.
     """
 
-    def __init__(self, directory_path):
+    def __init__(self,
+                 directory_path,
+                 io_threads: int = 4,
+                 compression: Optional[str] = None,
+                 compression_min_size: int = DEFAULT_COMPRESSION_MIN_SIZE,
+                 compaction_threshold: float = DEFAULT_COMPACTION_THRESHOLD):
         self.directory_path = directory_path
         self.prefix = DEFAULT_OBJECT_PREFIX
         os.makedirs(self.directory_path, exist_ok=True)
         if not os.path.exists(self.directory_path):
             raise ValueError("The given directory path to store objects, "
                              f"{self.directory_path}, could not be created.")
+        if io_threads < 1:
+            raise ValueError("io_threads must be positive, "
+                             f"got {io_threads}.")
+        self.io_threads = io_threads
+        if not 0 <= compaction_threshold <= 1:
+            raise ValueError("compaction_threshold must be between 0 and 1, "
+                             f"got {compaction_threshold}.")
+        self.compaction_threshold = compaction_threshold
+        self._setup_compression(compression, compression_min_size)
+        # Created on the first restore, so validating the config in the
+        # driver doesn't start threads.
+        self._io_executor = None
 
     def spill_objects(self, object_refs) -> List[str]:
         if len(object_refs) == 0:
@@ -215,27 +523,162 @@ class FileSystemStorage(ExternalStorage):
 
     def restore_spilled_objects(self, object_refs: List[ObjectRef],
                                 url_with_offset_list: List[str]):
-        for i in range(len(object_refs)):
-            object_ref = object_refs[i]
-            url_with_offset = url_with_offset_list[i].decode()
-            # Retrieve the information needed.
-            parsed_result = parse_url_with_offset(url_with_offset)
-            base_url = parsed_result.base_url
-            offset = parsed_result.offset
-            # Read a part of the file and recover the object.
-            with open(base_url, "rb") as f:
-                f.seek(offset)
-                metadata_len = int.from_bytes(f.read(8), byteorder="little")
-                buf_len = int.from_bytes(f.read(8), byteorder="little")
-                self._size_check(metadata_len, buf_len, parsed_result.size)
-                metadata = f.read(metadata_len)
-                # read remaining data to our buffer
-                self._put_object_to_store(metadata, buf_len, f, object_ref)
+        # Group the objects by fused file, so each file is opened once.
+        objects_by_file: Dict[str, List[Tuple[ObjectRef, ParsedURL]]] = (
+            defaultdict(list))
+        for object_ref, url_with_offset in zip(object_refs,
+                                               url_with_offset_list):
+            parsed_result = parse_url_with_offset(url_with_offset.decode())
+            objects_by_file[parsed_result.base_url].append((object_ref,
+                                                            parsed_result))
+
+        start = time.perf_counter()
+        if len(objects_by_file) == 1:
+            num_bytes = self._restore_from_file(*objects_by_file.popitem())
+        else:
+            if self._io_executor is None:
+                self._io_executor = ThreadPoolExecutor(
+                    self.io_threads, thread_name_prefix="spill_restore")
+            num_bytes = sum(
+                self._io_executor.map(
+                    lambda item: self._restore_from_file(*item),
+                    objects_by_file.items()))
+        _record_io("restore", num_bytes, time.perf_counter() - start)
+
+    def _restore_from_file(self, base_url: str,
+                           objects: List[Tuple[ObjectRef, ParsedURL]]) -> int:
+        """Restore objects of a single fused file, returns the bytes read."""
+        num_bytes = 0
+        # Unbuffered, so that object data is read straight into the object
+        # store. Reading in offset order makes the reads sequential.
+        try:
+            f = open(base_url, "rb", buffering=0)
+        except FileNotFoundError:
+            # The file was compacted, the objects are read at their new
+            # offsets in the compacted file.
+            with open(base_url + _FORWARD_SUFFIX) as forward_file:
+                new_offsets = json.load(forward_file)
+            objects = [(object_ref,
+                        parsed_result._replace(
+                            offset=new_offsets[str(parsed_result.offset)]))
+                       for object_ref, parsed_result in objects]
+            f = open(base_url + _COMPACTED_SUFFIX, "rb", buffering=0)
+        with f:
+            for object_ref, parsed_result in sorted(
+                    objects, key=lambda item: item[1].offset):
+                f.seek(parsed_result.offset)
+                self._read_object(f, parsed_result, object_ref)
+                num_bytes += parsed_result.size
+        return num_bytes
 
     def delete_spilled_objects(self, urls: List[str]):
+        # Group the deleted objects by fused file.
+        offsets_by_file: Dict[str, set] = defaultdict(set)
         for url in urls:
-            filename = parse_url_with_offset(url.decode()).base_url
-            os.remove(os.path.join(self.directory_path, filename))
+            parsed_result = parse_url_with_offset(url.decode())
+            path = os.path.join(self.directory_path, parsed_result.base_url)
+            offsets_by_file[path].add(parsed_result.offset)
+        for path, offsets in offsets_by_file.items():
+            self._delete_from_file(path, offsets)
+
+    @contextlib.contextmanager
+    def _locked_index(self, path: str) -> Iterator[IO]:
+        """Open and lock the index of the deleted objects of a fused file.
+
+        The index is shared by all the IO workers, the lock is held until
+        the context exits.
+        """
+        with open(path + _DELETED_SUFFIX, "a+") as deleted_file:
+            if fcntl is not None:
+                # Released when the file is closed.
+                fcntl.flock(deleted_file, fcntl.LOCK_EX)
+            deleted_file.seek(0)
+            yield deleted_file
+
+    def _delete_from_file(self, path: str, offsets: set) -> bool:
+        """Mark objects of a fused file as deleted.
+
+        The offsets of the deleted objects are appended to the index of the
+        fused file. The fused file is removed once all its objects are
+        deleted, or compacted once the fraction of live objects drops below
+        the compaction threshold. Deleting an object twice is a no-op.
+
+        Args:
+            path(str): Path of the fused file.
+            offsets(set): Offsets of the deleted objects in the file.
+
+        Returns:
+            False if the file doesn't exist (anymore) in this storage.
+        """
+        num_objects = _num_fused_objects(path)
+        if num_objects is None:
+            # Not written by this class, the objects in it are unknown.
+            _remove_if_exists(path)
+            return True
+        compacted_path = path + _COMPACTED_SUFFIX
+        forward_path = path + _FORWARD_SUFFIX
+        deleted_path = path + _DELETED_SUFFIX
+        if not (os.path.exists(path) or os.path.exists(compacted_path)):
+            # Already removed, don't recreate its index.
+            return False
+
+        with self._locked_index(path) as deleted_file:
+            if not (os.path.exists(path) or os.path.exists(compacted_path)):
+                # Removed or moved while waiting for the lock.
+                _remove_if_exists(deleted_path)
+                return False
+            deleted = {int(offset) for offset in deleted_file.read().split()}
+            new_offsets = offsets - deleted
+            if new_offsets:
+                deleted_file.write("".join(
+                    f"{offset}\n" for offset in sorted(new_offsets)))
+                deleted_file.flush()
+                deleted |= new_offsets
+
+            num_live = num_objects - len(deleted)
+            if num_live <= 0:
+                for file_path in [
+                        path, compacted_path, forward_path, deleted_path
+                ]:
+                    _remove_if_exists(file_path)
+            elif (num_live < self.compaction_threshold * num_objects
+                  and os.path.exists(path)):
+                self._compact(path, deleted)
+        return True
+
+    def _compact(self, path: str, deleted: set) -> None:
+        """Copy the live objects of a fused file to its compacted file.
+
+        The new offsets of the objects are written before the fused file is
+        removed, so concurrent restores find the objects in either file.
+        """
+        new_offsets = {}
+        tmp_path = path + _COMPACTED_SUFFIX + ".tmp"
+        with open(path, "rb") as src, open(tmp_path, "wb") as dst:
+            file_size = os.fstat(src.fileno()).st_size
+            offset = 0
+            while offset < file_size:
+                src.seek(offset)
+                size = _read_object_size(src)
+                if offset not in deleted:
+                    src.seek(offset)
+                    new_offsets[offset] = dst.tell()
+                    remaining = size
+                    while remaining > 0:
+                        chunk = _read_exactly(
+                            src, min(remaining, _COMPACTION_CHUNK_SIZE))
+                        dst.write(chunk)
+                        remaining -= len(chunk)
+                offset += size
+        os.replace(tmp_path, path + _COMPACTED_SUFFIX)
+
+        tmp_path = path + _FORWARD_SUFFIX + ".tmp"
+        with open(tmp_path, "w") as forward_file:
+            json.dump(new_offsets, forward_file)
+        os.replace(tmp_path, path + _FORWARD_SUFFIX)
+        os.remove(path)
+        logger.debug(f"Compacted {path}, moved {len(new_offsets)} live "
+                     "objects out of it.")
 
 
 class ExternalStorageSmartOpenImpl(ExternalStorage):
@@ -253,6 +696,10 @@ class ExternalStorageSmartOpenImpl(ExternalStorage):
         prefix(str): Prefix of objects that are stored.
         override_transport_params(dict): Overriding the default value of
             transport_params for smart-open library.
+        compression(str): Codec used to compress the spilled objects, see
+            FileSystemStorage.
+        compression_min_size(int): Objects smaller than this are never
+            compressed.
 
     Raises:
         ModuleNotFoundError: If it fails to setup.
@@ -263,7 +710,9 @@ class ExternalStorageSmartOpenImpl(ExternalStorage):
     def __init__(self,
                  uri: str,
                  prefix: str = DEFAULT_OBJECT_PREFIX,
-                 override_transport_params: dict = None):
+                 override_transport_params: dict = None,
+                 compression: Optional[str] = None,
+                 compression_min_size: int = DEFAULT_COMPRESSION_MIN_SIZE):
         try:
             from smart_open import open  # noqa
         except ModuleNotFoundError as e:
@@ -280,6 +729,7 @@ class ExternalStorageSmartOpenImpl(ExternalStorage):
         # so defer seek and call seek before reading objects instead.
         self.transport_params = {"defer_seek": True}
         self.transport_params.update(self.override_transport_params)
+        self._setup_compression(compression, compression_min_size)
 
     def spill_objects(self, object_refs) -> List[str]:
         if len(object_refs) == 0:
@@ -297,6 +747,8 @@ class ExternalStorageSmartOpenImpl(ExternalStorage):
     def restore_spilled_objects(self, object_refs: List[ObjectRef],
                                 url_with_offset_list: List[str]):
         from smart_open import open
+        start = time.perf_counter()
+        num_bytes = 0
         for i in range(len(object_refs)):
             object_ref = object_refs[i]
             url_with_offset = url_with_offset_list[i].decode()
@@ -312,17 +764,294 @@ class ExternalStorageSmartOpenImpl(ExternalStorage):
                 # smart open seek reads the file from offset-end_of_the_file
                 # when the seek is called.
                 f.seek(offset)
-                metadata_len = int.from_bytes(f.read(8), byteorder="little")
-                buf_len = int.from_bytes(f.read(8), byteorder="little")
-                self._size_check(metadata_len, buf_len, parsed_result.size)
-                metadata = f.read(metadata_len)
-                # read remaining data to our buffer
-                self._put_object_to_store(metadata, buf_len, f, object_ref)
+                self._read_object(f, parsed_result, object_ref)
+            num_bytes += parsed_result.size
+        _record_io("restore", num_bytes, time.perf_counter() - start)
 
     def delete_spilled_objects(self, urls: List[str]):
         pass
 
 
+class TieredStorage(ExternalStorage):
+    """External storage spilling to a list of tiers, fastest first.
+
+    Objects are spilled to the first tier whose usage is below its
+    capacity. A background thread migrates the least recently spilled or
+    restored fused files of a tier to the next one when the tier's usage
+    exceeds migration_threshold times its capacity, as long as the next
+    tier's usage is below its capacity. Objects are restored
+    from and deleted in whichever tier holds their file, so the urls of
+    spilled objects stay valid after their file is migrated.
+
+    Every tier but the last must be a "filesystem" storage, the last tier
+    can also be a "smart_open" storage, e.g. to migrate cold files to S3.
+    Compacted files are not migrated.
+
+    Args:
+        tiers(list): Configs of the tiers, fastest first. Each is a dict
+            with the "type" and "params" of the storage, like
+            object_spilling_config, and optionally the "capacity" of the
+            tier in bytes (unlimited by default). A capacity can't be set
+            for a smart_open tier.
+        migration_threshold(float): Fraction of the capacity of a tier
+            above which its files are migrated to the next tier.
+        migration_interval_s(float): Period of the background migration,
+            which also runs right after each spill. 0 to disable it,
+            migrate_cold_files must then be called explicitly.
+
+    Raises:
+        ValueError: If the tiers are invalid.
+    """
+
+    def __init__(self,
+                 tiers: List[dict],
+                 migration_threshold: float = 0.8,
+                 migration_interval_s: float = 1.0):
+        if len(tiers) == 0:
+            raise ValueError("At least one tier must be given.")
+        self.tiers = []
+        self.capacities = []
+        for i, tier_config in enumerate(tiers):
+            tier = _create_external_storage(tier_config)
+            is_last = i == len(tiers) - 1
+            if not (isinstance(tier, FileSystemStorage) or
+                    (is_last
+                     and isinstance(tier, ExternalStorageSmartOpenImpl))):
+                raise ValueError(
+                    "Every tier but the last must be a filesystem storage, "
+                    "the last tier can also be a smart_open storage, got "
+                    f"{tier_config['type']}.")
+            capacity = tier_config.get("capacity")
+            if capacity is not None and not isinstance(tier,
+                                                       FileSystemStorage):
+                raise ValueError("A capacity can only be set for filesystem "
+                                 "tiers.")
+            self.tiers.append(tier)
+            self.capacities.append(capacity)
+        if not 0 < migration_threshold <= 1:
+            raise ValueError("migration_threshold must be in (0, 1], "
+                             f"got {migration_threshold}.")
+        self.migration_threshold = migration_threshold
+        self.migration_interval_s = migration_interval_s
+        # Started on the first spill, so validating the config in the
+        # driver doesn't start threads.
+        self._migration_thread = None
+        self._migration_event = threading.Event()
+
+    def _tier_url(self, tier_index: int, filename: str) -> str:
+        tier = self.tiers[tier_index]
+        if isinstance(tier, FileSystemStorage):
+            return os.path.join(tier.directory_path, filename)
+        return f"{tier.uri}/{filename}"
+
+    def _find_tier(self, filename: str, first_tier: int = 0) -> int:
+        """Index of the tier holding a fused file.
+
+        The last tier is assumed to hold the files found in no other tier.
+        """
+        for i in range(first_tier, len(self.tiers) - 1):
+            path = self._tier_url(i, filename)
+            if (os.path.exists(path)
+                    or os.path.exists(path + _FORWARD_SUFFIX)):
+                return i
+        return len(self.tiers) - 1
+
+    def _tier_usage(self, tier_index: int) -> int:
+        """Number of bytes used by the files of a filesystem tier."""
+        return sum(size for _, size, _ in _scan_files(self.tiers[tier_index]
+                                                      .directory_path))
+
+    def _has_room(self, tier_index: int) -> bool:
+        capacity = self.capacities[tier_index]
+        return capacity is None or self._tier_usage(tier_index) < capacity
+
+    def spill_objects(self, object_refs) -> List[str]:
+        if len(object_refs) == 0:
+            return []
+        for i, tier in enumerate(self.tiers):
+            if self._has_room(i):
+                break
+        else:
+            raise RuntimeError("All the tiers of the external storage are "
+                               "full, objects can't be spilled.")
+        urls = tier.spill_objects(object_refs)
+        if self.migration_interval_s > 0:
+            if self._migration_thread is None:
+                self._migration_thread = threading.Thread(
+                    target=self._migration_loop,
+                    name="spill_migration",
+                    daemon=True)
+                self._migration_thread.start()
+            self._migration_event.set()
+        return urls
+
+    def _group_by_tier(
+            self, object_refs: List[ObjectRef], url_with_offset_list: List[str]
+    ) -> Dict[int, Tuple[List[ObjectRef], List[str], List[str]]]:
+        """Group objects by the tier holding them.
+
+        Returns a map from the tier index to the refs of the objects, their
+        url in the tier and their original url.
+        """
+        objects_by_tier = defaultdict(lambda: ([], [], []))
+        for object_ref, url_with_offset in zip(object_refs,
+                                               url_with_offset_list):
+            parsed_result = parse_url_with_offset(url_with_offset.decode())
+            filename = os.path.basename(parsed_result.base_url)
+            tier_index = self._find_tier(filename)
+            tier_url = create_url_with_offset(
+                url=self._tier_url(tier_index, filename),
+                offset=parsed_result.offset,
+                size=parsed_result.size)
+            refs, tier_urls, urls = objects_by_tier[tier_index]
+            refs.append(object_ref)
+            tier_urls.append(tier_url.encode())
+            urls.append(url_with_offset)
+        return objects_by_tier
+
+    def restore_spilled_objects(self, object_refs: List[ObjectRef],
+                                url_with_offset_list: List[str]):
+        objects_by_tier = self._group_by_tier(object_refs,
+                                              url_with_offset_list)
+        for tier_index, (refs, tier_urls, urls) in objects_by_tier.items():
+            try:
+                self.tiers[tier_index].restore_spilled_objects(refs, tier_urls)
+            except FileNotFoundError:
+                # The file was migrated to the next tier while restoring.
+                for retry_index, (retry_refs,
+                                  retry_tier_urls, _) in self._group_by_tier(
+                                      refs, urls).items():
+                    self.tiers[retry_index].restore_spilled_objects(
+                        retry_refs, retry_tier_urls)
+                continue
+            if tier_index < len(self.tiers) - 1:
+                # Restored files are warm, migrate them last.
+                for tier_url in set(tier_urls):
+                    path = parse_url_with_offset(tier_url.decode()).base_url
+                    try:
+                        os.utime(path)
+                    except FileNotFoundError:
+                        pass
+
+    def delete_spilled_objects(self, urls: List[str]):
+        offsets_by_file: Dict[str, set] = defaultdict(set)
+        for url in urls:
+            parsed_result = parse_url_with_offset(url.decode())
+            filename = os.path.basename(parsed_result.base_url)
+            offsets_by_file[filename].add(parsed_result.offset)
+        for filename, offsets in offsets_by_file.items():
+            tier_index = self._find_tier(filename)
+            # The file may be migrated to a later tier concurrently, in
+            # which case it's not found in the first tier tried.
+            while tier_index < len(self.tiers) - 1:
+                tier = self.tiers[tier_index]
+                if tier._delete_from_file(
+                        self._tier_url(tier_index, filename), offsets):
+                    break
+                tier_index = self._find_tier(filename, tier_index + 1)
+            else:
+                tier_urls = [
+                    create_url_with_offset(
+                        url=self._tier_url(tier_index, filename),
+                        offset=offset,
+                        size=0).encode() for offset in offsets
+                ]
+                self.tiers[tier_index].delete_spilled_objects(tier_urls)
+
+    def _migration_loop(self):
+        while True:
+            self._migration_event.wait(self.migration_interval_s)
+            self._migration_event.clear()
+            try:
+                self.migrate_cold_files()
+            except Exception:
+                logger.exception("Failed to migrate spilled objects.")
+
+    def migrate_cold_files(self) -> int:
+        """Migrate the coldest files of the tiers above their threshold.
+
+        Returns:
+            The number of bytes migrated.
+        """
+        num_bytes_migrated = 0
+        for i, capacity in enumerate(self.capacities[:-1]):
+            if capacity is None:
+                continue
+            usage = self._tier_usage(i)
+            max_usage = self.migration_threshold * capacity
+            if usage <= max_usage:
+                continue
+            start = time.perf_counter()
+            tier = self.tiers[i]
+            # Fused files, not compacted, least recently used first.
+            files = sorted(
+                (item for item in _scan_files(tier.directory_path)
+                 if _num_fused_objects(item[0].name) is not None
+                 and not os.path.exists(item[0].path + _FORWARD_SUFFIX)),
+                key=lambda item: item[2])
+            num_bytes = 0
+            for entry, _, _ in files:
+                if usage <= max_usage or not self._has_room(i + 1):
+                    break
+                migrated = self._migrate(i, entry.name)
+                usage -= migrated
+                num_bytes += migrated
+            if num_bytes > 0:
+                _record_io("migrate", num_bytes, time.perf_counter() - start)
+            num_bytes_migrated += num_bytes
+        return num_bytes_migrated
+
+    def _migrate(self, tier_index: int, filename: str) -> int:
+        """Move a fused file to the next tier, returns its size.
+
+        The file is moved with its index of deleted objects while holding
+        the lock of the index, so no delete is lost.
+        """
+        tier = self.tiers[tier_index]
+        path = self._tier_url(tier_index, filename)
+        next_tier = self.tiers[tier_index + 1]
+        next_url = self._tier_url(tier_index + 1, filename)
+        with tier._locked_index(path) as deleted_file:
+            if (not os.path.exists(path)
+                    or os.path.exists(path + _FORWARD_SUFFIX)):
+                # Deleted, compacted or migrated by another IO worker.
+                _remove_if_exists(path + _DELETED_SUFFIX)
+                return 0
+            size = os.path.getsize(path)
+            deleted = deleted_file.read()
+            if isinstance(next_tier, FileSystemStorage):
+                # Copy then rename, so the file is never seen partially
+                # written in the next tier.
+                shutil.copyfile(path, next_url + ".tmp")
+                os.replace(next_url + ".tmp", next_url)
+                if deleted:
+                    with open(next_url + _DELETED_SUFFIX, "w") as f:
+                        f.write(deleted)
+            else:
+                from smart_open import open as smart_open
+                with open(path, "rb") as src, smart_open(
+                        next_url,
+                        "wb",
+                        transport_params=next_tier.transport_params) as dst:
+                    shutil.copyfileobj(src, dst)
+            os.remove(path)
+            _remove_if_exists(path + _DELETED_SUFFIX)
+        logger.debug(f"Migrated {path} to {next_url}.")
+        return size
+
+
+def _create_external_storage(config: dict) -> ExternalStorage:
+    storage_type = config["type"]
+    if storage_type == "filesystem":
+        return FileSystemStorage(**config["params"])
+    elif storage_type == "smart_open":
+        return ExternalStorageSmartOpenImpl(**config["params"])
+    elif storage_type == "tiered":
+        return TieredStorage(**config["params"])
+    else:
+        raise ValueError(f"Unknown external storage type: {storage_type}")
+
+
 _external_storage = NullStorage()
 
 
@@ -330,14 +1059,7 @@ def setup_external_storage(config):
     """Setup the external storage according to the config."""
     global _external_storage
     if config:
-        storage_type = config["type"]
-        if storage_type == "filesystem":
-            _external_storage = FileSystemStorage(**config["params"])
-        elif storage_type == "smart_open":
-            _external_storage = ExternalStorageSmartOpenImpl(
-                **config["params"])
-        else:
-            raise ValueError(f"Unknown external storage type: {storage_type}")
+        _external_storage = _create_external_storage(config)
     else:
         _external_storage = NullStorage()
 
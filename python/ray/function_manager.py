@@ -4,6 +4,7 @@ import importlib
 import inspect
 import json
 import logging
+import os
 import sys
 import time
 import threading
@@ -37,6 +38,90 @@ FunctionExecutionInfo = namedtuple("FunctionExecutionInfo",
 
 logger = logging.getLogger(__name__)
 
+# Boundaries of the histograms of the worker startup latencies, in ms.
+_STARTUP_LATENCY_BOUNDARIES_MS = [0.1, 1, 10, 100, 1000, 10000]
+_startup_metrics = None
+
+
+def _record_startup_latency(metric_name, duration_s, tags):
+    """Record a startup latency of this worker.
+
+    Args:
+        metric_name (str): "definition_load" for the time to fetch the
+            definition of a remote function or actor class, or
+            "wait_for_function" for the time a task waited for the
+            definition of its function.
+        duration_s (float): The latency.
+        tags (dict): The tags of the metric.
+    """
+    global _startup_metrics
+    if _startup_metrics is None:
+        from ray.util import metrics
+        _startup_metrics = {
+            "definition_load": metrics.Histogram(
+                "worker_definition_load_latency_ms",
+                description=("Time to fetch the definition of a remote "
+                             "function or actor class."),
+                boundaries=_STARTUP_LATENCY_BOUNDARIES_MS,
+                tag_keys=("type", "source")),
+            "wait_for_function": metrics.Histogram(
+                "worker_wait_for_function_latency_ms",
+                description=("Time a task waited for the definition of its "
+                             "function to be imported."),
+                boundaries=_STARTUP_LATENCY_BOUNDARIES_MS),
+        }
+    _startup_metrics[metric_name].record(duration_s * 1000, tags=tags)
+
+
+class DefinitionCache:
+    """Cache of the definitions exported to the GCS, shared by the workers
+    of a node.
+
+    Remote functions and actor classes are exported to the GCS as hashes of
+    fields, e.g. the pickled function, its name and module. The fetched
+    fields are stored in a file per export in the given directory, so that
+    other workers of the node load the definition without a GCS round trip.
+    Exports are immutable, so the entries are never invalidated, they are
+    removed with the session directory.
+
+    Args:
+        directory (str): The directory to store the definitions in.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key).hexdigest())
+
+    def get(self, key, fields):
+        """Get the values of fields of an export, None if not cached."""
+        try:
+            with open(self._path(key), "rb") as f:
+                entry = pickle.loads(f.read())
+            return [entry[field] for field in fields]
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.exception("Failed to load %s from the definition cache.",
+                             key)
+            return None
+
+    def put(self, key, fields, values):
+        """Store the values of fields of an export."""
+        path = self._path(key)
+        # Written to a temporary file first, so that other workers never
+        # read partially written entries.
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(pickle.dumps(dict(zip(fields, values))))
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.exception("Failed to store %s in the definition cache.",
+                             key)
+
 
 class FunctionActorManager:
     """A class used to export/load remote functions and actors.
@@ -79,7 +164,11 @@ class FunctionActorManager:
         #         -> _load_actor_class_from_gcs (acquire lock, too)
         # So, the lock should be a reentrant lock.
         self.lock = threading.RLock()
+        # Notified when a remote function or an actor class is registered.
+        self._function_registered = threading.Condition(self.lock)
         self.execution_infos = {}
+        # Created once the worker is connected to the node.
+        self._definition_cache = None
 
     def increase_task_counter(self, job_id, function_descriptor):
         function_id = function_descriptor.function_id
@@ -124,6 +213,45 @@ class FunctionActorManager:
         # Return a hash of the identifier in case it is too large.
         return hashlib.sha1(collision_identifier.encode("utf-8")).digest()
 
+    def _get_definition_cache(self):
+        if (self._definition_cache is None
+                and ray_constants.FUNCTION_DEFINITION_CACHE_ENABLED
+                and self._worker.node is not None):
+            self._definition_cache = DefinitionCache(
+                os.path.join(self._worker.node.get_session_dir_path(),
+                             "function_cache"))
+        return self._definition_cache
+
+    def _fetch_export(self, key, fields, export_type):
+        """Fetch fields of an export, from the node's cache if possible.
+
+        Args:
+            key (bytes): The GCS key of the export.
+            fields (list): The fields to fetch.
+            export_type (str): "remote_function" or "actor_class", used to
+                tag the load latency metric.
+
+        Returns:
+            The values of the fields.
+        """
+        start = time.perf_counter()
+        source = "cache"
+        cache = self._get_definition_cache()
+        values = cache.get(key, fields) if cache is not None else None
+        if values is None:
+            source = "gcs"
+            values = self._worker.redis_client.hmget(key, fields)
+            if cache is not None and None not in values:
+                cache.put(key, fields, values)
+        _record_startup_latency(
+            "definition_load",
+            time.perf_counter() - start,
+            tags={
+                "type": export_type,
+                "source": source
+            })
+        return values
+
     def export(self, remote_function):
         """Pickle a remote function and export it to redis.
 
@@ -159,11 +287,10 @@ class FunctionActorManager:
     def fetch_and_register_remote_function(self, key):
         """Import a remote function."""
         (job_id_str, function_id_str, function_name, serialized_function,
-         module, max_calls) = self._worker.redis_client.hmget(
-             key, [
-                 "job_id", "function_id", "function_name", "function",
-                 "module", "max_calls"
-             ])
+         module, max_calls) = self._fetch_export(key, [
+             "job_id", "function_id", "function_name", "function", "module",
+             "max_calls"
+         ], "remote_function")
         function_id = ray.FunctionID(function_id_str)
         job_id = ray.JobID(job_id_str)
         function_name = decode(function_name)
@@ -219,6 +346,7 @@ class FunctionActorManager:
                 self._worker.redis_client.rpush(
                     b"FunctionTable:" + function_id.binary(),
                     self._worker.worker_id)
+            self._function_registered.notify_all()
 
     def get_execution_info(self, job_id, function_descriptor):
         """Get the FunctionExecutionInfo of a remote function.
@@ -300,6 +428,7 @@ class FunctionActorManager:
         start_time = time.time()
         # Only send the warning once.
         warning_sent = False
+        waited = False
         while True:
             with self.lock:
                 if (self._worker.actor_id.is_nil()
@@ -309,6 +438,10 @@ class FunctionActorManager:
                 elif not self._worker.actor_id.is_nil() and (
                         self._worker.actor_id in self._worker.actors):
                     break
+                waited = True
+                # Woken up as soon as a function is registered, the timeout
+                # is only a fallback.
+                self._function_registered.wait(0.1)
             if time.time() - start_time > timeout:
                 warning_message = ("This worker was asked to execute a "
                                    "function that it does not have "
@@ -321,7 +454,9 @@ class FunctionActorManager:
                         warning_message,
                         job_id=job_id)
                 warning_sent = True
-            time.sleep(0.001)
+        if waited:
+            _record_startup_latency("wait_for_function",
+                                    time.time() - start_time, {})
 
     def _publish_actor_class_to_key(self, key, actor_class_info):
         """Push an actor class definition to Redis.
@@ -373,6 +508,12 @@ class FunctionActorManager:
         # within tasks. I tried to disable this, but it may be necessary
         # because of https://github.com/ray-project/ray/issues/1146.
 
+    def add_imported_actor_class(self, key):
+        """Record that an actor class was exported to the GCS."""
+        with self.lock:
+            self.imported_actor_classes.add(key)
+            self._function_registered.notify_all()
+
     def load_actor_class(self, job_id, actor_creation_function_descriptor):
         """Load the actor class.
 
@@ -476,14 +617,16 @@ class FunctionActorManager:
         # import thread. TODO(rkn): It shouldn't be possible to end
         # up in an infinite loop here, but we should push an error to
         # the driver if too much time is spent here.
-        while key not in self.imported_actor_classes:
-            time.sleep(0.001)
+        with self.lock:
+            while key not in self.imported_actor_classes:
+                self._function_registered.wait(0.1)
 
-        # Fetch raw data from GCS.
-        (job_id_str, class_name, module, pickled_class,
-         actor_method_names) = self._worker.redis_client.hmget(
+        # Fetch raw data from the node's cache or the GCS.
+        (job_id_str, class_name, module,
+         pickled_class, actor_method_names) = self._fetch_export(
              key,
-             ["job_id", "class_name", "module", "class", "actor_method_names"])
+             ["job_id", "class_name", "module", "class", "actor_method_names"],
+             "actor_class")
 
         class_name = ensure_str(class_name)
         module_name = ensure_str(module)
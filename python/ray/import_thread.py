@@ -146,7 +146,7 @@ class ImportThread:
             # Keep track of the fact that this actor class has been
             # exported so that we know it is safe to turn this worker
             # into an actor of that class.
-            self.worker.function_actor_manager.imported_actor_classes.add(key)
+            self.worker.function_actor_manager.add_imported_actor_class(key)
         # TODO(rkn): We may need to bring back the case of
         # fetching actor classes here.
         else:
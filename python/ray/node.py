@@ -730,7 +730,8 @@ class Node:
             head_node=self.head,
             start_initial_python_workers_for_first_job=self._ray_params.
             start_initial_python_workers_for_first_job,
-            code_search_path=self._ray_params.code_search_path)
+            code_search_path=self._ray_params.code_search_path,
+            worker_preload_modules=self._ray_params.worker_preload_modules)
         assert ray_constants.PROCESS_TYPE_RAYLET not in self.all_processes
         self.all_processes[ray_constants.PROCESS_TYPE_RAYLET] = [process_info]
 
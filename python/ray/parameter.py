@@ -101,6 +101,9 @@ class RayParams:
             failure.
         start_initial_python_workers_for_first_job (bool): If true, start
             initial Python workers for the first job on the node.
+        worker_preload_modules (list): Modules that the Python workers of the
+            node import before registering with the raylet, so that tasks
+            using them don't pay for the import.
     """
 
     def __init__(self,
@@ -149,7 +152,8 @@ class RayParams:
                  metrics_agent_port=None,
                  metrics_export_port=None,
                  lru_evict=False,
-                 code_search_path=None):
+                 code_search_path=None,
+                 worker_preload_modules=None):
         self.object_ref_seed = object_ref_seed
         self.redis_address = redis_address
         self.num_cpus = num_cpus
@@ -198,6 +202,9 @@ class RayParams:
         self.code_search_path = code_search_path
         if code_search_path is None:
             self.code_search_path = []
+        self.worker_preload_modules = worker_preload_modules
+        if worker_preload_modules is None:
+            self.worker_preload_modules = []
 
         # Set the internal config options for LRU eviction.
         if lru_evict:
@@ -60,6 +60,12 @@ PICKLE_OBJECT_WARNING_SIZE = 10**7
 # print a warning.
 DUPLICATE_REMOTE_FUNCTION_THRESHOLD = 100
 
+# Whether the workers cache the definitions of the remote functions and
+# actor classes they fetch from the GCS in the session directory, so that
+# the other workers of the node load them without GCS round trips.
+FUNCTION_DEFINITION_CACHE_ENABLED = env_bool(
+    "RAY_FUNCTION_DEFINITION_CACHE_ENABLED", True)
+
 # The maximum resource quantity that is allowed. TODO(rkn): This could be
 # relaxed, but the current implementation of the node manager will be slower
 # for large resource quantities due to bookkeeping of specific resource IDs.
@@ -205,6 +211,9 @@ OBJECT_METADATA_TYPE_CROSS_LANGUAGE = b"XLANG"
 OBJECT_METADATA_TYPE_PYTHON = b"PYTHON"
 # A constant used as object metadata to indicate the object is raw bytes.
 OBJECT_METADATA_TYPE_RAW = b"RAW"
+# A constant used as object metadata to indicate the object is a container of
+# numpy arrays or Arrow buffers, serialized by the buffer container fast path.
+OBJECT_METADATA_TYPE_BUFFER_CONTAINER = b"BUFFER_CONTAINER"
 
 # A constant used as object metadata to indicate the object is an actor handle.
 # This value should be synchronized with the Java definition in
@@ -7,6 +7,7 @@ import time
 import numpy as np
 import multiprocessing
 import ray
+from ray.util.queue import CoalescingWriter, Queue, ShardedQueue
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +72,10 @@ def small_value_batch(n):
     return 0
 
 
+class PickledDict(dict):
+    pass
+
+
 def timeit(name, fn, multiplier=1):
     if filter_pattern not in name:
         return
@@ -133,6 +138,26 @@ def main():
 
     timeit("multi client put calls", put_multi_small, 1000)
 
+    values = list(range(1000))
+
+    def put_small_loop():
+        [ray.put(value) for value in values]
+
+    timeit("single client put calls (1000 in a loop)", put_small_loop, 1000)
+
+    def put_small_many():
+        ray.put_many(values)
+
+    timeit("single client put_many calls (1000 per batch)", put_small_many,
+           1000)
+
+    small_refs = ray.put_many(values)
+
+    def get_small_many():
+        ray.get(small_refs)
+
+    timeit("single client get calls (1000 per batch)", get_small_many, 1000)
+
     ray.shutdown()
     ray.init(_system_config={"put_small_object_in_memory_store": False})
 
@@ -160,6 +185,69 @@ def main():
 
     timeit("multi client put gigabytes", put_multi, 10 * 8 * 0.1)
 
+    # A batch of samples with many small columns, like an RLlib SampleBatch.
+    batch = {f"column_{i}": np.random.normal(size=(256, 8)) for i in range(20)}
+    # Dict subclasses don't take the buffer container fast path, they are
+    # pickled.
+    pickled_batch = PickledDict(batch)
+
+    def put_get_batch():
+        ray.get(ray.put(batch))
+
+    timeit("single client put/get dict of arrays", put_get_batch)
+
+    def put_get_pickled_batch():
+        ray.get(ray.put(pickled_batch))
+
+    timeit("single client put/get dict of arrays (pickle)",
+           put_get_pickled_batch)
+
+    n = 1000
+    queue = Queue()
+
+    def queue_put_get():
+        for i in range(n):
+            queue.put(i)
+        for _ in range(n):
+            queue.get()
+
+    timeit("single client queue put/get", queue_put_get, n)
+
+    def queue_put_get_batch():
+        queue.put_batch(list(range(n)))
+        num_items = 0
+        while num_items < n:
+            num_items += len(queue.get_batch(n))
+
+    timeit("single client queue put/get batch", queue_put_get_batch, n)
+
+    def queue_coalesced_put():
+        with CoalescingWriter(queue) as writer:
+            for i in range(n):
+                writer.put(i)
+        num_items = 0
+        while num_items < n:
+            num_items += len(queue.get_batch(n))
+
+    timeit("single client queue coalesced put", queue_coalesced_put, n)
+
+    sharded_queue = ShardedQueue(4)
+
+    @ray.remote
+    def queue_producer(queue):
+        with CoalescingWriter(queue) as writer:
+            for i in range(n):
+                writer.put(i)
+
+    def sharded_queue_put_get():
+        producers = [queue_producer.remote(sharded_queue) for _ in range(4)]
+        num_items = 0
+        while num_items < 4 * n:
+            num_items += len(sharded_queue.get_batch(n))
+        ray.get(producers)
+
+    timeit("multi client sharded queue put/get", sharded_queue_put_get, 4 * n)
+
     def small_task():
         ray.get(small_value.remote())
 
@@ -0,0 +1,53 @@
+"""Benchmark of the first-task latency of cold and warm workers.
+
+Usage: python -m ray.ray_worker_startup_perf [module ...]
+
+Each task imports the given modules (numpy by default). Cold workers import
+them when running their first task, warm workers are started with the
+modules preloaded.
+"""
+
+import importlib
+import sys
+import time
+
+import numpy as np
+import ray
+
+NUM_CPUS = 4
+NUM_TRIALS = 3
+
+
+@ray.remote
+def use_modules(module_names):
+    for module_name in module_names:
+        importlib.import_module(module_name)
+
+
+def first_task_latency(module_names, preload):
+    ray.init(
+        num_cpus=NUM_CPUS,
+        _worker_preload_modules=module_names if preload else None)
+    # Workers are started by ray.init, so the first tasks measure how long
+    # an idle worker takes to run a task using the modules.
+    start = time.time()
+    ray.get([use_modules.remote(module_names) for _ in range(NUM_CPUS)])
+    latency = time.time() - start
+    ray.shutdown()
+    return latency
+
+
+def main(module_names):
+    for preload, name in [(False, "cold"), (True, "warm")]:
+        latencies = [
+            first_task_latency(module_names, preload)
+            for _ in range(NUM_TRIALS)
+        ]
+        print(
+            f"{name} workers first task latency "
+            f"({','.join(module_names)})", round(np.mean(latencies) * 1000, 2),
+            "+-", round(np.std(latencies) * 1000, 2), "ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ["numpy"])
@@ -366,6 +366,12 @@ def debug(address):
     help="A list of directories or jar files separated by colon that specify "
     "the search path for user code. This will be used as `CLASSPATH` in "
     "Java and `PYTHONPATH` in Python.")
+@click.option(
+    "--worker-preload-modules",
+    default=None,
+    type=str,
+    help="A comma-separated list of modules that the Python workers import "
+    "before running any task, e.g. 'numpy,torch'.")
 @click.option(
     "--system-config",
     default=None,
@@ -406,7 +412,7 @@ def start(node_ip_address, address, port, redis_password, redis_shard_ports,
           plasma_directory, autoscaling_config, no_redirect_worker_output,
           no_redirect_output, plasma_store_socket_name, raylet_socket_name,
           temp_dir, java_worker_options, load_code_from_local,
-          code_search_path, system_config, lru_evict,
+          code_search_path, worker_preload_modules, system_config, lru_evict,
           enable_object_reconstruction, metrics_export_port, log_style,
           log_color, verbose):
     """Start Ray processes manually on the local machine."""
@@ -467,6 +473,8 @@ def start(node_ip_address, address, port, redis_password, redis_shard_ports,
         java_worker_options=java_worker_options,
         load_code_from_local=load_code_from_local,
         code_search_path=code_search_path,
+        worker_preload_modules=(worker_preload_modules.split(",")
+                                if worker_preload_modules else None),
         _system_config=system_config,
         lru_evict=lru_evict,
         enable_object_reconstruction=enable_object_reconstruction,
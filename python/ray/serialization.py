@@ -1,8 +1,11 @@
 import hashlib
 import logging
+import sys
 import time
 import threading
 
+import msgpack
+
 import ray.cloudpickle as pickle
 from ray import ray_constants, JobID
 import ray.utils
@@ -124,6 +127,117 @@ def actor_handle_deserializer(serialized_obj):
         serialized_obj, outer_id)
 
 
+# Extension type codes used in the header of buffer containers.
+_EXT_TUPLE = 1
+_EXT_NDARRAY = 2
+_EXT_ARROW_BUFFER = 3
+# Containers with more items than this are serialized with pickle, the fast
+# path is meant for small containers of large buffers.
+_BUFFER_CONTAINER_MAX_ITEMS = 1000
+_BUFFER_CONTAINER_SCALAR_TYPES = (type(None), bool, int, float, str, bytes)
+_BUFFER_CONTAINER_KEY_TYPES = (int, str, bytes)
+
+
+class _NotBufferContainer(Exception):
+    pass
+
+
+def _is_ndarray(obj):
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and type(obj) is numpy.ndarray
+
+
+class _BufferContainerEncoder:
+    """Encode a container of numpy arrays and Arrow buffers.
+
+    Dicts, lists and tuples of scalars, numpy arrays and Arrow buffers are
+    encoded as a msgpack header describing the container, and the data of
+    the arrays and buffers, which is written out-of-band without copies.
+    Raises _NotBufferContainer for any other object, including subclasses of
+    the supported types, which are then pickled.
+    """
+
+    def __init__(self):
+        self.buffers = []
+        self.num_items = 0
+
+    def encode(self, obj):
+        self.num_items += 1
+        if self.num_items > _BUFFER_CONTAINER_MAX_ITEMS:
+            raise _NotBufferContainer
+        obj_type = type(obj)
+        if obj_type in _BUFFER_CONTAINER_SCALAR_TYPES:
+            return obj
+        elif obj_type is list:
+            return [self.encode(item) for item in obj]
+        elif obj_type is dict:
+            encoded = {}
+            for key, value in obj.items():
+                if type(key) not in _BUFFER_CONTAINER_KEY_TYPES:
+                    raise _NotBufferContainer
+                encoded[key] = self.encode(value)
+            return encoded
+        elif obj_type is tuple:
+            return msgpack.ExtType(
+                _EXT_TUPLE, self._pack([self.encode(item) for item in obj]))
+
+        # Only look for the types of libraries that are already imported.
+        if _is_ndarray(obj):
+            numpy = sys.modules["numpy"]
+            if obj.dtype.hasobject or obj.dtype.fields is not None:
+                raise _NotBufferContainer
+            # Only non-contiguous arrays are copied.
+            data = numpy.ascontiguousarray(obj).reshape(-1).view(numpy.uint8)
+            return msgpack.ExtType(
+                _EXT_NDARRAY,
+                self._pack(
+                    [obj.dtype.str,
+                     list(obj.shape),
+                     self._add_buffer(data)]))
+        pyarrow = sys.modules.get("pyarrow")
+        if pyarrow is not None and obj_type is pyarrow.Buffer:
+            return msgpack.ExtType(_EXT_ARROW_BUFFER,
+                                   self._pack(self._add_buffer(obj)))
+        raise _NotBufferContainer
+
+    def _add_buffer(self, buffer):
+        self.buffers.append(buffer)
+        return len(self.buffers) - 1
+
+    def _pack(self, obj):
+        try:
+            return msgpack.packb(obj, use_bin_type=True)
+        except (OverflowError, ValueError, TypeError):
+            # E.g. an int that doesn't fit in 64 bits.
+            raise _NotBufferContainer
+
+
+def _decode_buffer_container(header, buffers):
+    """Decode a container encoded by _BufferContainerEncoder.
+
+    The arrays and buffers are read-only views of the given buffers.
+    """
+
+    def _ext_hook(code, data):
+        value = _unpack(data)
+        if code == _EXT_TUPLE:
+            return tuple(value)
+        elif code == _EXT_NDARRAY:
+            import numpy
+            dtype, shape, index = value
+            return numpy.frombuffer(buffers[index], dtype=dtype).reshape(shape)
+        elif code == _EXT_ARROW_BUFFER:
+            import pyarrow
+            return pyarrow.py_buffer(buffers[value])
+        raise DeserializationError()
+
+    def _unpack(data):
+        return msgpack.unpackb(
+            data, ext_hook=_ext_hook, raw=False, strict_map_key=False)
+
+    return _unpack(header)
+
+
 class SerializationContext:
     """Initialize the serialization library.
 
@@ -219,6 +333,13 @@ class SerializationContext:
             raise DeserializationError()
         return obj
 
+    def _deserialize_buffer_container(self, data):
+        try:
+            header, buffers = unpack_pickle5_buffers(data)
+            return _decode_buffer_container(header, buffers)
+        except Exception:
+            raise DeserializationError()
+
     def _deserialize_msgpack_data(self, data, metadata_fields):
         msgpack_data, pickle5_data = split_buffer(data)
 
@@ -246,6 +367,9 @@ class SerializationContext:
                     ray_constants.OBJECT_METADATA_TYPE_PYTHON
             ]:
                 return self._deserialize_msgpack_data(data, metadata_fields)
+            if metadata_fields[
+                    0] == ray_constants.OBJECT_METADATA_TYPE_BUFFER_CONTAINER:
+                return self._deserialize_buffer_container(data)
             # Check if the object should be returned as raw bytes.
             if metadata_fields[0] == ray_constants.OBJECT_METADATA_TYPE_RAW:
                 if data is None:
@@ -351,6 +475,33 @@ class SerializationContext:
             metadata, inband, writer,
             self.get_and_clear_contained_object_refs())
 
+    def _serialize_to_buffer_container(self, value):
+        """Serialize a container of numpy arrays or Arrow buffers.
+
+        This avoids pickling for the common case of dicts, lists or tuples
+        of arrays, e.g. batches of samples or columns of a dataframe.
+        Returns None if the value isn't such a container.
+        """
+        if type(value) not in (dict, list, tuple) and not _is_ndarray(value):
+            return None
+        encoder = _BufferContainerEncoder()
+        try:
+            header = encoder.encode(value)
+            if len(encoder.buffers) == 0:
+                # Plain containers of scalars are serialized with msgpack,
+                # so that other languages can read them.
+                return None
+            inband = encoder._pack(header)
+        except _NotBufferContainer:
+            return None
+
+        writer = Pickle5Writer()
+        for buffer in encoder.buffers:
+            writer.buffer_callback(buffer)
+        return Pickle5SerializedObject(
+            ray_constants.OBJECT_METADATA_TYPE_BUFFER_CONTAINER, inband,
+            writer, [])
+
     def _serialize_to_msgpack(self, value):
         # Only RayTaskError is possible to be serialized here. We don't
         # need to deal with other exception types here.
@@ -402,8 +553,10 @@ class SerializationContext:
             # use a special metadata to indicate it's raw binary. So
             # that this object can also be read by Java.
             return RawSerializedObject(value)
-        else:
-            return self._serialize_to_msgpack(value)
+        serialized = self._serialize_to_buffer_container(value)
+        if serialized is not None:
+            return serialized
+        return self._serialize_to_msgpack(value)
 
     def register_custom_serializer(self,
                                    cls,
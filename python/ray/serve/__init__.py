@@ -1,5 +1,5 @@
 from ray.serve.api import (accept_batch, Client, connect, start)  # noqa: F401
-from ray.serve.config import BackendConfig
+from ray.serve.config import BackendConfig, ResponseCacheConfig
 from ray.serve.env import CondaEnv
 
 # Mute the warning because Serve sometimes intentionally calls
@@ -13,5 +13,6 @@ __all__ = [
     "CondaEnv",
     "connect",
     "Client",
+    "ResponseCacheConfig",
     "start",
 ]
@@ -1,6 +1,8 @@
 import atexit
 from functools import wraps
+import inspect
 import os
+import socket
 
 import ray
 from ray.serve.constants import (DEFAULT_HTTP_HOST, DEFAULT_HTTP_PORT,
@@ -10,7 +12,8 @@ from ray.serve.handle import RayServeHandle
 from ray.serve.utils import (block_until_http_ready, format_actor_name,
                              get_random_letters, logger, get_conda_env_dir)
 from ray.serve.exceptions import RayServeException
-from ray.serve.config import BackendConfig, ReplicaConfig, BackendMetadata
+from ray.serve.config import (BackendConfig, ReplicaConfig, BackendMetadata,
+                              ResponseCacheConfig)
 from ray.serve.env import CondaEnv
 from ray.actor import ActorHandle
 from typing import Any, Callable, Dict, List, Optional, Type, Union
@@ -89,7 +92,9 @@ class Client:
                         *,
                         backend: str = None,
                         route: Optional[str] = None,
-                        methods: List[str] = ["GET"]) -> None:
+                        methods: List[str] = ["GET"],
+                        cache_config: Optional[Union[ResponseCacheConfig, Dict[
+                            str, Any]]] = None) -> None:
         """Create a service endpoint given route_expression.
 
         Args:
@@ -101,6 +106,15 @@ class Client:
                 use the string to match the path.
             methods(List[str], optional): The HTTP methods that are valid for
                 this endpoint.
+            cache_config(dict, serve.ResponseCacheConfig, optional): If set,
+                the responses of this endpoint are cached by the routers and
+                repeated identical requests are answered from the cache.
+                Either a ResponseCacheConfig or a dictionary mapping strings to
+                values for the following supported options:
+                - "ttl_s": how long a cached response stays valid.
+                - "max_bytes": the maximum total size of the cached responses
+                in each router.
+                - "key_fn": function mapping a request to its cache key.
         """
         if backend is None:
             raise TypeError("backend must be specified when creating "
@@ -129,6 +143,13 @@ class Client:
                     "endpoint, please use serve.set_traffic().".format(
                         route, endpoint_name, methods))
 
+        if isinstance(cache_config, dict):
+            cache_config = ResponseCacheConfig.parse_obj(cache_config)
+        elif not (cache_config is None
+                  or isinstance(cache_config, ResponseCacheConfig)):
+            raise TypeError("cache_config must be a ResponseCacheConfig or a "
+                            "dictionary.")
+
         upper_methods = []
         for method in methods:
             if not isinstance(method, str):
@@ -139,7 +160,8 @@ class Client:
 
         ray.get(
             self._controller.create_endpoint.remote(
-                endpoint_name, {backend: 1.0}, route, upper_methods))
+                endpoint_name, {backend: 1.0}, route, upper_methods,
+                cache_config))
 
     @_ensure_connected
     def delete_endpoint(self, endpoint: str) -> None:
@@ -180,6 +202,9 @@ class Client:
                 - "batch_wait_timeout": time in seconds that backend replicas
                 will wait for a full batch of requests before
                 processing a partial batch.
+                - "batch_latency_slo_ms": if set, backend replicas adapt the
+                batch size and wait time to the load so that requests
+                complete within this latency.
                 - "max_concurrent_queries": the maximum number of queries
                 that will be sent to a replica of this backend
                 without receiving a response.
@@ -237,12 +262,22 @@ class Client:
                 - "batch_wait_timeout": time in seconds that backend replicas
                 will wait for a full batch of requests before processing a
                 partial batch.
+                - "batch_latency_slo_ms": if set, backend replicas adapt the
+                batch size and wait time to the load so that requests
+                complete within this latency.
+                - "executor": where synchronous handlers run: "event_loop"
+                (the default, one request at a time), "thread" or "process"
+                (a pool of "executor_max_workers" threads or processes).
                 - "max_concurrent_queries": the maximum number of queries that
                 will be sent to a replica of this backend without receiving a
                 response.
                 - "user_config" (experimental): Arguments to pass to the
                 reconfigure method of the backend. The reconfigure method is
                 called if "user_config" is not None.
+                - "autoscaling_config" (experimental): a dictionary enabling
+                autoscaling of the number of replicas. "policy" selects the
+                autoscaling policy ("basic" or "target_utilization"); the
+                other keys are passed to the policy.
             env (serve.CondaEnv, optional): conda environment to run this
                 backend in.  Requires the caller to be running in an activated
                 conda environment (not necessarily ``env``), and requires
@@ -280,16 +315,26 @@ class Client:
             is_blocking=replica_config.is_blocking)
 
         if isinstance(config, dict):
+            config = config.copy()
+            metadata.autoscaling_config = config.pop("autoscaling_config",
+                                                     None)
             backend_config = BackendConfig.parse_obj({
                 **config, "internal_metadata": metadata
             })
         elif isinstance(config, BackendConfig):
+            metadata.autoscaling_config = (
+                config.internal_metadata.autoscaling_config)
             backend_config = config.copy(
                 update={"internal_metadata": metadata})
         else:
             raise TypeError("config must be a BackendConfig or a dictionary.")
 
         backend_config._validate_complete()
+        if (backend_config.executor == "process"
+                and inspect.isclass(func_or_class)):
+            raise ValueError(
+                "The process executor is only supported for function "
+                "backends.")
         ray.get(
             self._controller.create_backend.remote(backend_tag, backend_config,
                                                    replica_config))
@@ -384,7 +429,8 @@ class Client:
 def start(detached: bool = False,
           http_host: str = DEFAULT_HTTP_HOST,
           http_port: int = DEFAULT_HTTP_PORT,
-          http_middlewares: List[Any] = []) -> Client:
+          http_middlewares: List[Any] = [],
+          http_proxies_per_node: int = 1) -> Client:
     """Initialize a serve instance.
 
     By default, the instance will be scoped to the lifetime of the returned
@@ -403,7 +449,17 @@ def start(detached: bool = False,
         http_port (int): Port for HTTP server. Defaults to 8000.
         http_middlewares (list): A list of Starlette middlewares that will be
             applied to the HTTP servers in the cluster.
+        http_proxies_per_node (int): Number of HTTP proxy actors to start on
+            each node. They share the port using SO_REUSEPORT, which lets
+            the HTTP ingress use more than one CPU core per node. Only
+            supported on platforms with SO_REUSEPORT. Defaults to 1.
     """
+    if not isinstance(http_proxies_per_node, int) or http_proxies_per_node < 1:
+        raise ValueError("http_proxies_per_node must be a positive integer.")
+    if http_proxies_per_node > 1 and not hasattr(socket, "SO_REUSEPORT"):
+        raise ValueError("http_proxies_per_node > 1 requires SO_REUSEPORT, "
+                         "which is not supported on this platform.")
+
     # Initialize ray if needed.
     if not ray.is_initialized():
         ray.init()
@@ -433,7 +489,8 @@ def start(detached: bool = False,
         http_host,
         http_port,
         http_middlewares,
-        detached=detached)
+        detached=detached,
+        num_http_proxies_per_node=http_proxies_per_node)
 
     if http_host is not None:
         futures = []
@@ -1,5 +1,10 @@
 from abc import ABCMeta, abstractmethod
+from collections import deque
+import math
+import time
+from typing import Callable, Dict, List, Optional
 
+from ray.serve.constants import DEFAULT_LATENCY_BUCKET_MS
 from ray.serve.utils import logger
 
 
@@ -17,6 +22,20 @@ class AutoscalingPolicy:
         """Initialize the policy using the specified config dictionary."""
         self.config = config
 
+    def record_replica_metrics(self, replica_tag: str, queue_length: int,
+                               latency_histogram: Optional[List[int]]):
+        """Record the metrics periodically reported by a replica.
+
+        Arguments:
+            replica_tag (str): The replica that sent the report.
+            queue_length (int): The number of requests currently in flight in
+                the replica.
+            latency_histogram (List[int]): Number of requests completed since
+                the last report, per DEFAULT_LATENCY_BUCKET_MS bucket (the
+                last element counts the requests above the largest bucket).
+        """
+        pass
+
     @abstractmethod
     def scale(self, router_queue_lens, curr_replicas):
         """Make a decision to scale backends.
@@ -135,3 +154,161 @@ class BasicAutoscalingPolicy(AutoscalingPolicy):
             self.decision_counter = 0
 
         return new_replicas
+
+
+class TargetUtilizationAutoscalingPolicy(AutoscalingPolicy):
+    """Autoscaling policy targeting a number of ongoing requests per replica.
+
+    Each period, the total number of requests in flight in the replicas (plus
+    any reported router queue) is averaged over a sliding window, and the
+    backend is sized so that each replica has
+    'target_ongoing_requests_per_replica' requests on average. If
+    'latency_slo_ms' is set and the p95 latency over the window is above it,
+    at least one replica is added; scaling down is held off while the p95
+    latency is above 'scale_down_latency_fraction' of the SLO. Separate
+    cooldowns after each scaling decision prevent oscillation.
+    """
+
+    def __init__(self, backend, config,
+                 clock: Callable[[], float] = time.time):
+        self.backend = backend
+        self.clock = clock
+
+        # The minimum number of replicas to scale down to.
+        self.min_replicas = config.get("min_replicas", 1)
+        # The maximum number of replicas to scale up to. -1 means there is no
+        # limit.
+        self.max_replicas = config.get("max_replicas", -1)
+        if self.max_replicas == -1:
+            self.max_replicas = float("inf")
+        # The desired average number of ongoing requests in each replica.
+        self.target_ongoing_requests_per_replica = config.get(
+            "target_ongoing_requests_per_replica", 2)
+        # Optional target for the p95 latency of the backend.
+        self.latency_slo_ms = config.get("latency_slo_ms", None)
+        # Don't scale down while the p95 latency is above this fraction of
+        # the latency SLO.
+        self.scale_down_latency_fraction = config.get(
+            "scale_down_latency_fraction", 0.5)
+        # The length of the window used to smooth the metrics.
+        self.smoothing_window_s = config.get("smoothing_window_s", 10)
+        # The minimum time between scaling up and the next scaling decision.
+        self.scale_up_cooldown_s = config.get("scale_up_cooldown_s", 5)
+        # The minimum time between any scaling and scaling down.
+        self.scale_down_cooldown_s = config.get("scale_down_cooldown_s", 30)
+
+        # Map replica_tag -> (report time, ongoing requests).
+        self.replica_queue_lengths: Dict[str, tuple] = dict()
+        # (time, latency histogram) reports within the window.
+        self.latency_samples = deque()
+        # (time, total ongoing requests) samples within the window.
+        self.load_samples = deque()
+        self.last_scale_time = -float("inf")
+
+    def record_replica_metrics(self, replica_tag, queue_length,
+                               latency_histogram):
+        now = self.clock()
+        self.replica_queue_lengths[replica_tag] = (now, queue_length)
+        if latency_histogram is not None and sum(latency_histogram) > 0:
+            self.latency_samples.append((now, list(latency_histogram)))
+
+    def _trim_window(self, now: float) -> None:
+        window_start = now - self.smoothing_window_s
+        for samples in [self.latency_samples, self.load_samples]:
+            while len(samples) > 0 and samples[0][0] < window_start:
+                samples.popleft()
+        # Forget replicas that stopped reporting, e.g. after scaling down.
+        self.replica_queue_lengths = {
+            replica_tag: report
+            for replica_tag, report in self.replica_queue_lengths.items()
+            if report[0] >= window_start
+        }
+
+    def latency_percentile_ms(self, percentile: float) -> Optional[float]:
+        """Estimate a latency percentile from the histograms in the window.
+
+        Returns the upper boundary of the bucket containing the percentile,
+        infinity if it's above the largest bucket, or None without data.
+        """
+        merged = [0] * (len(DEFAULT_LATENCY_BUCKET_MS) + 1)
+        for _, histogram in self.latency_samples:
+            for i, count in enumerate(histogram):
+                merged[i] += count
+        total = sum(merged)
+        if total == 0:
+            return None
+
+        cumulative = 0
+        for i, count in enumerate(merged):
+            cumulative += count
+            if cumulative >= percentile * total:
+                break
+        if i < len(DEFAULT_LATENCY_BUCKET_MS):
+            return DEFAULT_LATENCY_BUCKET_MS[i]
+        return float("inf")
+
+    def scale(self, router_queue_lens, curr_replicas):
+        now = self.clock()
+        self._trim_window(now)
+
+        total_load = sum(
+            queue_length
+            for _, queue_length in self.replica_queue_lengths.values()) + sum(
+                router_queue_lens.values())
+        self.load_samples.append((now, total_load))
+        avg_load = sum(load for _, load in self.load_samples) / len(
+            self.load_samples)
+
+        desired_replicas = math.ceil(
+            avg_load / self.target_ongoing_requests_per_replica)
+
+        p95_latency_ms = self.latency_percentile_ms(0.95)
+        if self.latency_slo_ms is not None and p95_latency_ms is not None:
+            if p95_latency_ms > self.latency_slo_ms:
+                desired_replicas = max(desired_replicas, curr_replicas + 1)
+            elif (p95_latency_ms >
+                  self.scale_down_latency_fraction * self.latency_slo_ms):
+                desired_replicas = max(desired_replicas, curr_replicas)
+
+        desired_replicas = max(self.min_replicas,
+                               min(self.max_replicas, desired_replicas))
+
+        since_last_scale_s = now - self.last_scale_time
+        if (desired_replicas > curr_replicas
+                and since_last_scale_s >= self.scale_up_cooldown_s):
+            logger.info("Increasing number of replicas for backend '{}' "
+                        "from {} to {}".format(self.backend, curr_replicas,
+                                               desired_replicas))
+        elif (desired_replicas < curr_replicas
+              and since_last_scale_s >= self.scale_down_cooldown_s):
+            logger.info("Decreasing number of replicas for backend '{}' "
+                        "from {} to {}".format(self.backend, curr_replicas,
+                                               desired_replicas))
+        else:
+            return curr_replicas
+
+        self.last_scale_time = now
+        # Metrics reported before scaling don't reflect the new replicas.
+        self.replica_queue_lengths.clear()
+        self.load_samples.clear()
+        self.latency_samples.clear()
+        return desired_replicas
+
+
+AUTOSCALING_POLICIES = {
+    "basic": BasicAutoscalingPolicy,
+    "target_utilization": TargetUtilizationAutoscalingPolicy,
+}
+
+
+def create_autoscaling_policy(backend, config) -> AutoscalingPolicy:
+    """Create the autoscaling policy named by config["policy"].
+
+    Defaults to BasicAutoscalingPolicy if no policy is specified.
+    """
+    policy_name = config.get("policy", "basic")
+    if policy_name not in AUTOSCALING_POLICIES:
+        raise ValueError(
+            "Unknown autoscaling policy '{}'. Available policies are {}.".
+            format(policy_name, list(AUTOSCALING_POLICIES.keys())))
+    return AUTOSCALING_POLICIES[policy_name](backend, config)
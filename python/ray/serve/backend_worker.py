@@ -1,61 +1,171 @@
 import asyncio
+import bisect
 import traceback
 import inspect
+import multiprocessing
 from collections.abc import Iterable
+from concurrent.futures import (Executor, ProcessPoolExecutor,
+                                ThreadPoolExecutor)
 from itertools import groupby
-from typing import Union, List, Any, Callable, Type
+from typing import Union, List, Any, Callable, Dict, Optional, Tuple, Type
 import time
 
 import ray
+import ray.cloudpickle as pickle
 from ray.actor import ActorHandle
 from ray.async_compat import sync_to_async
 
 from ray.serve.utils import (parse_request_item, _get_logger, chain_future,
-                             unpack_future)
+                             unpack_future, format_actor_name,
+                             get_random_letters)
+from ray.serve.http_util import ResponseStream
 from ray.serve.exceptions import RayServeException
 from ray.util import metrics
 from ray.serve.config import BackendConfig
 from ray.serve.long_poll import LongPollerAsyncClient
-from ray.serve.router import Query
+from ray.serve.router import Query, REPORT_QUEUE_LENGTH_PERIOD_S
 from ray.serve.constants import (DEFAULT_LATENCY_BUCKET_MS,
-                                 BACKEND_RECONFIGURE_METHOD)
+                                 BACKEND_RECONFIGURE_METHOD,
+                                 RESPONSE_STREAM_IDLE_TIMEOUT_S)
 from ray.exceptions import RayTaskError
 
 logger = _get_logger()
 
+# Smoothing factor for the moving averages used by adaptive batching.
+ADAPTIVE_BATCH_EWMA_ALPHA = 0.2
+
+# Once a chunk of a streamed response is ready, how long to keep pulling
+# more chunks from the generator before returning them.
+STREAM_FETCH_MAX_WAIT_S = 0.01
+
 
 class BatchQueue:
-    def __init__(self, max_batch_size: int, timeout_s: float) -> None:
+    def __init__(self,
+                 max_batch_size: int,
+                 timeout_s: float,
+                 latency_slo_s: Optional[float] = None) -> None:
         self.queue = asyncio.Queue()
         self.full_batch_event = asyncio.Event()
+        self.set_config(max_batch_size, timeout_s, latency_slo_s)
+
+        # Online estimates used in adaptive mode: the request arrival rate and
+        # a linear model of the batch execution time, fit with exponentially
+        # weighted moving sums so that it follows changes in the workload.
+        self.last_arrival_time: Optional[float] = None
+        self.ewma_interarrival_s: Optional[float] = None
+        self.exec_time_stats = [0.0] * 5  # weight, Sx, Sy, Sxx, Sxy
+
+    def set_config(self,
+                   max_batch_size: int,
+                   timeout_s: float,
+                   latency_slo_s: Optional[float] = None) -> None:
+        """Set the batching parameters.
+
+        If latency_slo_s is set, the queue runs in adaptive mode: the batch
+        size (bounded by max_batch_size) and wait time are chosen before each
+        batch so that waiting for and executing the batch is expected to fit
+        in the latency SLO. Otherwise max_batch_size and timeout_s are used
+        as-is.
+        """
         self.max_batch_size = max_batch_size
         self.timeout_s = timeout_s
-
-    def set_config(self, max_batch_size: int, timeout_s: float) -> None:
-        self.max_batch_size = max_batch_size
-        self.timeout_s = timeout_s
+        self.latency_slo_s = latency_slo_s
+        self.effective_batch_size = max_batch_size
+        self.effective_timeout_s = timeout_s
 
     def put(self, request: Query) -> None:
+        if self.latency_slo_s is not None:
+            now = time.time()
+            if self.last_arrival_time is not None:
+                interarrival_s = now - self.last_arrival_time
+                if self.ewma_interarrival_s is None:
+                    self.ewma_interarrival_s = interarrival_s
+                else:
+                    self.ewma_interarrival_s = (
+                        ADAPTIVE_BATCH_EWMA_ALPHA * interarrival_s +
+                        (1 - ADAPTIVE_BATCH_EWMA_ALPHA) *
+                        self.ewma_interarrival_s)
+            self.last_arrival_time = now
+
         self.queue.put_nowait(request)
         # Signal when the full batch is ready. The event will be reset
         # in wait_for_batch.
-        if self.queue.qsize() == self.max_batch_size:
+        if self.queue.qsize() >= self.effective_batch_size:
             self.full_batch_event.set()
 
     def qsize(self) -> int:
         return self.queue.qsize()
 
+    def observe_execution(self, batch_size: int, exec_time_s: float) -> None:
+        """Record how long it took to execute a batch of the given size."""
+        decay = 1 - ADAPTIVE_BATCH_EWMA_ALPHA
+        x, y = batch_size, exec_time_s
+        for i, value in enumerate([1, x, y, x * x, x * y]):
+            self.exec_time_stats[i] = decay * self.exec_time_stats[i] + value
+
+    def estimate_exec_time(self, batch_size: int) -> float:
+        """Estimate the execution time of a batch from past observations."""
+        weight, sx, sy, sxx, sxy = self.exec_time_stats
+        if weight == 0:
+            return 0.0
+        variance = weight * sxx - sx * sx
+        if variance <= 1e-9 * weight * sxx:
+            # Only one batch size has been observed, so we can't separate
+            # the fixed cost from the per-item cost. Assume it's all per-item,
+            # which overestimates the cost of larger batches.
+            return batch_size * sy / sx
+        per_item_s = max(0.0, (weight * sxy - sx * sy) / variance)
+        fixed_s = max(0.0, (sy - per_item_s * sx) / weight)
+        return fixed_s + per_item_s * batch_size
+
+    def _adapt(self) -> None:
+        """Choose the batch size and wait time for the next batch.
+
+        Picks the largest batch size for which the expected time to fill the
+        batch at the observed arrival rate plus its expected execution time
+        fits in the latency SLO. Both terms grow with the batch size, so we
+        can stop at the first size that doesn't fit.
+        """
+        queued = self.queue.qsize()
+        interarrival_s = self.ewma_interarrival_s
+
+        def fill_time_s(batch_size):
+            if batch_size <= queued:
+                return 0.0
+            if interarrival_s is None:
+                return float("inf")
+            return (batch_size - queued) * interarrival_s
+
+        batch_size = 1
+        for candidate in range(2, self.max_batch_size + 1):
+            if (fill_time_s(candidate) + self.estimate_exec_time(candidate) >
+                    self.latency_slo_s):
+                break
+            batch_size = candidate
+
+        self.effective_batch_size = batch_size
+        self.effective_timeout_s = min(
+            fill_time_s(batch_size),
+            max(0.0, self.latency_slo_s - self.estimate_exec_time(batch_size)))
+
     async def wait_for_batch(self) -> List[Query]:
-        """Wait for batch respecting self.max_batch_size and self.timeout_s.
+        """Wait for batch respecting the batch size and timeout.
 
-        Returns a batch of up to self.max_batch_size items, waiting for up
-        to self.timeout_s for a full batch. After the timeout, returns as many
-        items as are ready.
+        Returns a batch of up to self.effective_batch_size items, waiting for
+        up to self.effective_timeout_s for a full batch. After the timeout,
+        returns as many items as are ready. In adaptive mode, both values are
+        recomputed before waiting.
 
         Always returns a batch with at least one item - will block
         indefinitely until an item comes in.
         """
-        curr_timeout = self.timeout_s
+        if self.latency_slo_s is not None:
+            self._adapt()
+            if self.queue.qsize() >= self.effective_batch_size:
+                self.full_batch_event.set()
+
+        max_batch_size = self.effective_batch_size
+        curr_timeout = self.effective_timeout_s
         batch = []
         while len(batch) == 0:
             loop_start = time.time()
@@ -74,12 +184,12 @@ class BatchQueue:
                     pass
 
             # Pull up to the max_batch_size requests off the queue.
-            while len(batch) < self.max_batch_size and not self.queue.empty():
+            while len(batch) < max_batch_size and not self.queue.empty():
                 batch.append(self.queue.get_nowait())
 
             # Reset the event if there are fewer than max_batch_size requests
             # in the queue.
-            if (self.queue.qsize() < self.max_batch_size
+            if (self.queue.qsize() < max_batch_size
                     and self.full_batch_event.is_set()):
                 self.full_batch_event.clear()
 
@@ -113,13 +223,20 @@ def create_backend_replica(func_or_class: Union[Callable, Type[Callable]]):
 
             assert controller_name, "Must provide a valid controller_name"
             controller_handle = ray.get_actor(controller_name)
-            self.backend = RayServeReplica(backend_tag, replica_tag, _callable,
-                                           backend_config, is_function,
-                                           controller_handle)
+            self.backend = RayServeReplica(
+                backend_tag, replica_tag, _callable, backend_config,
+                is_function, controller_handle,
+                format_actor_name(replica_tag, controller_name))
 
         async def handle_request(self, request):
             return await self.backend.handle_request(request)
 
+        async def next_stream_chunks(self, stream_id, max_chunks):
+            return await self.backend.next_stream_chunks(stream_id, max_chunks)
+
+        def close_stream(self, stream_id):
+            self.backend.close_stream(stream_id)
+
         def ready(self):
             pass
 
@@ -143,23 +260,69 @@ def ensure_async(func: Callable) -> Callable:
     return sync_to_async(func)
 
 
+# The backend function, in the worker processes of the "process" executor.
+_process_pool_callable = None
+
+
+def _init_process_pool_worker(serialized_callable: bytes) -> None:
+    global _process_pool_callable
+    _process_pool_callable = pickle.loads(serialized_callable)
+
+
+def _call_in_process_pool_worker(arg: Any) -> Any:
+    result = _process_pool_callable(arg)
+    if inspect.isgenerator(result) or inspect.isasyncgen(result):
+        raise RayServeException(
+            "Streaming backends can't use the 'process' executor, the "
+            "generators they return can't be sent back from the executor "
+            "processes. Use the 'thread' executor instead.")
+    return result
+
+
 class RayServeReplica:
     """Handles requests with the provided callable."""
 
-    def __init__(self, backend_tag: str, replica_tag: str, _callable: Callable,
-                 backend_config: BackendConfig, is_function: bool,
-                 controller_handle: ActorHandle) -> None:
+    def __init__(self,
+                 backend_tag: str,
+                 replica_tag: str,
+                 _callable: Callable,
+                 backend_config: BackendConfig,
+                 is_function: bool,
+                 controller_handle: ActorHandle,
+                 actor_name: Optional[str] = None) -> None:
         self.backend_tag = backend_tag
         self.replica_tag = replica_tag
         self.callable = _callable
         self.is_function = is_function
+        # The name of the actor running this replica and its handle, looked
+        # up on the first streamed response. The handle is passed to the
+        # callers to fetch the chunks of streamed responses.
+        self.actor_name = actor_name
+        self.actor_handle: Optional[ActorHandle] = None
+
+        # Map stream_id -> generator returned by the backend that hasn't been
+        # fully consumed yet, and stream_id -> last time it was fetched from.
+        self.streams = dict()
+        self.stream_access_times: Dict[str, float] = dict()
 
         self.config = backend_config
+        # Executor for synchronous handlers, None to run them on the event
+        # loop. The semaphore bounds the requests taken from the batch queue
+        # to the number of workers of the executor.
+        self.executor: Optional[Executor] = None
+        self.executor_semaphore: Optional[asyncio.Semaphore] = None
+        self.executor_config: Optional[Tuple[str, int]] = None
+        self._update_executor()
         self.batch_queue = BatchQueue(self.config.max_batch_size or 1,
-                                      self.config.batch_wait_timeout)
+                                      self.config.batch_wait_timeout,
+                                      self._get_batch_latency_slo_s())
         self.reconfigure(self.config.user_config)
 
         self.num_ongoing_requests = 0
+        # Counts of the requests completed since the last report to the
+        # controller, bucketed by DEFAULT_LATENCY_BUCKET_MS.
+        self.latency_histogram = [0] * (len(DEFAULT_LATENCY_BUCKET_MS) + 1)
+        self.controller_handle = controller_handle
 
         self.request_counter = metrics.Count(
             "backend_request_counter",
@@ -230,9 +393,95 @@ class RayServeReplica:
             "replica_tag": self.replica_tag
         })
 
+        self.batch_size_gauge = metrics.Gauge(
+            "backend_batch_size",
+            description=("The batch size chosen for the most recent batch. "
+                         "Varies over time if adaptive batching is enabled."),
+            tag_keys=("backend", "replica_tag"))
+        self.batch_size_gauge.set_default_tags({
+            "backend": self.backend_tag,
+            "replica_tag": self.replica_tag
+        })
+
+        self.batch_wait_timeout_gauge = metrics.Gauge(
+            "backend_batch_wait_timeout_ms",
+            description=("The time waited for a full batch before processing "
+                         "the most recent batch."),
+            tag_keys=("backend", "replica_tag"))
+        self.batch_wait_timeout_gauge.set_default_tags({
+            "backend": self.backend_tag,
+            "replica_tag": self.replica_tag
+        })
+
         self.restart_counter.record(1)
 
         asyncio.get_event_loop().create_task(self.main_loop())
+        asyncio.get_event_loop().create_task(self.report_metrics_loop())
+        asyncio.get_event_loop().create_task(self.close_idle_streams_loop())
+
+    def _get_batch_latency_slo_s(self) -> Optional[float]:
+        if self.config.batch_latency_slo_ms is None:
+            return None
+        return self.config.batch_latency_slo_ms / 1000
+
+    def _update_executor(self) -> None:
+        """Create the executor for sync handlers if its config changed."""
+        executor_config = (self.config.executor,
+                           self.config.executor_max_workers)
+        if executor_config == self.executor_config:
+            return
+        self.executor_config = executor_config
+
+        if self.executor is not None:
+            # Requests already submitted to the old executor still complete.
+            self.executor.shutdown(wait=False)
+            self.executor = None
+            self.executor_semaphore = None
+
+        executor_name, max_workers = executor_config
+        if executor_name == "process" and not self.is_function:
+            logger.error("The process executor is only supported for "
+                         "function backends, using the thread executor "
+                         "for backend {}.".format(self.backend_tag))
+            executor_name = "thread"
+
+        if executor_name == "thread":
+            self.executor = ThreadPoolExecutor(
+                max_workers, thread_name_prefix=self.replica_tag)
+        elif executor_name == "process":
+            # Forking a process running a core worker isn't safe, spawn new
+            # Python processes instead.
+            self.executor = ProcessPoolExecutor(
+                max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_process_pool_worker,
+                initargs=(pickle.dumps(self.callable), ))
+        if self.executor is not None:
+            self.executor_semaphore = asyncio.Semaphore(max_workers)
+
+    def _uses_process_pool(self) -> bool:
+        # Requests sent to the executor processes are pickled, so their
+        # bodies can't be streamed from the object store.
+        return isinstance(self.executor, ProcessPoolExecutor)
+
+    def _make_async(self, method: Callable) -> Callable:
+        """Wrap a handler into a coroutine function.
+
+        Sync handlers run in the executor if there's one, async handlers
+        always run on the event loop.
+        """
+        if self.executor is None or inspect.iscoroutinefunction(method):
+            return ensure_async(method)
+
+        executor = self.executor
+        if isinstance(executor, ProcessPoolExecutor):
+            method = _call_in_process_pool_worker
+
+        async def run_in_executor(arg):
+            return await asyncio.get_event_loop().run_in_executor(
+                executor, method, arg)
+
+        return run_in_executor
 
     def get_runner_method(self, request_item: Query) -> Callable:
         method_name = request_item.metadata.call_method
@@ -248,8 +497,9 @@ class RayServeReplica:
     async def invoke_single(self, request_item: Query) -> Any:
         logger.debug("Replica {} started executing request {}".format(
             self.replica_tag, request_item.metadata.request_id))
-        method_to_call = ensure_async(self.get_runner_method(request_item))
-        arg = parse_request_item(request_item)
+        method_to_call = self._make_async(self.get_runner_method(request_item))
+        arg = parse_request_item(
+            request_item, load_body=self._uses_process_pool())
 
         start = time.time()
         try:
@@ -277,7 +527,8 @@ class RayServeReplica:
         for item in request_item_list:
             logger.debug("Replica {} started executing request {}".format(
                 self.replica_tag, item.metadata.request_id))
-            args.append(parse_request_item(item))
+            args.append(
+                parse_request_item(item, load_body=self._uses_process_pool()))
             call_methods.add(self.get_runner_method(item))
 
         timing_start = time.time()
@@ -290,7 +541,7 @@ class RayServeReplica:
 
             self.request_counter.record(batch_size)
 
-            call_method = ensure_async(call_methods.pop())
+            call_method = self._make_async(call_methods.pop())
             result_list = await call_method(args)
 
             if not isinstance(result_list, Iterable) or isinstance(
@@ -319,6 +570,7 @@ class RayServeReplica:
         latency_ms = (time.time() - timing_start) * 1000
         self.processing_latency_tracker.record(
             latency_ms, tags={"batch_size": str(batch_size)})
+        self.batch_queue.observe_execution(batch_size, latency_ms / 1000)
 
         return result_list
 
@@ -327,9 +579,19 @@ class RayServeReplica:
             # NOTE(simon): There's an issue when user updated batch size and
             # batch wait timeout during the execution, these values will not be
             # updated until after the current iteration.
+            semaphore = None
+            if (self.executor_semaphore is not None
+                    and self.config.internal_metadata.is_blocking):
+                # Wait for a free executor worker before taking requests
+                # from the queue, so they're queued (and batched) here.
+                semaphore = self.executor_semaphore
+                await semaphore.acquire()
             batch = await self.batch_queue.wait_for_batch()
 
             # Record metrics
+            self.batch_size_gauge.record(self.batch_queue.effective_batch_size)
+            self.batch_wait_timeout_gauge.record(
+                self.batch_queue.effective_timeout_s * 1000)
             self.num_queued_items.record(self.batch_queue.qsize())
             self.num_processing_items.record(self.num_ongoing_requests -
                                              self.batch_queue.qsize())
@@ -357,11 +619,39 @@ class RayServeReplica:
                     chain_future(
                         unpack_future(evaluated, len(group)), result_futures)
 
-            if self.config.internal_metadata.is_blocking:
+            if semaphore is not None:
+                all_evaluated = asyncio.ensure_future(
+                    asyncio.wait(all_evaluated_futures))
+                all_evaluated.add_done_callback(
+                    lambda _, semaphore=semaphore: semaphore.release())
+            elif self.config.internal_metadata.is_blocking:
                 # We use asyncio.wait here so if the result is exception,
                 # it will not be raised.
                 await asyncio.wait(all_evaluated_futures)
 
+    async def report_metrics_loop(self) -> None:
+        """Periodically report the queue length and latencies.
+
+        The controller broadcasts the queue lengths to the routers so that
+        queue-length aware replica selection sees queries sent by every
+        router, and feeds both metrics to the backend's autoscaling policy.
+        """
+        last_reported = None
+        while True:
+            if (self.num_ongoing_requests != last_reported
+                    or any(self.latency_histogram)):
+                last_reported = self.num_ongoing_requests
+                latency_histogram = self.latency_histogram
+                self.latency_histogram = [0] * len(latency_histogram)
+                try:
+                    await self.controller_handle.report_replica_metrics.remote(
+                        self.backend_tag, self.replica_tag, last_reported,
+                        latency_histogram)
+                except ray.exceptions.RayActorError:
+                    # The controller is being shut down or restarted.
+                    last_reported = None
+            await asyncio.sleep(REPORT_QUEUE_LENGTH_PERIOD_S)
+
     def reconfigure(self, user_config) -> None:
         if user_config:
             if self.is_function:
@@ -384,8 +674,10 @@ class RayServeReplica:
 
     def _update_config(self, new_config: BackendConfig) -> None:
         self.config = new_config
+        self._update_executor()
         self.batch_queue.set_config(self.config.max_batch_size or 1,
-                                    self.config.batch_wait_timeout)
+                                    self.config.batch_wait_timeout,
+                                    self._get_batch_latency_slo_s())
         self.reconfigure(self.config.user_config)
 
     async def handle_request(self,
@@ -404,6 +696,90 @@ class RayServeReplica:
         request_time_ms = (time.time() - request.tick_enter_replica) * 1000
         logger.debug("Replica {} finished request {} in {:.2f}ms".format(
             self.replica_tag, request.metadata.request_id, request_time_ms))
+        self.latency_histogram[bisect.bisect_left(DEFAULT_LATENCY_BUCKET_MS,
+                                                  request_time_ms)] += 1
 
         self.num_ongoing_requests -= 1
+
+        if self._is_stream(result):
+            result = self._register_stream(result)
         return result
+
+    def _is_stream(self, result: Any) -> bool:
+        # Only generators are streamed, other iterators returned by the
+        # backend (e.g. map objects or files) are returned as they are.
+        return self.actor_name is not None and (inspect.isgenerator(result)
+                                                or inspect.isasyncgen(result))
+
+    def _register_stream(self, stream: Any) -> ResponseStream:
+        stream_id = get_random_letters(10)
+        self.streams[stream_id] = stream
+        self.stream_access_times[stream_id] = time.time()
+        logger.debug("Replica {} started response stream {}".format(
+            self.replica_tag, stream_id))
+        if self.actor_handle is None:
+            self.actor_handle = ray.get_actor(self.actor_name)
+        return ResponseStream(self.actor_handle, self.actor_name, stream_id)
+
+    async def next_stream_chunks(self, stream_id: str,
+                                 max_chunks: int) -> Tuple[List[Any], bool]:
+        """Pull the next chunks from a streamed response.
+
+        Returns up to max_chunks chunks and whether the stream is exhausted.
+        Returns early if the generator is slow to produce more chunks.
+        """
+        if stream_id not in self.streams:
+            raise RayServeException(
+                f"Response stream {stream_id} doesn't exist, it was either "
+                "fully consumed or closed after not being fetched from for "
+                f"{RESPONSE_STREAM_IDLE_TIMEOUT_S}s.")
+        stream = self.streams[stream_id]
+        # Not idle while the chunks are produced, however long it takes.
+        self.stream_access_times[stream_id] = float("inf")
+        chunks = []
+        is_done = False
+        start = time.time()
+        try:
+            while len(chunks) < max_chunks:
+                if inspect.isasyncgen(stream):
+                    chunks.append(await stream.__anext__())
+                else:
+                    chunks.append(next(stream))
+                if time.time() - start > STREAM_FETCH_MAX_WAIT_S:
+                    break
+        except (StopIteration, StopAsyncIteration):
+            is_done = True
+        except Exception:
+            self.error_counter.record(1)
+            self._remove_stream(stream_id)
+            raise
+
+        if is_done:
+            self._remove_stream(stream_id)
+        else:
+            self.stream_access_times[stream_id] = time.time()
+        return chunks, is_done
+
+    def _remove_stream(self, stream_id: str) -> Any:
+        self.stream_access_times.pop(stream_id, None)
+        return self.streams.pop(stream_id, None)
+
+    def close_stream(self, stream_id: str) -> None:
+        """Drop a streamed response that the caller stopped consuming."""
+        stream = self._remove_stream(stream_id)
+        if inspect.isasyncgen(stream):
+            asyncio.get_event_loop().create_task(stream.aclose())
+        elif stream is not None:
+            stream.close()
+
+    async def close_idle_streams_loop(self) -> None:
+        """Periodically close the streams that the callers abandoned."""
+        while True:
+            await asyncio.sleep(RESPONSE_STREAM_IDLE_TIMEOUT_S / 2)
+            deadline = time.time() - RESPONSE_STREAM_IDLE_TIMEOUT_S
+            for stream_id, access_time in list(
+                    self.stream_access_times.items()):
+                if access_time < deadline:
+                    logger.debug("Replica {} closing idle stream {}".format(
+                        self.replica_tag, stream_id))
+                    self.close_stream(stream_id)
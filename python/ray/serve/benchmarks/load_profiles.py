@@ -0,0 +1,261 @@
+# Reproducible latency and throughput benchmark for Serve on a local cluster.
+#
+# Load generator actors send requests over HTTP or through serve handles
+# following an open-loop arrival process: requests are sent at their
+# scheduled time whether or not earlier ones completed, and latencies are
+# measured from the scheduled time so that a slow server isn't hidden by the
+# clients backing off. Every combination of --num-replicas, --max-batch-size,
+# --profile and --transport is run against a backend whose batches take
+# --batch-ms, and the results are written as JSON:
+#
+#   [{"num_replicas": 1, "max_batch_size": 1, "profile": "poisson",
+#     "transport": "http", "num_requests": 1500, "num_errors": 0,
+#     "throughput": 99.8, "p50_ms": 3.1, "p95_ms": 5.2, "p99_ms": 8.4}, ...]
+#
+# Passing a previous output as --baseline exits with an error if the p99
+# latency or the throughput of any run regressed by more than --tolerance.
+#
+# Usage:
+#   python load_profiles.py --num-replicas 1,4 --max-batch-size 1,8 \
+#       --profile poisson,bursty,step --rate 200 --output results.json
+
+import asyncio
+import json
+import sys
+import time
+
+import aiohttp
+import click
+import numpy as np
+
+import ray
+from ray import serve
+from ray.serve.handle import RayServeHandle
+
+ENDPOINT = "load_profiles"
+
+
+def poisson_arrivals(rate, duration_s, rng):
+    """Arrival times of a Poisson process with the given rate."""
+    num_requests = rng.poisson(rate * duration_s)
+    return np.sort(rng.uniform(0, duration_s, num_requests))
+
+
+def bursty_arrivals(rate, duration_s, rng, burst_size=20):
+    """Bursts of burst_size requests arriving as a Poisson process.
+
+    The average rate is the same as poisson_arrivals, but requests come in
+    groups arriving within a millisecond.
+    """
+    bursts = poisson_arrivals(rate / burst_size, duration_s, rng)
+    arrivals = np.repeat(bursts, burst_size) + rng.uniform(
+        0, 0.001,
+        len(bursts) * burst_size)
+    return np.sort(arrivals[arrivals < duration_s])
+
+
+def step_arrivals(rate, duration_s, rng, steps=(0.25, 1.0, 0.5)):
+    """Poisson arrivals whose rate steps through fractions of rate."""
+    step_s = duration_s / len(steps)
+    return np.concatenate([
+        i * step_s + poisson_arrivals(rate * fraction, step_s, rng)
+        for i, fraction in enumerate(steps)
+    ])
+
+
+LOAD_PROFILES = {
+    "poisson": poisson_arrivals,
+    "bursty": bursty_arrivals,
+    "step": step_arrivals,
+}
+
+
+def make_backend(batch_ms):
+    @serve.accept_batch
+    def backend(requests):
+        time.sleep(batch_ms / 1000)
+        return [b"ok"] * len(requests)
+
+    return backend
+
+
+@ray.remote(num_cpus=0)
+class LoadGenerator:
+    async def run(self, transport, arrivals):
+        """Send one request at each arrival time, return the latencies.
+
+        Failed requests have a latency of NaN.
+        """
+        if transport == "http":
+            session = aiohttp.ClientSession()
+
+            async def send():
+                async with session.get("http://127.0.0.1:8000/" +
+                                       ENDPOINT) as response:
+                    await response.text()
+                    if response.status != 200:
+                        raise RuntimeError(response.status)
+        else:
+            handle = RayServeHandle(
+                serve.connect()._controller, ENDPOINT, sync=False)
+
+            async def send():
+                await (await handle._remote_async(None))
+
+        async def timed_send(scheduled):
+            try:
+                await send()
+                return time.perf_counter() - scheduled
+            except Exception:
+                return float("nan")
+
+        start = time.perf_counter()
+        tasks = []
+        for arrival in arrivals:
+            delay = start + arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(timed_send(start + arrival)))
+        latencies = await asyncio.gather(*tasks)
+
+        if transport == "http":
+            await session.close()
+        return latencies
+
+
+def run_profile(generators, transport, arrivals):
+    # Spread the requests over the load generators round robin.
+    start = time.time()
+    latencies = np.concatenate(
+        ray.get([
+            generator.run.remote(transport,
+                                 arrivals[i::len(generators)].tolist())
+            for i, generator in enumerate(generators)
+        ]))
+    duration = time.time() - start
+
+    succeeded = latencies[~np.isnan(latencies)] * 1000
+    result = {
+        "num_requests": len(latencies),
+        "num_errors": int(np.isnan(latencies).sum()),
+        "throughput": len(succeeded) / duration,
+    }
+    for percentile in [50, 95, 99]:
+        result["p{}_ms".format(percentile)] = None
+        if len(succeeded) > 0:
+            result["p{}_ms".format(percentile)] = float(
+                np.percentile(succeeded, percentile))
+    return result
+
+
+def find_regressions(results, baseline, tolerance):
+    key_fields = ["num_replicas", "max_batch_size", "profile", "transport"]
+    baseline_by_key = {
+        tuple(run[field] for field in key_fields): run
+        for run in baseline
+    }
+    regressions = []
+    for run in results:
+        key = tuple(run[field] for field in key_fields)
+        expected = baseline_by_key.get(key)
+        if expected is None:
+            continue
+        if (run["p99_ms"] is not None and expected["p99_ms"] is not None
+                and run["p99_ms"] > expected["p99_ms"] * (1 + tolerance)):
+            regressions.append("{}: p99 {:.2f}ms > baseline {:.2f}ms".format(
+                key, run["p99_ms"], expected["p99_ms"]))
+        if run["throughput"] < expected["throughput"] * (1 - tolerance):
+            regressions.append(
+                "{}: throughput {:.2f} < baseline {:.2f}".format(
+                    key, run["throughput"], expected["throughput"]))
+    return regressions
+
+
+def parse_int_list(ctx, param, value):
+    return [int(v) for v in value.split(",")]
+
+
+def parse_str_list(ctx, param, value):
+    return value.split(",")
+
+
+@click.command()
+@click.option("--num-replicas", default="1", callback=parse_int_list)
+@click.option("--max-batch-size", default="1", callback=parse_int_list)
+@click.option(
+    "--profile", default="poisson,bursty,step", callback=parse_str_list)
+@click.option("--transport", default="http,handle", callback=parse_str_list)
+@click.option("--rate", type=float, default=100, help="Requests per second.")
+@click.option("--duration-s", type=float, default=10)
+@click.option("--batch-ms", type=float, default=1)
+@click.option("--num-clients", type=int, default=4)
+@click.option("--seed", type=int, default=0)
+@click.option("--output", type=click.Path(), default=None)
+@click.option("--baseline", type=click.Path(exists=True), default=None)
+@click.option("--tolerance", type=float, default=0.1)
+def main(num_replicas, max_batch_size, profile, transport, rate, duration_s,
+         batch_ms, num_clients, seed, output, baseline, tolerance):
+    for name in profile:
+        if name not in LOAD_PROFILES:
+            raise click.BadParameter("Unknown profile '{}', available "
+                                     "profiles are {}.".format(
+                                         name, list(LOAD_PROFILES)))
+
+    ray.init(log_to_driver=False)
+    client = serve.start(detached=True)
+    client.create_backend(
+        ENDPOINT,
+        make_backend(batch_ms),
+        config={
+            "num_replicas": num_replicas[0],
+            "max_batch_size": max_batch_size[0]
+        })
+    client.create_endpoint(ENDPOINT, backend=ENDPOINT, route="/" + ENDPOINT)
+    generators = [LoadGenerator.remote() for _ in range(num_clients)]
+
+    results = []
+    for replicas in num_replicas:
+        for batch_size in max_batch_size:
+            client.update_backend_config(
+                ENDPOINT, {
+                    "num_replicas": replicas,
+                    "max_batch_size": batch_size,
+                    "max_concurrent_queries": 2 * batch_size
+                })
+            for profile_name in profile:
+                for transport_name in transport:
+                    # Warm up the routers and the connections.
+                    run_profile(generators, transport_name,
+                                np.linspace(0, 1, 10))
+
+                    rng = np.random.RandomState(seed)
+                    arrivals = LOAD_PROFILES[profile_name](rate, duration_s,
+                                                           rng)
+                    result = {
+                        "num_replicas": replicas,
+                        "max_batch_size": batch_size,
+                        "profile": profile_name,
+                        "transport": transport_name,
+                    }
+                    result.update(
+                        run_profile(generators, transport_name, arrivals))
+                    print(json.dumps(result))
+                    results.append(result)
+
+    client.shutdown()
+
+    if output is not None:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if baseline is not None:
+        with open(baseline) as f:
+            regressions = find_regressions(results, json.load(f), tolerance)
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        if len(regressions) > 0:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
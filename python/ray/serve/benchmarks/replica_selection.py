@@ -0,0 +1,107 @@
+# Compares the replica selection policies under skewed request cost.
+#
+# Several client actors, each with its own serve handle (and therefore its own
+# router), send requests to a backend where a small fraction of requests is
+# much more expensive than the rest. With round robin, each router only knows
+# about its own in-flight queries, so the slow requests pile up on a few
+# replicas. With power of two choices, routers also use the queue lengths
+# reported by the replicas.
+#
+# Usage:
+#   python replica_selection.py --num-replicas 8 --num-clients 8
+
+import time
+
+import click
+import numpy as np
+
+import ray
+from ray import serve
+
+
+def skewed_backend(request):
+    time.sleep(request.data)
+    return b"ok"
+
+
+@ray.remote(num_cpus=0)
+class Client:
+    def __init__(self):
+        self.handle = serve.connect().get_handle("skewed", missing_ok=True)
+
+    def run(self, costs):
+        latencies = []
+        refs = []
+        starts = []
+        for cost in costs:
+            starts.append(time.perf_counter())
+            refs.append(self.handle.remote(cost))
+            # Keep a bounded number of queries in flight per client.
+            if len(refs) >= 4:
+                ray.get(refs.pop(0))
+                latencies.append(time.perf_counter() - starts.pop(0))
+        for ref, start in zip(refs, starts):
+            ray.get(ref)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+
+def generate_costs(num_queries, slow_fraction, slow_s, fast_s, seed):
+    rng = np.random.RandomState(seed)
+    is_slow = rng.random_sample(num_queries) < slow_fraction
+    return np.where(is_slow, slow_s, fast_s).tolist()
+
+
+@click.command()
+@click.option("--num-replicas", type=int, default=8)
+@click.option("--num-clients", type=int, default=8)
+@click.option("--num-queries", type=int, default=500)
+@click.option("--slow-fraction", type=float, default=0.1)
+@click.option("--slow-ms", type=float, default=100)
+@click.option("--fast-ms", type=float, default=1)
+def main(num_replicas, num_clients, num_queries, slow_fraction, slow_ms,
+         fast_ms):
+    ray.init()
+    client = serve.start(detached=True, http_host=None)
+
+    for policy in ["round_robin", "power_of_two"]:
+        client.create_backend(
+            "skewed",
+            skewed_backend,
+            config={
+                "num_replicas": num_replicas,
+                "max_concurrent_queries": 4,
+                "replica_selection_policy": policy,
+            })
+        client.create_endpoint("skewed", backend="skewed")
+
+        clients = [Client.remote() for _ in range(num_clients)]
+        # Warm up the routers and let the replicas report queue lengths.
+        ray.get([c.run.remote([0] * 10) for c in clients])
+        time.sleep(2)
+
+        start = time.time()
+        latencies = ray.get([
+            c.run.remote(
+                generate_costs(num_queries, slow_fraction, slow_ms / 1000,
+                               fast_ms / 1000, seed))
+            for seed, c in enumerate(clients)
+        ])
+        duration = time.time() - start
+        latencies_ms = np.concatenate(latencies) * 1000
+
+        print("{}: {:.2f} requests/s, p50 {:.2f}ms, p99 {:.2f}ms".format(
+            policy,
+            len(latencies_ms) / duration, np.percentile(latencies_ms, 50),
+            np.percentile(latencies_ms, 99)))
+
+        for c in clients:
+            ray.kill(c)
+        client.delete_endpoint("skewed")
+        client.delete_backend("skewed")
+
+    client.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 import inspect
 
-from pydantic import BaseModel, PositiveInt, validator
-from ray.serve.constants import ASYNC_CONCURRENCY
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, PositiveFloat, PositiveInt, validator
+from ray.serve.constants import (ASYNC_CONCURRENCY, BACKEND_EXECUTOR_NAMES,
+                                 REPLICA_SELECTION_POLICY_NAMES)
+from typing import Any, Callable, Dict, Optional
 from dataclasses import dataclass
 
 
@@ -41,6 +42,22 @@ class BackendConfig(BaseModel):
         wait for a full batch of requests before processing a partial batch.
         Defaults to 0.
     :type batch_wait_timeout: float, optional
+    :param batch_latency_slo_ms: If set, enables adaptive batching: before
+        each batch, replicas choose a batch size (up to max_batch_size) and a
+        wait time from the observed request arrival rate and batch execution
+        time so that requests are expected to complete within this latency.
+        batch_wait_timeout is ignored in this mode. Defaults to None.
+    :type batch_latency_slo_ms: float, optional
+    :param executor: Where replicas run synchronous handlers. "event_loop"
+        runs them on the replica's event loop, one at a time. "thread" runs
+        them in a pool of threads and "process" (function backends only) in
+        a pool of processes, so up to executor_max_workers requests are
+        handled concurrently. Async handlers always run on the event loop.
+        Defaults to "event_loop".
+    :type executor: str, optional
+    :param executor_max_workers: The number of threads or processes in the
+        executor. Defaults to 4.
+    :type executor_max_workers: int, optional
     :param max_concurrent_queries: The maximum number of queries that will be
         sent to a replica of this backend without receiving a response.
         Defaults to None (no maximum).
@@ -49,14 +66,23 @@ class BackendConfig(BaseModel):
         backend. The reconfigure method is called if user_config is not
         None.
     :type user_config: Any, optional
+    :param replica_selection_policy: How routers pick a replica for each
+        query. "round_robin" cycles through the replicas, "power_of_two"
+        samples two replicas and picks the one with the shorter queue.
+        Defaults to "round_robin".
+    :type replica_selection_policy: str, optional
     """
 
     internal_metadata: BackendMetadata = BackendMetadata()
     num_replicas: PositiveInt = 1
     max_batch_size: Optional[PositiveInt] = None
     batch_wait_timeout: float = 0
+    batch_latency_slo_ms: Optional[PositiveFloat] = None
+    executor: str = "event_loop"
+    executor_max_workers: PositiveInt = 4
     max_concurrent_queries: Optional[int] = None
     user_config: Any = None
+    replica_selection_policy: str = "round_robin"
 
     class Config:
         validate_assignment = True
@@ -73,12 +99,34 @@ class BackendConfig(BaseModel):
                 "@serve.accept_batch to explicitly mark that the function or "
                 "method accepts a list of requests as an argument.")
 
+        if self.batch_latency_slo_ms is not None and (
+                self.max_batch_size is None
+                or not self.internal_metadata.accepts_batches):
+            raise ValueError(
+                "batch_latency_slo_ms is set in config but adaptive batching "
+                "requires max_batch_size to be set and the function or method "
+                "to accept batches using @serve.accept_batch.")
+
     # This is not a pydantic validator, so that we may skip this method when
     # creating partially filled BackendConfig objects to pass as updates--for
     # example, BackendConfig(max_batch_size=5).
     def _validate_complete(self):
         self._validate_batch_size()
 
+    @validator("executor")
+    def check_executor(cls, v):  # noqa 805
+        if v not in BACKEND_EXECUTOR_NAMES:
+            raise ValueError(f"executor must be one of "
+                             f"{BACKEND_EXECUTOR_NAMES}, got '{v}'.")
+        return v
+
+    @validator("replica_selection_policy")
+    def check_replica_selection_policy(cls, v):  # noqa 805
+        if v not in REPLICA_SELECTION_POLICY_NAMES:
+            raise ValueError(f"replica_selection_policy must be one of "
+                             f"{REPLICA_SELECTION_POLICY_NAMES}, got '{v}'.")
+        return v
+
     # Dynamic default for max_concurrent_queries
     @validator("max_concurrent_queries", always=True)
     def set_max_queries_by_mode(cls, v, values):  # noqa 805
@@ -107,6 +155,14 @@ class BackendConfig(BaseModel):
                     and values["max_batch_size"] is not None
                     and values["batch_wait_timeout"] > 0):
                 v = 2 * values["max_batch_size"]
+
+            # Executor mode: sync handlers run concurrently in a pool, keep
+            # each worker of the pool busy with double buffering.
+            if (values["internal_metadata"].is_blocking
+                    and values.get("executor", "event_loop") != "event_loop"
+                    and "executor_max_workers" in values):
+                v = 2 * values["executor_max_workers"] * (
+                    values.get("max_batch_size") or 1)
         return v
 
 
@@ -191,3 +247,34 @@ class ReplicaConfig:
                 raise TypeError(
                     "resources in ray_actor_options must be a dictionary.")
             self.resource_dict.update(custom_resources)
+
+
+class ResponseCacheConfig(BaseModel):
+    """Configuration options for caching the responses of an endpoint.
+
+    Routers cache the responses of the endpoint so repeated identical
+    requests are answered without calling a replica. Only enable this for
+    endpoints whose responses depend only on the request content.
+
+    :param ttl_s: How long a cached response stays valid, in seconds.
+        Defaults to None (no expiration).
+    :type ttl_s: float, optional
+    :param max_bytes: The maximum total size of the cached responses in each
+        router. The least recently used responses are evicted beyond this.
+        Defaults to 64MiB.
+    :type max_bytes: int, optional
+    :param key_fn: Function called with the request's
+        ``ray.serve.router.Query`` that returns a hashable cache key, or None
+        to skip the cache for this request. Defaults to a key built from the
+        HTTP method, path, query string and body, or from the arguments of
+        Python requests.
+    :type key_fn: Callable, optional
+    """
+
+    ttl_s: Optional[PositiveFloat] = None
+    max_bytes: PositiveInt = 64 * 1024 * 1024
+    key_fn: Optional[Callable] = None
+
+    class Config:
+        validate_assignment = True
+        extra = "forbid"
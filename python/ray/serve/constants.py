@@ -16,6 +16,17 @@ DEFAULT_HTTP_PORT = 8000
 #: Max concurrency
 ASYNC_CONCURRENCY = int(1e6)
 
+#: HTTP request bodies larger than this are forwarded to the backend as
+#: chunks of this size in the object store instead of a single bytes object.
+HTTP_BODY_STREAMING_CHUNK_SIZE_BYTES = 1024 * 1024
+
+#: Max number of chunks of a streamed response fetched per call to a replica.
+RESPONSE_STREAM_MAX_CHUNKS_PER_FETCH = 16
+
+#: Streamed responses that the caller didn't fetch from for this long are
+#: closed by the replica.
+RESPONSE_STREAM_IDLE_TIMEOUT_S = 60
+
 #: Max time to wait for HTTP proxy in `serve.start()`.
 HTTP_PROXY_TIMEOUT = 60
 
@@ -37,3 +48,13 @@ DEFAULT_LATENCY_BUCKET_MS = [
 
 #: Name of backend reconfiguration method implemented by user.
 BACKEND_RECONFIGURE_METHOD = "reconfigure"
+
+#: Names of the policies routers can use to pick a replica for a query.
+REPLICA_SELECTION_POLICY_NAMES = ["round_robin", "power_of_two"]
+
+#: Number of past changes of each long poll key kept by the host to send
+#: clients a delta instead of the whole object.
+LONG_POLL_MAX_DELTAS = 100
+
+#: Names of the executors replicas can run synchronous handlers in.
+BACKEND_EXECUTOR_NAMES = ["event_loop", "thread", "process"]
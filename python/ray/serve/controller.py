@@ -10,7 +10,8 @@ from pydantic import BaseModel
 
 import ray
 import ray.cloudpickle as pickle
-from ray.serve.autoscaling_policy import BasicAutoscalingPolicy
+from ray.serve.autoscaling_policy import (AutoscalingPolicy,
+                                          create_autoscaling_policy)
 from ray.serve.backend_worker import create_backend_replica
 from ray.serve.constants import ASYNC_CONCURRENCY, SERVE_PROXY_NAME
 from ray.serve.http_proxy import HTTPProxyActor
@@ -18,7 +19,8 @@ from ray.serve.kv_store import RayInternalKVStore
 from ray.serve.exceptions import RayServeException
 from ray.serve.utils import (format_actor_name, get_random_letters, logger,
                              try_schedule_resources_on_nodes, get_all_node_ids)
-from ray.serve.config import BackendConfig, ReplicaConfig
+from ray.serve.config import (BackendConfig, ReplicaConfig,
+                              ResponseCacheConfig)
 from ray.serve.long_poll import LongPollerHost
 from ray.actor import ActorHandle
 
@@ -43,9 +45,18 @@ BackendTag = str
 EndpointTag = str
 ReplicaTag = str
 NodeId = str
+RouterId = str
 GoalId = int
 
 
+def _format_router_id(node_id: NodeId, proxy_index: int) -> RouterId:
+    # The first router on each node is identified by the node id alone so
+    # that single-proxy deployments keep their actor names.
+    if proxy_index == 0:
+        return node_id
+    return "{}-proxy{}".format(node_id, proxy_index)
+
+
 class TrafficPolicy:
     def __init__(self, traffic_dict: Dict[str, float]) -> None:
         self.traffic_dict: Dict[str, float] = dict()
@@ -98,6 +109,8 @@ class SystemState:
         default_factory=dict)
     routes: Dict[BackendTag, Tuple[EndpointTag, Any]] = field(
         default_factory=dict)
+    cache_configs: Dict[EndpointTag, ResponseCacheConfig] = field(
+        default_factory=dict)
 
     backend_goal_ids: Dict[BackendTag, GoalId] = field(default_factory=dict)
     traffic_goal_ids: Dict[EndpointTag, GoalId] = field(default_factory=dict)
@@ -144,7 +157,8 @@ class ActorStateReconciler:
     controller_name: str = field(init=True)
     detached: bool = field(init=True)
 
-    routers_cache: Dict[NodeId, ActorHandle] = field(default_factory=dict)
+    routers_cache: Dict[RouterId, ActorHandle] = field(default_factory=dict)
+    router_node_ids: Dict[RouterId, NodeId] = field(default_factory=dict)
     backend_replicas: Dict[BackendTag, Dict[ReplicaTag, ActorHandle]] = field(
         default_factory=lambda: defaultdict(dict))
     backend_replicas_to_start: Dict[BackendTag, List[ReplicaTag]] = field(
@@ -326,40 +340,52 @@ class ActorStateReconciler:
 
         self.backend_replicas_to_stop.clear()
 
-    def _start_routers_if_needed(self, http_host: str, http_port: str,
-                                 http_middlewares: List[Any]) -> None:
-        """Start a router on every node if it doesn't already exist."""
+    def _start_routers_if_needed(self,
+                                 http_host: str,
+                                 http_port: str,
+                                 http_middlewares: List[Any],
+                                 num_http_proxies_per_node: int = 1) -> None:
+        """Start the routers on every node if they don't already exist.
+
+        If num_http_proxies_per_node is greater than one, the routers on a
+        node share the port using SO_REUSEPORT and the kernel balances the
+        incoming connections among them.
+        """
         if http_host is None:
             return
 
         for node_id, node_resource in get_all_node_ids():
-            if node_id in self.routers_cache:
-                continue
+            for proxy_index in range(num_http_proxies_per_node):
+                router_id = _format_router_id(node_id, proxy_index)
+                if router_id in self.routers_cache:
+                    continue
 
-            router_name = format_actor_name(SERVE_PROXY_NAME,
-                                            self.controller_name, node_id)
-            try:
-                router = ray.get_actor(router_name)
-            except ValueError:
-                logger.info("Starting router with name '{}' on node '{}' "
-                            "listening on '{}:{}'".format(
-                                router_name, node_id, http_host, http_port))
-                router = HTTPProxyActor.options(
-                    name=router_name,
-                    lifetime="detached" if self.detached else None,
-                    max_concurrency=ASYNC_CONCURRENCY,
-                    max_restarts=-1,
-                    max_task_retries=-1,
-                    resources={
-                        node_resource: 0.01
-                    },
-                ).remote(
-                    http_host,
-                    http_port,
-                    controller_name=self.controller_name,
-                    http_middlewares=http_middlewares)
-
-            self.routers_cache[node_id] = router
+                router_name = format_actor_name(
+                    SERVE_PROXY_NAME, self.controller_name, router_id)
+                try:
+                    router = ray.get_actor(router_name)
+                except ValueError:
+                    logger.info("Starting router with name '{}' on node '{}' "
+                                "listening on '{}:{}'".format(
+                                    router_name, node_id, http_host,
+                                    http_port))
+                    router = HTTPProxyActor.options(
+                        name=router_name,
+                        lifetime="detached" if self.detached else None,
+                        max_concurrency=ASYNC_CONCURRENCY,
+                        max_restarts=-1,
+                        max_task_retries=-1,
+                        resources={
+                            node_resource: 0.01
+                        },
+                    ).remote(
+                        http_host,
+                        http_port,
+                        controller_name=self.controller_name,
+                        http_middlewares=http_middlewares)
+
+                self.routers_cache[router_id] = router
+                self.router_node_ids[router_id] = node_id
 
     def _stop_routers_if_needed(self) -> bool:
         """Removes router actors from any nodes that no longer exist.
@@ -370,14 +396,16 @@ class ActorStateReconciler:
         actor_stopped = False
         all_node_ids = {node_id for node_id, _ in get_all_node_ids()}
         to_stop = []
-        for node_id in self.routers_cache:
+        for router_id in self.routers_cache:
+            node_id = self.router_node_ids.get(router_id, router_id)
             if node_id not in all_node_ids:
                 logger.info(
                     "Removing router on removed node '{}'.".format(node_id))
-                to_stop.append(node_id)
+                to_stop.append(router_id)
 
-        for node_id in to_stop:
-            router_handle = self.routers_cache.pop(node_id)
+        for router_id in to_stop:
+            router_handle = self.routers_cache.pop(router_id)
+            self.router_node_ids.pop(router_id, None)
             ray.kill(router_handle, no_restart=True)
             actor_stopped = True
 
@@ -385,10 +413,10 @@ class ActorStateReconciler:
 
     def _recover_actor_handles(self) -> None:
         # Refresh the RouterCache
-        for node_id in self.routers_cache.keys():
+        for router_id in self.routers_cache.keys():
             router_name = format_actor_name(SERVE_PROXY_NAME,
-                                            self.controller_name, node_id)
-            self.routers_cache[node_id] = ray.get_actor(router_name)
+                                            self.controller_name, router_id)
+            self.routers_cache[router_id] = ray.get_actor(router_name)
 
         # Fetch actor handles for all of the backend replicas in the system.
         # All of these backend_replicas are guaranteed to already exist because
@@ -403,14 +431,14 @@ class ActorStateReconciler:
 
     async def _recover_from_checkpoint(
             self, current_state: SystemState, controller: "ServeController"
-    ) -> Dict[BackendTag, BasicAutoscalingPolicy]:
+    ) -> Dict[BackendTag, AutoscalingPolicy]:
         self._recover_actor_handles()
         autoscaling_policies = dict()
 
         for backend, info in current_state.backends.items():
             metadata = info.backend_config.internal_metadata
             if metadata.autoscaling_config is not None:
-                autoscaling_policies[backend] = BasicAutoscalingPolicy(
+                autoscaling_policies[backend] = create_autoscaling_policy(
                     backend, metadata.autoscaling_config)
 
         # Start/stop any pending backend replicas.
@@ -459,7 +487,8 @@ class ServeController:
                        http_host: str,
                        http_port: str,
                        http_middlewares: List[Any],
-                       detached: bool = False):
+                       detached: bool = False,
+                       num_http_proxies_per_node: int = 1):
         # Used to read/write checkpoints.
         self.kv_store = RayInternalKVStore(namespace=controller_name)
         # Current State
@@ -477,6 +506,12 @@ class ServeController:
         # Dictionary of backend_tag -> router_name -> most recent queue length.
         self.backend_stats = defaultdict(lambda: defaultdict(dict))
 
+        # Dictionary of backend_tag -> replica_tag -> most recent queue length
+        # reported by the replica. Broadcast to the routers periodically.
+        self.replica_queue_lengths: Dict[BackendTag, Dict[
+            ReplicaTag, int]] = defaultdict(dict)
+        self.replica_queue_lengths_changed = False
+
         # Used to ensure that only a single state-changing operation happens
         # at any given time.
         self.write_lock = asyncio.Lock()
@@ -484,11 +519,13 @@ class ServeController:
         self.http_host = http_host
         self.http_port = http_port
         self.http_middlewares = http_middlewares
+        self.num_http_proxies_per_node = num_http_proxies_per_node
 
         # If starting the actor for the first time, starts up the other system
         # components. If recovering, fetches their actor handles.
         self.actor_reconciler._start_routers_if_needed(
-            self.http_host, self.http_port, self.http_middlewares)
+            self.http_host, self.http_port, self.http_middlewares,
+            self.num_http_proxies_per_node)
 
         # NOTE(edoakes): unfortunately, we can't completely recover from a
         # checkpoint in the constructor because we block while waiting for
@@ -519,6 +556,9 @@ class ServeController:
         self.notify_backend_configs_changed()
         self.notify_replica_handles_changed()
         self.notify_traffic_policies_changed()
+        self.notify_replica_queue_lengths_changed()
+        self.notify_route_table_changed()
+        self.notify_response_cache_configs_changed()
 
         asyncio.get_event_loop().create_task(self.run_control_loop())
 
@@ -538,6 +578,68 @@ class ServeController:
         self.long_poll_host.notify_changed(
             "backend_configs", self.current_state.get_backend_configs())
 
+    def notify_route_table_changed(self):
+        self.long_poll_host.notify_changed("route_table",
+                                           self.current_state.routes)
+
+    async def push_route_table(self):
+        """Notify the routers of the route table and wait until every HTTP
+        proxy has it.
+
+        The long poll delivers the route table eventually, but endpoint
+        changes must be visible to HTTP requests sent right after they
+        return.
+        """
+        self.notify_route_table_changed()
+        await asyncio.gather(*[
+            router.set_route_table.remote(self.current_state.routes)
+            for router in self.actor_reconciler.router_handles()
+        ])
+
+    def notify_response_cache_configs_changed(self):
+        self.long_poll_host.notify_changed("response_cache_configs",
+                                           self.current_state.cache_configs)
+
+    def notify_replica_queue_lengths_changed(self):
+        replica_queue_lengths = dict()
+        for backend_tag, replica_dict in \
+                self.actor_reconciler.backend_replicas.items():
+            # Drop the reports from replicas that have been stopped.
+            reported = {
+                replica_tag: queue_length
+                for replica_tag, queue_length in self.replica_queue_lengths[
+                    backend_tag].items() if replica_tag in replica_dict
+            }
+            self.replica_queue_lengths[backend_tag] = reported
+            # Keyed by actor ID, the routers can't compare the handles they
+            # get from different long poll updates.
+            replica_queue_lengths[backend_tag] = {
+                replica_dict[replica_tag]._actor_id: queue_length
+                for replica_tag, queue_length in reported.items()
+            }
+        self.long_poll_host.notify_changed("replica_queue_lengths",
+                                           replica_queue_lengths)
+        self.replica_queue_lengths_changed = False
+
+    def report_replica_metrics(self, backend_tag: BackendTag,
+                               replica_tag: ReplicaTag, queue_length: int,
+                               latency_histogram: List[int]):
+        """Called periodically by the replicas to report their metrics.
+
+        The queue lengths are pushed out to the routers by the control loop
+        and both metrics are passed to the backend's autoscaling policy.
+        """
+        if backend_tag not in self.actor_reconciler.backend_replicas:
+            return
+        queue_lengths = self.replica_queue_lengths[backend_tag]
+        # Only push the queue lengths to the routers when they change.
+        if queue_lengths.get(replica_tag) != queue_length:
+            queue_lengths[replica_tag] = queue_length
+            self.replica_queue_lengths_changed = True
+        if backend_tag in self.autoscaling_policies:
+            self.autoscaling_policies[backend_tag].record_replica_metrics(
+                replica_tag, queue_length, latency_histogram)
+
     async def listen_for_change(self, keys_to_snapshot_ids: Dict[str, int]):
         """Proxy long pull client's listen request.
 
@@ -550,7 +652,10 @@ class ServeController:
             self.long_poll_host.listen_for_change(keys_to_snapshot_ids))
 
     def get_routers(self) -> Dict[str, ActorHandle]:
-        """Returns a dictionary of node ID to router actor handles."""
+        """Returns a dictionary of router ID to router actor handles.
+
+        The router ID is the node ID for the first router on each node.
+        """
         return self.actor_reconciler.routers_cache
 
     def get_router_config(self) -> Dict[str, Tuple[str, List[str]]]:
@@ -603,6 +708,10 @@ class ServeController:
         self.autoscaling_policies = await self.actor_reconciler.\
             _recover_from_checkpoint(self.current_state, self)
 
+        # Push the recovered routes in case we crashed before pushing them.
+        self.notify_route_table_changed()
+        self.notify_response_cache_configs_changed()
+
         logger.info(
             "Recovered from checkpoint in {:.3f}s".format(time.time() - start))
 
@@ -615,7 +724,8 @@ class ServeController:
 
             new_num_replicas = self.autoscaling_policies[backend].scale(
                 self.backend_stats[backend], info.backend_config.num_replicas)
-            if new_num_replicas > 0:
+            if (new_num_replicas > 0
+                    and new_num_replicas != info.backend_config.num_replicas):
                 await self.update_backend_config(
                     backend, BackendConfig(num_replicas=new_num_replicas))
 
@@ -624,12 +734,16 @@ class ServeController:
             await self.do_autoscale()
             async with self.write_lock:
                 self.actor_reconciler._start_routers_if_needed(
-                    self.http_host, self.http_port, self.http_middlewares)
+                    self.http_host, self.http_port, self.http_middlewares,
+                    self.num_http_proxies_per_node)
                 checkpoint_required = self.actor_reconciler.\
                     _stop_routers_if_needed()
                 if checkpoint_required:
                     self._checkpoint()
 
+            if self.replica_queue_lengths_changed:
+                self.notify_replica_queue_lengths_changed()
+
             await asyncio.sleep(CONTROL_LOOP_PERIOD_S)
 
     def get_backend_configs(self) -> Dict[str, BackendConfig]:
@@ -714,13 +828,19 @@ class ServeController:
             self.notify_traffic_policies_changed()
 
     # TODO(architkulkarni): add Optional for route after cloudpickle upgrade
-    async def create_endpoint(self, endpoint: str,
-                              traffic_dict: Dict[str, float], route,
-                              methods) -> None:
+    async def create_endpoint(
+            self,
+            endpoint: str,
+            traffic_dict: Dict[str, float],
+            route,
+            methods,
+            cache_config: Optional[ResponseCacheConfig] = None) -> None:
         """Create a new endpoint with the specified route and methods.
 
         If the route is None, this is a "headless" endpoint that will not
         be exposed over HTTP and can only be accessed via a handle.
+
+        If cache_config is set, the routers cache the endpoint's responses.
         """
         async with self.write_lock:
             # If this is a headless endpoint with no route, key the endpoint
@@ -753,13 +873,14 @@ class ServeController:
                 format(route, endpoint, methods))
 
             self.current_state.routes[route] = (endpoint, methods)
+            if cache_config is not None:
+                self.current_state.cache_configs[endpoint] = cache_config
 
             # NOTE(edoakes): checkpoint is written in self._set_traffic.
             await self._set_traffic(endpoint, traffic_dict)
-            await asyncio.gather(*[
-                router.set_route_table.remote(self.current_state.routes)
-                for router in self.actor_reconciler.router_handles()
-            ])
+            await self.push_route_table()
+            if cache_config is not None:
+                self.notify_response_cache_configs_changed()
 
     async def delete_endpoint(self, endpoint: str) -> None:
         """Delete the specified endpoint.
@@ -786,6 +907,10 @@ class ServeController:
             if endpoint in self.current_state.traffic_policies:
                 del self.current_state.traffic_policies[endpoint]
 
+            # Remove the response cache config entry if it exists.
+            removed_cache_config = self.current_state.cache_configs.pop(
+                endpoint, None)
+
             self.actor_reconciler.endpoints_to_remove.append(endpoint)
 
             # NOTE(edoakes): we must write a checkpoint before pushing the
@@ -793,10 +918,9 @@ class ServeController:
             # after pushing the update.
             self._checkpoint()
 
-            await asyncio.gather(*[
-                router.set_route_table.remote(self.current_state.routes)
-                for router in self.actor_reconciler.router_handles()
-            ])
+            await self.push_route_table()
+            if removed_cache_config is not None:
+                self.notify_response_cache_configs_changed()
 
     async def create_backend(self, backend_tag: BackendTag,
                              backend_config: BackendConfig,
@@ -824,7 +948,7 @@ class ServeController:
             metadata = backend_config.internal_metadata
             if metadata.autoscaling_config is not None:
                 self.autoscaling_policies[
-                    backend_tag] = BasicAutoscalingPolicy(
+                    backend_tag] = create_autoscaling_policy(
                         backend_tag, metadata.autoscaling_config)
 
             try:
@@ -873,6 +997,7 @@ class ServeController:
 
             # Remove the backend's metadata.
             del self.current_state.backends[backend_tag]
+            self.replica_queue_lengths.pop(backend_tag, None)
             if backend_tag in self.autoscaling_policies:
                 del self.autoscaling_policies[backend_tag]
 
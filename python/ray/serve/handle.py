@@ -1,7 +1,7 @@
 import asyncio
 import concurrent.futures
 import threading
-from typing import Any, Coroutine, Dict, Optional, Union
+from typing import Any, Coroutine, Dict, List, Optional, Tuple, Union
 
 import ray
 from ray.serve.context import TaskContext
@@ -23,6 +23,51 @@ def create_or_get_async_loop_in_thread():
     return global_async_loop
 
 
+class _RequestCoalescer:
+    """Submits the requests made from other threads in batches.
+
+    Requests submitted while a batch is already scheduled on the event loop
+    join that batch, so a burst of requests costs a single hop to the loop
+    thread instead of one per request.
+    """
+
+    def __init__(self, router: Router, async_loop: asyncio.AbstractEventLoop):
+        self.router = router
+        self.async_loop = async_loop
+        self.lock = threading.Lock()
+        self.pending: List[Tuple[Tuple[RequestMetadata, Any, Dict],
+                                 concurrent.futures.Future]] = []
+
+    def submit(self, requests: List[Tuple[RequestMetadata, Any, Dict]]
+               ) -> List[concurrent.futures.Future]:
+        futures = [concurrent.futures.Future() for _ in requests]
+        with self.lock:
+            should_schedule = len(self.pending) == 0
+            self.pending.extend(zip(requests, futures))
+        if should_schedule:
+            self.async_loop.call_soon_threadsafe(self._flush)
+        return futures
+
+    def _flush(self) -> None:
+        with self.lock:
+            pending, self.pending = self.pending, []
+        self.async_loop.create_task(self._assign(pending))
+
+    async def _assign(self, pending) -> None:
+        results = await asyncio.gather(
+            *[
+                self.router.assign_request(request_metadata, request_data,
+                                           **kwargs)
+                for (request_metadata, request_data, kwargs), _ in pending
+            ],
+            return_exceptions=True)
+        for (_, future), result in zip(pending, results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
 class RayServeHandle:
     """A handle to a service endpoint.
 
@@ -74,13 +119,14 @@ class RayServeHandle:
                 self.router.setup_in_async_loop(),
                 self.async_loop,
             )
+            self.coalescer = _RequestCoalescer(self.router, self.async_loop)
         else:  # async
             self.async_loop = asyncio.get_event_loop()
             # create_task is not threadsafe.
             self.async_loop.create_task(self.router.setup_in_async_loop())
 
-    def _remote(self, request_data, kwargs) -> Coroutine:
-        request_metadata = RequestMetadata(
+    def _make_request_metadata(self) -> RequestMetadata:
+        return RequestMetadata(
             get_random_letters(10),  # Used for debugging.
             self.endpoint_name,
             TaskContext.Python,
@@ -89,8 +135,10 @@ class RayServeHandle:
             http_method=self.http_method or "GET",
             http_headers=self.http_headers or dict(),
         )
-        coro = self.router.assign_request(request_metadata, request_data,
-                                          **kwargs)
+
+    def _remote(self, request_data, kwargs) -> Coroutine:
+        coro = self.router.assign_request(self._make_request_metadata(),
+                                          request_data, **kwargs)
         return coro
 
     def remote(self, request_data: Optional[Union[Dict, Any]] = None,
@@ -110,17 +158,46 @@ class RayServeHandle:
                 ``request.args``.
         """
         assert self.sync, "handle.remote() should be called from sync handle."
-        coro = self._remote(request_data, kwargs)
-        future: concurrent.futures.Future = asyncio.run_coroutine_threadsafe(
-            coro, self.async_loop)
+        future, = self.coalescer.submit([(self._make_request_metadata(),
+                                          request_data, kwargs)])
         # Block until the result is ready.
         return future.result()
 
+    def remote_batch(self, requests: List[Union[Dict, Any]],
+                     **kwargs) -> List[ray.ObjectRef]:
+        """Issue many asynchronous requests to the endpoint at once.
+
+        This is equivalent to calling ``handle.remote`` for each request,
+        but all the requests are submitted in one hop to the router's event
+        loop, which makes fanning out to many requests much cheaper.
+
+        Returns:
+            List[ray.ObjectRef], one per request, in the order of requests.
+        Args:
+            requests(list): The ``request_data`` of each request.
+            ``**kwargs``: Keyword arguments passed to every request, available
+                in ``request.args``.
+        """
+        assert self.sync, ("handle.remote_batch() should be called from sync "
+                           "handle.")
+        futures = self.coalescer.submit([(self._make_request_metadata(),
+                                          request_data, kwargs)
+                                         for request_data in requests])
+        return [future.result() for future in futures]
+
     async def _remote_async(self, request_data, **kwargs) -> ray.ObjectRef:
         """Experimental API for enqueue a request in async context."""
         assert not self.sync, "_remote_async must be called inside async loop."
         return await self._remote(request_data, kwargs)
 
+    async def _remote_batch_async(self, requests: List[Union[Dict, Any]],
+                                  **kwargs) -> List[ray.ObjectRef]:
+        """Experimental API for enqueue many requests in async context."""
+        assert not self.sync, ("_remote_batch_async must be called inside "
+                               "async loop.")
+        return await asyncio.gather(
+            *[self._remote(request_data, kwargs) for request_data in requests])
+
     def options(self,
                 method_name: Optional[str] = None,
                 *,
@@ -9,7 +9,10 @@ from ray.exceptions import RayTaskError
 from ray.serve.context import TaskContext
 from ray.util import metrics
 from ray.serve.utils import _get_logger, get_random_letters
-from ray.serve.http_util import Response
+from ray.serve.constants import HTTP_BODY_STREAMING_CHUNK_SIZE_BYTES
+from ray.serve.http_util import (Response, ResponseStream, StreamedBody,
+                                 StreamingResponse)
+from ray.serve.long_poll import LongPollerAsyncClient
 from ray.serve.router import Router, RequestMetadata
 
 # The maximum number of times to retry a request due to actor failure.
@@ -42,11 +45,30 @@ class HTTPProxy:
         self.router = Router(controller)
         await self.router.setup_in_async_loop()
 
+        # The controller pushes route table updates to every proxy through
+        # long poll, so any number of proxies can be kept in sync.
+        self.route_table_poll_client = LongPollerAsyncClient(
+            controller, {"route_table": self._update_route_table})
+
     def set_route_table(self, route_table):
         self.route_table = route_table
 
+    async def _update_route_table(self, route_table):
+        logger.debug(f"HTTP Proxy: Get updated route table: {route_table}.")
+        self.set_route_table(route_table)
+
     async def receive_http_body(self, scope, receive, send):
+        """Receive the HTTP request body.
+
+        Small bodies are returned as bytes. Once the body grows beyond
+        HTTP_BODY_STREAMING_CHUNK_SIZE_BYTES, it is put in the object store
+        chunk by chunk as it arrives and a StreamedBody referencing the chunks
+        is returned instead, so large uploads are never fully buffered here.
+        """
         body_buffer = []
+        buffered_bytes = 0
+        chunk_refs = []
+        total_bytes = 0
         more_body = True
         while more_body:
             message = await receive()
@@ -54,8 +76,20 @@ class HTTPProxy:
 
             more_body = message["more_body"]
             body_buffer.append(message["body"])
+            buffered_bytes += len(message["body"])
+            total_bytes += len(message["body"])
+
+            if buffered_bytes >= HTTP_BODY_STREAMING_CHUNK_SIZE_BYTES:
+                chunk_refs.append(ray.put(b"".join(body_buffer)))
+                body_buffer = []
+                buffered_bytes = 0
+
+        if len(chunk_refs) == 0:
+            return b"".join(body_buffer)
 
-        return b"".join(body_buffer)
+        if buffered_bytes > 0:
+            chunk_refs.append(ray.put(b"".join(body_buffer)))
+        return StreamedBody(chunk_refs, total_bytes)
 
     def _make_error_sender(self, scope, receive, send):
         async def sender(error_message, status_code):
@@ -107,7 +141,7 @@ class HTTPProxy:
             await error_sender(error_message, 405)
             return
 
-        http_body_bytes = await self.receive_http_body(scope, receive, send)
+        http_body = await self.receive_http_body(scope, receive, send)
 
         headers = {k.decode(): v.decode() for k, v in scope["headers"]}
         request_metadata = RequestMetadata(
@@ -120,12 +154,14 @@ class HTTPProxy:
         )
 
         ref = await self.router.assign_request(request_metadata, scope,
-                                               http_body_bytes)
+                                               http_body)
         result = await ref
 
         if isinstance(result, RayTaskError):
             error_message = "Task Error. Traceback: {}.".format(result)
             await error_sender(error_message, 500)
+        elif isinstance(result, ResponseStream):
+            await StreamingResponse(result).send(scope, receive, send)
         else:
             await Response(result).send(scope, receive, send)
 
@@ -1,8 +1,13 @@
 import io
 import json
+from dataclasses import dataclass
+from typing import List
 
 import flask
 
+import ray
+from ray.serve.constants import RESPONSE_STREAM_MAX_CHUNKS_PER_FETCH
+
 
 def build_flask_request(asgi_scope_dict, request_body):
     """Build and return a flask request from ASGI payload
@@ -73,6 +78,86 @@ def build_wsgi_environ(scope, body):
     return environ
 
 
+@dataclass
+class StreamedBody:
+    """A request body that was forwarded in chunks through the object store.
+
+    The HTTP proxy puts each chunk in the object store as soon as it arrives,
+    so the full body is never held in the proxy's memory.
+    """
+    chunk_refs: List[ray.ObjectRef]
+    num_bytes: int
+
+
+class StreamedBodyReader(io.RawIOBase):
+    """File-like object that fetches the chunks of a StreamedBody lazily."""
+
+    def __init__(self, body: StreamedBody):
+        self._chunk_refs = list(body.chunk_refs)
+        self._current = memoryview(b"")
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while len(self._current) == 0:
+            if len(self._chunk_refs) == 0:
+                return 0
+            self._current = memoryview(ray.get(self._chunk_refs.pop(0)))
+        num_bytes = min(len(buffer), len(self._current))
+        buffer[:num_bytes] = self._current[:num_bytes]
+        self._current = self._current[num_bytes:]
+        return num_bytes
+
+
+class ResponseStream:
+    """Handle to a response that a backend is producing incrementally.
+
+    Backends that return a generator (sync or async) have it kept in the
+    replica. This object is returned instead and is used to fetch the chunks
+    as they are produced. Iterating over it from Python yields the chunks.
+    """
+
+    def __init__(self, replica: "ray.actor.ActorHandle", replica_name: str,
+                 stream_id: str):
+        # The handle is passed along, so that fetching the chunks doesn't
+        # look up the replica by name, e.g. on the HTTP proxy's event loop.
+        self.replica = replica
+        self.replica_name = replica_name
+        self.stream_id = stream_id
+
+    def fetch_chunks(self) -> ray.ObjectRef:
+        """Returns an object ref to a (chunks, is_done) tuple."""
+        return self.replica.next_stream_chunks.remote(
+            self.stream_id, RESPONSE_STREAM_MAX_CHUNKS_PER_FETCH)
+
+    def close(self) -> None:
+        """Release the stream in the replica before it is exhausted."""
+        self.replica.close_stream.remote(self.stream_id)
+
+    def __iter__(self):
+        is_done = False
+        while not is_done:
+            chunks, is_done = ray.get(self.fetch_chunks())
+            yield from chunks
+
+    def __repr__(self):
+        return (f"ResponseStream(replica='{self.replica_name}', "
+                f"stream_id='{self.stream_id}')")
+
+
+def encode_chunk(chunk) -> bytes:
+    """Convert a chunk yielded by a streaming backend to bytes."""
+    if isinstance(chunk, bytes):
+        return chunk
+    elif isinstance(chunk, str):
+        return chunk.encode("utf-8")
+    else:
+        # Delayed import since utils depends on http_util
+        from ray.serve.utils import ServeEncoder
+        return json.dumps(chunk, cls=ServeEncoder).encode() + b"\n"
+
+
 class Response:
     """ASGI compliant response class.
 
@@ -126,3 +211,37 @@ class Response:
             "headers": self.raw_headers,
         })
         await send({"type": "http.response.body", "body": self.body})
+
+
+class StreamingResponse:
+    """ASGI compliant response class for a ResponseStream.
+
+    The body is sent with chunked transfer encoding as chunks are fetched
+    from the replica.
+
+    >>> await StreamingResponse(response_stream).send(scope, receive, send)
+    """
+
+    def __init__(self, response_stream: ResponseStream, status_code=200):
+        self.response_stream = response_stream
+        self.status_code = status_code
+        self.raw_headers = [[b"content-type", b"application/octet-stream"]]
+
+    async def send(self, scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        is_done = False
+        try:
+            while not is_done:
+                chunks, is_done = await self.response_stream.fetch_chunks()
+                await send({
+                    "type": "http.response.body",
+                    "body": b"".join(encode_chunk(c) for c in chunks),
+                    "more_body": not is_done,
+                })
+        finally:
+            if not is_done:
+                self.response_stream.close()
@@ -1,19 +1,75 @@
 import asyncio
+import hashlib
+import io
 import random
-from collections import defaultdict
-from dataclasses import dataclass
-from typing import Any, Awaitable, Callable, DefaultDict, Dict, Set
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import (Any, Awaitable, Callable, DefaultDict, Deque, Dict,
+                    Hashable, Optional, Set, Tuple)
 
 import ray
+from ray.actor import ActorHandle
+from ray.cloudpickle import CloudPickler
+from ray.serve.constants import LONG_POLL_MAX_DELTAS
 from ray.serve.utils import logger
 
 
+class _DigestPickler(CloudPickler):
+    """Pickler identifying actor handles by their actor ID.
+
+    Pickling an ActorHandle normally goes through the core worker, which we
+    don't need just to tell whether a value changed.
+    """
+
+    def persistent_id(self, obj):
+        if isinstance(obj, ActorHandle):
+            return obj._ray_actor_id.binary()
+        return None
+
+
+def _digest(value: Any) -> bytes:
+    with io.BytesIO() as file:
+        _DigestPickler(file).dump(value)
+        return hashlib.sha1(file.getvalue()).digest()
+
+
+@dataclass
+class LongPollDelta:
+    """Change of a dictionary object between two snapshots.
+
+    Only the top level entries are diffed: an entry whose value changed is
+    sent whole in `updated`.
+    """
+    updated: Dict[Hashable, Any] = field(default_factory=dict)
+    removed: Set[Hashable] = field(default_factory=set)
+
+    def merge(self, other: "LongPollDelta") -> None:
+        """Apply a later delta on top of this one."""
+        for key in other.removed:
+            self.updated.pop(key, None)
+            self.removed.add(key)
+        for key, value in other.updated.items():
+            self.updated[key] = value
+            self.removed.discard(key)
+
+    def apply(self, snapshot: Dict[Hashable, Any]) -> Dict[Hashable, Any]:
+        """Return a copy of snapshot with this delta applied."""
+        snapshot = dict(snapshot)
+        for key in self.removed:
+            snapshot.pop(key, None)
+        snapshot.update(self.updated)
+        return snapshot
+
+
 @dataclass
 class UpdatedObject:
     object_snapshot: Any
     # The identifier for the object's version. There is not sequential relation
     # among different object's snapshot_ids.
     snapshot_id: int
+    # If set, object_snapshot is None and the client must apply the delta to
+    # the snapshot it has.
+    delta: Optional[LongPollDelta] = None
 
 
 # Type signature for the update state callbacks. E.g.
@@ -58,6 +114,9 @@ class LongPollerAsyncClient:
 
     def _update(self, updates: Dict[str, UpdatedObject]):
         for key, update in updates.items():
+            if update.delta is not None:
+                update.object_snapshot = update.delta.apply(
+                    self.object_snapshots[key])
             self.object_snapshots[key] = update.object_snapshot
             self.snapshot_ids[key] = update.snapshot_id
 
@@ -95,6 +154,11 @@ class LongPollerHost:
     outdated object and immediately return the result. If the client has the
     up-to-date verison, then the listen_for_change call will only return when
     the object is updated.
+
+    For dictionary objects, the host keeps the last LONG_POLL_MAX_DELTAS
+    changes of each key. Clients that are only a few versions behind receive
+    the changed entries instead of the whole object; clients that are too far
+    behind receive a full snapshot.
     """
 
     def __init__(self):
@@ -103,6 +167,15 @@ class LongPollerHost:
             lambda: random.randint(0, 1_000_000))
         # Map object_key -> object
         self.object_snapshots: Dict[str, Any] = dict()
+        # Map object_key -> {entry key -> digest of the pickled entry}, used
+        # to find the changed entries of dictionary objects. Digests are used
+        # instead of the values so in-place updates are detected.
+        self.entry_digests: Dict[str, Dict[Hashable, bytes]] = dict()
+        # Map object_key -> deque of (snapshot_id, delta from the previous
+        # snapshot).
+        self.deltas: DefaultDict[str, Deque[Tuple[
+            int, LongPollDelta]]] = defaultdict(
+                lambda: deque(maxlen=LONG_POLL_MAX_DELTAS))
         # Map object_key -> set(asyncio.Event waiting for updates)
         self.notifier_events: DefaultDict[str, Set[
             asyncio.Event]] = defaultdict(set)
@@ -124,8 +197,7 @@ class LongPollerHost:
         # 2. If there are any outdated keys (by comparing snapshot ids)
         #    return immediately.
         client_outdated_keys = {
-            key: UpdatedObject(self.object_snapshots[key],
-                               self.snapshot_ids[key])
+            key: self._make_update(key, keys_to_snapshot_ids[key])
             for key in watched_keys
             if self.snapshot_ids[key] != keys_to_snapshot_ids[key]
         }
@@ -151,14 +223,69 @@ class LongPollerHost:
 
         updated_object_key: str = async_task_to_watched_keys[done.pop()]
         return {
-            updated_object_key: UpdatedObject(
-                self.object_snapshots[updated_object_key],
-                self.snapshot_ids[updated_object_key])
+            updated_object_key: self._make_update(
+                updated_object_key, keys_to_snapshot_ids[updated_object_key])
         }
 
+    def _make_update(self, object_key: str,
+                     client_snapshot_id: int) -> UpdatedObject:
+        """Build the update bringing a client to the latest snapshot.
+
+        Falls back to the full snapshot if the deltas since the client's
+        snapshot are no longer kept.
+        """
+        snapshot_id = self.snapshot_ids[object_key]
+        deltas = self.deltas[object_key]
+        num_behind = snapshot_id - client_snapshot_id
+        if 0 < num_behind <= len(
+                deltas) and deltas[-num_behind][0] == client_snapshot_id + 1:
+            merged = LongPollDelta()
+            for _, delta in list(deltas)[-num_behind:]:
+                merged.merge(delta)
+            return UpdatedObject(None, snapshot_id, merged)
+        return UpdatedObject(self.object_snapshots[object_key], snapshot_id)
+
+    def _record_delta(self, object_key: str, updated_object: Any) -> None:
+        if not isinstance(updated_object, dict):
+            self.entry_digests.pop(object_key, None)
+            self.deltas.pop(object_key, None)
+            return
+
+        try:
+            digests = {
+                key: _digest(value)
+                for key, value in updated_object.items()
+            }
+        except Exception as e:
+            logger.debug(f"LongPollerHost: can't diff {object_key}: {e}")
+            self.entry_digests.pop(object_key, None)
+            self.deltas.pop(object_key, None)
+            return
+
+        previous_digests = self.entry_digests.get(object_key)
+        self.entry_digests[object_key] = digests
+        if previous_digests is None:
+            # Clients can only get a delta from a snapshot taken after this.
+            self.deltas.pop(object_key, None)
+            return
+
+        delta = LongPollDelta(
+            updated={
+                key: updated_object[key]
+                for key, digest in digests.items()
+                if previous_digests.get(key) != digest
+            },
+            removed=set(previous_digests.keys()) - set(digests.keys()))
+        self.deltas[object_key].append((self.snapshot_ids[object_key], delta))
+
     def notify_changed(self, object_key: str, updated_object: Any):
         self.snapshot_ids[object_key] += 1
+        if isinstance(updated_object, dict):
+            # Keep our own copy so later in-place updates of the caller's
+            # dictionary don't change the snapshot sent to clients.
+            updated_object = dict(updated_object)
         self.object_snapshots[object_key] = updated_object
+        self._record_delta(object_key, updated_object)
         logger.debug(f"LongPollerHost: {object_key} = {updated_object}")
 
         if object_key in self.notifier_events:
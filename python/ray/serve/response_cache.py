@@ -0,0 +1,118 @@
+from collections import OrderedDict
+import time
+from typing import Dict, Hashable, Optional, Tuple
+
+import ray
+import ray.cloudpickle as pickle
+from ray.serve.config import ResponseCacheConfig
+from ray.serve.context import TaskContext
+from ray.serve.http_util import ResponseStream, StreamedBody
+from ray.serve.utils import logger
+
+
+def default_cache_key(query: "ray.serve.router.Query") -> Optional[Hashable]:
+    """Compute the cache key of a query from its content.
+
+    HTTP requests are keyed on the method, path, query string and body, so
+    headers and client addresses don't affect the key. Python requests are
+    keyed on the called method and the pickled arguments. Returns None if the
+    query can't be cached, e.g. if its arguments can't be pickled.
+    """
+    metadata = query.metadata
+    if query.context == TaskContext.Web:
+        scope, body = query.args
+        if isinstance(body, StreamedBody):
+            return None
+        return (metadata.call_method, metadata.http_method, scope["path"],
+                scope["query_string"], body)
+
+    try:
+        pickled_args = pickle.dumps((query.args, query.kwargs))
+    except Exception:
+        return None
+    return (metadata.call_method, metadata.http_method, pickled_args)
+
+
+class ResponseCache:
+    """LRU cache of response object refs for one endpoint.
+
+    Entries expire after ttl_s seconds and the least recently used entries
+    are evicted once the total size of the cached responses exceeds
+    max_bytes. The cached values are the ObjectRefs of the responses, so a
+    hit is answered from the object store without calling a replica.
+    """
+
+    def __init__(self, config: ResponseCacheConfig):
+        self.config = config
+        # Map key -> (object_ref, num_bytes, insertion_time), ordered from
+        # the least to the most recently used.
+        self.entries: Dict[Hashable, Tuple[ray.ObjectRef, int,
+                                           float]] = OrderedDict()
+        self.num_bytes = 0
+        self.num_hits = 0
+        self.num_misses = 0
+
+    def make_key(self, query: "ray.serve.router.Query") -> Optional[Hashable]:
+        key_fn = self.config.key_fn or default_cache_key
+        try:
+            return key_fn(query)
+        except Exception as e:
+            logger.debug(f"ResponseCache: failed to compute key: {e}")
+            return None
+
+    def get(self, key: Hashable) -> Optional[ray.ObjectRef]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            object_ref, num_bytes, insertion_time = entry
+            if (self.config.ttl_s is not None
+                    and time.time() - insertion_time > self.config.ttl_s):
+                self._remove(key)
+            else:
+                self.entries.move_to_end(key)
+                self.num_hits += 1
+                return object_ref
+
+        self.num_misses += 1
+        return None
+
+    def put(self, key: Hashable, object_ref: ray.ObjectRef,
+            num_bytes: int) -> None:
+        if num_bytes > self.config.max_bytes:
+            return
+
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (object_ref, num_bytes, time.time())
+        self.num_bytes += num_bytes
+
+        while self.num_bytes > self.config.max_bytes:
+            self._remove(next(iter(self.entries)))
+
+    def _remove(self, key: Hashable) -> None:
+        _, num_bytes, _ = self.entries.pop(key)
+        self.num_bytes -= num_bytes
+
+    async def put_when_ready(self, key: Hashable,
+                             object_ref: ray.ObjectRef) -> None:
+        """Cache the response once it's computed.
+
+        Errors and streamed responses are not cached.
+        """
+        try:
+            value = await object_ref
+        except Exception:
+            return
+        if isinstance(value, (Exception, ResponseStream)):
+            return
+
+        # The object is local once awaited, take its serialized size from
+        # the core worker instead of serializing the value again.
+        worker = ray.worker.global_worker
+        [(data, metadata)] = worker.core_worker.get_objects(
+            [object_ref], worker.current_task_id, timeout_ms=0)
+        if data is None:
+            return
+        self.put(key, object_ref, len(data) + len(metadata or b""))
+
+    def __len__(self) -> int:
+        return len(self.entries)
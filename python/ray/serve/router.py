@@ -1,14 +1,18 @@
 import asyncio
 import itertools
+import random
+from abc import ABCMeta, abstractmethod
 from collections import defaultdict
 from dataclasses import dataclass, field
 from typing import Any, DefaultDict, Dict, Iterable, List, Optional
 
 import ray
+from ray import ActorID
 from ray.actor import ActorHandle
 from ray.serve.context import TaskContext
 from ray.serve.endpoint_policy import EndpointPolicy, RandomEndpointPolicy
 from ray.serve.long_poll import LongPollerAsyncClient
+from ray.serve.response_cache import ResponseCache
 from ray.serve.utils import logger
 from ray.util import metrics
 
@@ -45,6 +49,90 @@ class Query:
     tick_enter_replica: Optional[float] = None
 
 
+class ReplicaSelectionPolicy:
+    """Defines the interface for choosing a replica within a ReplicaSet.
+
+    To add a new selection policy, a class should be defined that provides
+    this interface and registered in REPLICA_SELECTION_POLICIES. The policy
+    may be stateful; it is notified whenever the set of replicas changes.
+    """
+    __metaclass__ = ABCMeta
+
+    def update_replicas(self, replicas: List[ActorHandle]) -> None:
+        """Called when replicas are added to or removed from the set."""
+        pass
+
+    @abstractmethod
+    def choose_replica(self,
+                       replica_set: "ReplicaSet") -> Optional[ActorHandle]:
+        """Choose a replica that can accept one more query.
+
+        Returns:
+            The chosen replica handle, or None if all replicas are at their
+            max_concurrent_queries limit.
+        """
+        raise NotImplementedError()
+
+
+class RoundRobinReplicaPolicy(ReplicaSelectionPolicy):
+    """Cycle through the replicas, skipping the overloaded ones."""
+
+    def __init__(self):
+        self.replicas: List[ActorHandle] = []
+        self.replica_iterator = itertools.cycle(self.replicas)
+
+    def update_replicas(self, replicas: List[ActorHandle]) -> None:
+        self.replicas = list(replicas)
+        self.replica_iterator = itertools.cycle(self.replicas)
+
+    def choose_replica(self,
+                       replica_set: "ReplicaSet") -> Optional[ActorHandle]:
+        for _ in range(len(self.replicas)):
+            replica = next(self.replica_iterator)
+            if replica_set.has_capacity(replica):
+                return replica
+        return None
+
+
+class PowerOfTwoChoicesReplicaPolicy(ReplicaSelectionPolicy):
+    """Sample two replicas at random and pick the less loaded one.
+
+    The load of a replica is estimated from the number of queries this router
+    has in flight to it plus the queue length most recently reported by the
+    replica itself, so the choice also accounts for queries sent by other
+    routers. If both sampled replicas are full, fall back to the least loaded
+    replica that still has capacity.
+    """
+
+    def __init__(self):
+        self.replicas: List[ActorHandle] = []
+
+    def update_replicas(self, replicas: List[ActorHandle]) -> None:
+        self.replicas = list(replicas)
+
+    def choose_replica(self,
+                       replica_set: "ReplicaSet") -> Optional[ActorHandle]:
+        if len(self.replicas) == 0:
+            return None
+
+        candidates = random.sample(self.replicas, min(2, len(self.replicas)))
+        candidates = [r for r in candidates if replica_set.has_capacity(r)]
+        if len(candidates) == 0:
+            candidates = [
+                r for r in self.replicas if replica_set.has_capacity(r)
+            ]
+            if len(candidates) == 0:
+                return None
+
+        return min(candidates, key=replica_set.estimated_load)
+
+
+REPLICA_SELECTION_POLICIES = {
+    "round_robin": RoundRobinReplicaPolicy,
+    "power_of_two": PowerOfTwoChoicesReplicaPolicy,
+}
+
+
 class ReplicaSet:
     """Data structure representing a set of replica actor handles"""
 
@@ -54,13 +142,16 @@ class ReplicaSet:
         self.max_concurrent_queries: int = 8
         self.in_flight_queries: Dict[ActorHandle, set] = dict()
 
-        # The iterator used for load balancing among replicas. Using itertools
-        # cycle, we implements a round-robin policy, skipping overloaded
-        # replicas.
-        # NOTE(simon): We can make this more pluggable and consider different
-        # policies like: min load, pick min of two replicas, pick replicas on
-        # the same node.
-        self.replica_iterator = itertools.cycle(self.in_flight_queries.keys())
+        # Queue lengths reported by the replicas themselves, including the
+        # queries sent by other routers. Updated through long poll. Keyed by
+        # actor ID because each long poll update deserializes new handles.
+        self.reported_queue_lengths: Dict[ActorID, int] = dict()
+
+        # The policy used for load balancing among replicas. Defaults to
+        # round-robin, skipping overloaded replicas.
+        self.selection_policy_name = "round_robin"
+        self.selection_policy: ReplicaSelectionPolicy = (
+            RoundRobinReplicaPolicy())
 
         # Used to unblock this replica set waiting for free replicas. A newly
         # added replica or updated max_concurrenty_queries value means the
@@ -74,6 +165,33 @@ class ReplicaSet:
                 f"ReplicaSet: chaging max_concurrent_queries to {new_value}")
             self.config_updated_event.set()
 
+    def set_selection_policy(self, policy_name: str):
+        if policy_name != self.selection_policy_name:
+            if policy_name not in REPLICA_SELECTION_POLICIES:
+                raise ValueError(
+                    f"Unknown replica selection policy '{policy_name}'. "
+                    "Available policies are "
+                    f"{list(REPLICA_SELECTION_POLICIES.keys())}.")
+            logger.debug(
+                f"ReplicaSet: changing selection policy to {policy_name}")
+            self.selection_policy_name = policy_name
+            self.selection_policy = REPLICA_SELECTION_POLICIES[policy_name]()
+            self.selection_policy.update_replicas(
+                list(self.in_flight_queries.keys()))
+
+    def update_queue_lengths(self, queue_lengths: Dict[ActorID, int]):
+        # Not filtered by the current replicas: the reports may arrive
+        # before the handles, and the controller drops the stopped replicas.
+        self.reported_queue_lengths = dict(queue_lengths)
+
+    def has_capacity(self, replica: ActorHandle) -> bool:
+        return (len(self.in_flight_queries[replica]) <
+                self.max_concurrent_queries)
+
+    def estimated_load(self, replica: ActorHandle) -> int:
+        return (len(self.in_flight_queries[replica]) +
+                self.reported_queue_lengths.get(replica._actor_id, 0))
+
     def update_worker_replicas(self, worker_replicas: Iterable[ActorHandle]):
         current_replica_set = set(self.in_flight_queries.keys())
         updated_replica_set = set(worker_replicas)
@@ -89,28 +207,26 @@ class ReplicaSet:
             # just used to perform backpressure. Caller should decide what to
             # do with the object refs.
             del self.in_flight_queries[removed_replica_handle]
+            self.reported_queue_lengths.pop(removed_replica_handle._actor_id,
+                                            None)
 
-        # State changed, reset the round robin iterator
+        # State changed, let the selection policy know.
         if len(added) > 0 or len(removed) > 0:
-            self.replica_iterator = itertools.cycle(
-                self.in_flight_queries.keys())
+            self.selection_policy.update_replicas(
+                list(self.in_flight_queries.keys()))
             self.config_updated_event.set()
 
     def _try_assign_replica(self, query: Query) -> Optional[ray.ObjectRef]:
         """Try to assign query to a replica, return the object ref is succeeded
         or return None if it can't assign this query to any replicas.
         """
-        for _ in range(len(self.in_flight_queries.keys())):
-            replica = next(self.replica_iterator)
-            if len(self.in_flight_queries[replica]
-                   ) >= self.max_concurrent_queries:
-                # This replica is overloaded, try next one
-                continue
-            logger.debug(f"Replica set assigned {query} to {replica}")
-            ref = replica.handle_request.remote(query)
-            self.in_flight_queries[replica].add(ref)
-            return ref
-        return None
+        replica = self.selection_policy.choose_replica(self)
+        if replica is None:
+            return None
+        logger.debug(f"Replica set assigned {query} to {replica}")
+        ref = replica.handle_request.remote(query)
+        self.in_flight_queries[replica].add(ref)
+        return ref
 
     @property
     def _all_query_refs(self):
@@ -168,11 +284,24 @@ class Router:
         self._pending_endpoints: DefaultDict[str, asyncio.Event] = defaultdict(
             asyncio.Event)
 
+        # Response caches for the endpoints that enabled caching.
+        self.response_caches: Dict[str, ResponseCache] = dict()
+
         # -- Metrics Registration -- #
         self.num_router_requests = metrics.Count(
             "num_router_requests",
             description="Number of requests processed by the router.",
             tag_keys=("endpoint", ))
+        self.num_cache_hits = metrics.Count(
+            "num_router_cache_hits",
+            description=("Number of requests answered from the router's "
+                         "response cache."),
+            tag_keys=("endpoint", ))
+        self.num_cache_misses = metrics.Count(
+            "num_router_cache_misses",
+            description=("Number of cacheable requests that were not found "
+                         "in the router's response cache."),
+            tag_keys=("endpoint", ))
 
     async def setup_in_async_loop(self):
         # NOTE(simon): Instead of performing initialization in __init__,
@@ -184,6 +313,8 @@ class Router:
                 "traffic_policies": self._update_traffic_policies,
                 "worker_handles": self._update_worker_handles,
                 "backend_configs": self._update_backend_configs,
+                "replica_queue_lengths": self._update_replica_queue_lengths,
+                "response_cache_configs": self._update_response_cache_configs,
             })
 
     async def _update_traffic_policies(self, traffic_policies):
@@ -201,8 +332,24 @@ class Router:
 
     async def _update_backend_configs(self, backend_configs):
         for backend_tag, config in backend_configs.items():
-            self.backend_replicas[backend_tag].set_max_concurrent_queries(
+            replica_set = self.backend_replicas[backend_tag]
+            replica_set.set_max_concurrent_queries(
                 config.max_concurrent_queries)
+            replica_set.set_selection_policy(config.replica_selection_policy)
+
+    async def _update_replica_queue_lengths(self, replica_queue_lengths):
+        for backend_tag, queue_lengths in replica_queue_lengths.items():
+            self.backend_replicas[backend_tag].update_queue_lengths(
+                queue_lengths)
+
+    async def _update_response_cache_configs(self, cache_configs):
+        for endpoint in list(self.response_caches.keys()):
+            if endpoint not in cache_configs:
+                del self.response_caches[endpoint]
+        for endpoint, config in cache_configs.items():
+            cache = self.response_caches.get(endpoint)
+            if cache is None or cache.config != config:
+                self.response_caches[endpoint] = ResponseCache(config)
 
     async def assign_request(
             self,
@@ -225,6 +372,19 @@ class Router:
             )
             await self._pending_endpoints[endpoint].wait()
 
+        self.num_router_requests.record(1, tags={"endpoint": endpoint})
+
+        cache = self.response_caches.get(endpoint)
+        cache_key = None
+        if cache is not None:
+            cache_key = cache.make_key(query)
+        if cache_key is not None:
+            cached_ref = cache.get(cache_key)
+            if cached_ref is not None:
+                self.num_cache_hits.record(1, tags={"endpoint": endpoint})
+                return cached_ref
+            self.num_cache_misses.record(1, tags={"endpoint": endpoint})
+
         endpoint_policy = self.endpoint_policies[endpoint]
         chosen_backend, *shadow_backends = endpoint_policy.assign(query)
 
@@ -233,6 +393,8 @@ class Router:
         for backend in shadow_backends:
             await self.backend_replicas[backend].assign_replica(query)
 
-        self.num_router_requests.record(1, tags={"endpoint": endpoint})
+        if cache_key is not None:
+            asyncio.get_event_loop().create_task(
+                cache.put_when_ready(cache_key, result_ref))
 
         return result_ref
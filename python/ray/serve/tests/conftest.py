@@ -52,6 +52,8 @@ def mock_controller_with_name():
             self.host.notify_changed("worker_handles", {})
             self.host.notify_changed("traffic_policies", {})
             self.host.notify_changed("backend_configs", {})
+            self.host.notify_changed("replica_queue_lengths", {})
+            self.host.notify_changed("response_cache_configs", {})
 
         async def listen_for_change(self, snapshot_ids):
             return await self.host.listen_for_change(snapshot_ids)
@@ -73,6 +75,10 @@ def mock_controller_with_name():
             )
             self.host.notify_changed("backend_configs", self.backend_configs)
 
+        def report_replica_metrics(self, backend_tag, replica_tag,
+                                   queue_length, latency_histogram):
+            pass
+
         def update_backend(self, backend_tag: str,
                            backend_config: BackendConfig):
             self.backend_configs[backend_tag] = backend_config
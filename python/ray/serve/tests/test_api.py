@@ -10,6 +10,7 @@ from ray import serve
 from ray.test_utils import wait_for_condition
 from ray.serve.constants import SERVE_PROXY_NAME
 from ray.serve.exceptions import RayServeException
+from ray.serve.http_util import ResponseStream
 from ray.serve.config import BackendConfig
 from ray.serve.utils import (block_until_http_ready, format_actor_name,
                              get_random_letters)
@@ -48,6 +49,78 @@ def test_e2e(serve_instance):
     assert resp == "POST"
 
 
+def test_streaming_request_and_response(serve_instance):
+    client = serve_instance
+
+    def stream_body(flask_request):
+        body = flask_request.data
+        for i in range(3):
+            yield "{}:{}\n".format(i, len(body))
+
+    client.create_backend("streaming:v1", stream_body)
+    client.create_endpoint(
+        "streaming", backend="streaming:v1", route="/stream", methods=["POST"])
+
+    # Larger than HTTP_BODY_STREAMING_CHUNK_SIZE_BYTES, so the request body is
+    # forwarded in chunks through the object store.
+    data = b"a" * (3 * 1024 * 1024 + 5)
+
+    def check():
+        resp = requests.post("http://127.0.0.1:8000/stream", data=data)
+        return resp.text == "".join(
+            "{}:{}\n".format(i, len(data)) for i in range(3))
+
+    wait_for_condition(check)
+
+    # Streams can be consumed from Python by iterating over the result.
+    handle = client.get_handle("streaming")
+    chunks = list(ray.get(handle.remote(b"abc")))
+    assert chunks == ["0:3\n", "1:3\n", "2:3\n"]
+
+    # Closed streams can't be fetched from anymore.
+    stream = ray.get(handle.remote(b"abc"))
+    stream.close()
+    with pytest.raises(ray.exceptions.RayTaskError, match="doesn't exist"):
+        ray.get(stream.fetch_chunks())
+
+    # Only generators are streamed, other iterators are returned as is.
+    def return_iterator(flask_request):
+        return map(str, range(3))
+
+    client.create_backend("iterator:v1", return_iterator)
+    client.create_endpoint("iterator", backend="iterator:v1")
+    result = ray.get(client.get_handle("iterator").remote())
+    assert not isinstance(result, ResponseStream)
+    assert list(result) == ["0", "1", "2"]
+
+
+def test_process_executor_http(serve_instance):
+    client = serve_instance
+
+    def body_length(flask_request):
+        return str(len(flask_request.data))
+
+    def stream(flask_request):
+        yield "chunk"
+
+    config = BackendConfig(executor="process", executor_max_workers=1)
+    client.create_backend("process:v1", body_length, config=config)
+    client.create_endpoint(
+        "process", backend="process:v1", route="/process", methods=["POST"])
+
+    # Streamed through the object store, so read into memory before it is
+    # sent to the executor process.
+    data = b"a" * (3 * 1024 * 1024 + 5)
+    resp = requests.post("http://127.0.0.1:8000/process", data=data)
+    assert resp.text == str(len(data))
+
+    client.create_backend("process:stream", stream, config=config)
+    client.create_endpoint("process_stream", backend="process:stream")
+    handle = client.get_handle("process_stream")
+    with pytest.raises(ray.exceptions.RayTaskError, match="process"):
+        ray.get(handle.remote())
+
+
 def test_backend_user_config(serve_instance):
     client = serve_instance
 
@@ -0,0 +1,169 @@
+import pytest
+
+from ray.serve.autoscaling_policy import (BasicAutoscalingPolicy,
+                                          TargetUtilizationAutoscalingPolicy,
+                                          create_autoscaling_policy)
+from ray.serve.constants import DEFAULT_LATENCY_BUCKET_MS
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def latency_histogram(latency_ms, count):
+    histogram = [0] * (len(DEFAULT_LATENCY_BUCKET_MS) + 1)
+    for i, boundary in enumerate(DEFAULT_LATENCY_BUCKET_MS):
+        if latency_ms <= boundary:
+            histogram[i] += count
+            break
+    else:
+        histogram[-1] += count
+    return histogram
+
+
+class SimulatedBackend:
+    """Fluid model of a backend under a given request rate.
+
+    Each replica serves up to capacity_per_replica requests per second and
+    each request takes service_time_s when it isn't queued.
+    """
+
+    def __init__(self, policy, clock, num_replicas, service_time_s,
+                 capacity_per_replica):
+        self.policy = policy
+        self.clock = clock
+        self.num_replicas = num_replicas
+        self.service_time_s = service_time_s
+        self.capacity_per_replica = capacity_per_replica
+        self.backlog = 0
+        self.history = []
+
+    def step(self, request_rate, dt=1.0):
+        self.clock.now += dt
+        capacity = self.num_replicas * self.capacity_per_replica
+        self.backlog = max(0, self.backlog + (request_rate - capacity) * dt)
+        in_flight = self.backlog + request_rate * self.service_time_s
+        latency_ms = 1000 * (self.service_time_s + self.backlog / capacity)
+
+        for i in range(self.num_replicas):
+            self.policy.record_replica_metrics(
+                "replica-{}".format(i), in_flight / self.num_replicas,
+                latency_histogram(latency_ms,
+                                  int(request_rate * dt / self.num_replicas)))
+        self.num_replicas = self.policy.scale({}, self.num_replicas)
+        self.history.append(self.num_replicas)
+
+    def run(self, request_rate, duration_s):
+        for _ in range(duration_s):
+            self.step(request_rate)
+
+
+def num_direction_changes(history):
+    deltas = [b - a for a, b in zip(history, history[1:]) if b != a]
+    return sum(1 for a, b in zip(deltas, deltas[1:]) if (a > 0) != (b > 0))
+
+
+def make_policy(clock, **config):
+    config = {
+        "policy": "target_utilization",
+        "min_replicas": 1,
+        "max_replicas": 20,
+        "target_ongoing_requests_per_replica": 2,
+        "smoothing_window_s": 10,
+        "scale_up_cooldown_s": 5,
+        "scale_down_cooldown_s": 30,
+        **config
+    }
+    policy = create_autoscaling_policy("backend", config)
+    policy.clock = clock
+    return policy
+
+
+def test_create_autoscaling_policy():
+    assert isinstance(
+        create_autoscaling_policy("backend", {}), BasicAutoscalingPolicy)
+    assert isinstance(
+        create_autoscaling_policy("backend", {"policy": "target_utilization"}),
+        TargetUtilizationAutoscalingPolicy)
+    with pytest.raises(ValueError):
+        create_autoscaling_policy("backend", {"policy": "unknown"})
+
+
+def test_target_utilization_step_load():
+    clock = FakeClock()
+    backend = SimulatedBackend(
+        make_policy(clock),
+        clock,
+        num_replicas=1,
+        service_time_s=0.1,
+        capacity_per_replica=20)
+
+    # 100 requests/s keep 10 requests in flight, so 5 replicas are needed to
+    # have 2 ongoing requests per replica.
+    backend.run(request_rate=10, duration_s=60)
+    assert backend.num_replicas == 1
+    backend.run(request_rate=100, duration_s=120)
+    assert backend.num_replicas == 5
+    assert backend.backlog == 0
+
+    # The smoothing window keeps a drop in load from immediately scaling
+    # down all the way.
+    scale_down_start = len(backend.history)
+    backend.run(request_rate=10, duration_s=120)
+    assert backend.history[scale_down_start] == 5
+    assert backend.num_replicas == 1
+
+    # The load only changed twice, so the number of replicas should have
+    # gone up and then down without oscillating.
+    assert num_direction_changes(backend.history) == 1
+
+
+def test_target_utilization_bounds():
+    clock = FakeClock()
+    backend = SimulatedBackend(
+        make_policy(clock, min_replicas=2, max_replicas=4),
+        clock,
+        num_replicas=2,
+        service_time_s=0.1,
+        capacity_per_replica=20)
+
+    backend.run(request_rate=1, duration_s=60)
+    assert backend.num_replicas == 2
+    backend.run(request_rate=1000, duration_s=60)
+    assert backend.num_replicas == 4
+
+
+def test_target_utilization_latency_slo():
+    clock = FakeClock()
+    policy = make_policy(
+        clock,
+        target_ongoing_requests_per_replica=100,
+        latency_slo_ms=100,
+        scale_up_cooldown_s=0)
+
+    # The queue lengths alone wouldn't trigger scaling up, but the p95
+    # latency is above the SLO.
+    clock.now += 1
+    policy.record_replica_metrics("replica-0", 1, latency_histogram(50, 90))
+    policy.record_replica_metrics("replica-0", 1, latency_histogram(500, 10))
+    assert policy.latency_percentile_ms(0.5) == 50
+    assert policy.latency_percentile_ms(0.95) == 500
+    assert policy.scale({}, 1) == 2
+
+    # Scaling down is held off while the latency is close to the SLO.
+    clock.now += 60
+    policy.record_replica_metrics("replica-0", 1, latency_histogram(75, 10))
+    assert policy.scale({}, 2) == 2
+
+    clock.now += 60
+    policy.record_replica_metrics("replica-0", 1, latency_histogram(10, 10))
+    assert policy.scale({}, 2) == 1
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main(["-v", "-s", __file__]))
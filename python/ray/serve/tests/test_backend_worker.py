@@ -1,4 +1,5 @@
 import asyncio
+import os
 
 import pytest
 import numpy as np
@@ -6,7 +7,8 @@ import numpy as np
 import ray
 from ray import serve
 import ray.serve.context as context
-from ray.serve.backend_worker import create_backend_replica, wrap_to_ray_error
+from ray.serve.backend_worker import (BatchQueue, create_backend_replica,
+                                      wrap_to_ray_error)
 from ray.serve.controller import TrafficPolicy
 from ray.serve.router import Router, RequestMetadata
 from ray.serve.config import BackendConfig, BackendMetadata
@@ -271,6 +273,72 @@ async def test_task_runner_perform_async(serve_instance, router,
         assert await item == "done!"
 
 
+async def test_task_runner_thread_executor(serve_instance, router,
+                                           mock_controller_with_name):
+    @ray.remote(num_cpus=0)
+    class Barrier:
+        def __init__(self, release_on):
+            self.release_on = release_on
+            self.current_waiters = 0
+            self.event = asyncio.Event()
+
+        async def wait(self):
+            self.current_waiters += 1
+            if self.current_waiters == self.release_on:
+                self.event.set()
+            else:
+                await self.event.wait()
+
+    barrier = Barrier.remote(release_on=4)
+
+    # A sync handler blocking on the barrier only completes if the requests
+    # are handled concurrently.
+    def wait_and_go(*args, **kwargs):
+        ray.get(barrier.wait.remote())
+        return "done!"
+
+    config = BackendConfig(executor="thread", executor_max_workers=4)
+    assert config.max_concurrent_queries == 8
+
+    await add_servable_to_router(
+        wait_and_go,
+        router,
+        mock_controller_with_name[0],
+        backend_config=config)
+
+    query_param = make_request_param()
+
+    done, not_done = await asyncio.wait(
+        [(await router.assign_request.remote(query_param)) for _ in range(4)],
+        timeout=30)
+    assert len(done) == 4
+    for item in done:
+        assert await item == "done!"
+
+
+async def test_task_runner_process_executor(serve_instance, router,
+                                            mock_controller_with_name):
+    def double(request):
+        return os.getpid(), request.args["i"] * 2
+
+    await add_servable_to_router(
+        double,
+        router,
+        mock_controller_with_name[0],
+        backend_config=BackendConfig(
+            executor="process", executor_max_workers=2))
+
+    pids = set()
+    for query in range(8):
+        query_param = make_request_param()
+        pid, result = await (await router.assign_request.remote(
+            query_param, i=query))
+        assert result == query * 2
+        pids.add(pid)
+    assert os.getpid() not in pids
+    assert len(pids) <= 2
+
+
 async def test_user_config_update(serve_instance, router,
                                   mock_controller_with_name):
     class Customizable:
@@ -312,6 +380,32 @@ async def test_user_config_update(serve_instance, router,
         assert await i == "new_val"
 
 
+async def test_adaptive_batch_queue():
+    q = BatchQueue(max_batch_size=32, timeout_s=0, latency_slo_s=0.1)
+
+    # Batches cost 5ms plus 2ms per item.
+    for batch_size in [1, 4, 8, 16]:
+        q.observe_execution(batch_size, 0.005 + 0.002 * batch_size)
+    assert q.estimate_exec_time(10) == pytest.approx(0.025)
+
+    # One request every 2ms: a batch of 23 takes 46ms to fill and 51ms to
+    # execute, which is the largest batch that fits in the 100ms SLO.
+    q.ewma_interarrival_s = 0.002
+    q._adapt()
+    assert q.effective_batch_size == 23
+    assert q.effective_timeout_s == pytest.approx(0.046)
+
+    # A burst of requests fills the largest allowed batch right away.
+    for i in range(40):
+        q.put(i)
+    assert len(await q.wait_for_batch()) == 32
+
+    # Without an SLO, the configured values are used as-is.
+    q.set_config(4, 0)
+    assert len(await q.wait_for_batch()) == 4
+    assert q.effective_batch_size == 4
+
+
 if __name__ == "__main__":
     import sys
     sys.exit(pytest.main(["-v", "-s", __file__]))
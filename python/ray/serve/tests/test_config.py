@@ -45,6 +45,38 @@ def test_backend_config_validation():
     assert BackendConfig(
         max_batch_size=7, batch_wait_timeout=1.0).max_concurrent_queries == 14
 
+    # Test batch_latency_slo_ms validation.
+    BackendConfig(
+        max_batch_size=10,
+        batch_latency_slo_ms=100,
+        internal_metadata=BackendMetadata(
+            accepts_batches=True))._validate_complete()
+    with pytest.raises(ValueError):
+        BackendConfig(
+            batch_latency_slo_ms=100,
+            internal_metadata=BackendMetadata(
+                accepts_batches=True))._validate_complete()
+    with pytest.raises(ValidationError, match="value_error"):
+        BackendConfig(batch_latency_slo_ms=0)
+
+    # Test executor validation and its max_concurrent_queries default.
+    assert BackendConfig().executor == "event_loop"
+    assert BackendConfig(
+        executor="thread", executor_max_workers=3).max_concurrent_queries == 6
+    assert BackendConfig(
+        executor="process", executor_max_workers=3,
+        max_batch_size=2).max_concurrent_queries == 12
+    with pytest.raises(ValidationError, match="value_error"):
+        BackendConfig(executor="unknown")
+    with pytest.raises(ValidationError, match="value_error"):
+        BackendConfig(executor_max_workers=0)
+
+    # Test replica_selection_policy validation.
+    assert BackendConfig().replica_selection_policy == "round_robin"
+    BackendConfig(replica_selection_policy="power_of_two")
+    with pytest.raises(ValidationError, match="value_error"):
+        BackendConfig(replica_selection_policy="unknown")
+
 
 def test_backend_config_update():
     b = BackendConfig(num_replicas=1, max_batch_size=1)
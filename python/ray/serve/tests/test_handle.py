@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
 import ray
@@ -106,6 +108,28 @@ def test_handle_inject_flask_request(serve_instance):
         assert request_type == "<class 'flask.wrappers.Request'>"
 
 
+def test_handle_remote_batch(serve_instance):
+    client = serve_instance
+
+    def echo(request):
+        return request.data, request.args["suffix"]
+
+    client.create_backend("echo:v0", echo)
+    client.create_endpoint("echo", backend="echo:v0")
+    handle = client.get_handle("echo")
+
+    refs = handle.remote_batch(list(range(20)), suffix="!")
+    assert ray.get(refs) == [(i, "!") for i in range(20)]
+    assert handle.remote_batch([]) == []
+
+    # Requests from many threads are coalesced but each gets its own result.
+    with ThreadPoolExecutor(8) as executor:
+        results = list(
+            executor.map(lambda i: ray.get(handle.remote(i, suffix="?")),
+                         range(40)))
+    assert results == [(i, "?") for i in range(40)]
+
+
 if __name__ == "__main__":
     import sys
     import pytest
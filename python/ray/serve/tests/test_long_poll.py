@@ -8,8 +8,9 @@ from typing import Dict
 import pytest
 
 import ray
-from ray.serve.long_poll import (LongPollerAsyncClient, LongPollerHost,
-                                 UpdatedObject)
+from ray.serve.constants import LONG_POLL_MAX_DELTAS
+from ray.serve.long_poll import (LongPollDelta, LongPollerAsyncClient,
+                                 LongPollerHost, UpdatedObject)
 
 
 def test_host_standalone(serve_instance):
@@ -39,6 +40,71 @@ def test_host_standalone(serve_instance):
     assert "key_2" in result
 
 
+@pytest.mark.asyncio
+async def test_host_deltas():
+    host = LongPollerHost()
+    host.notify_changed("key", {"a": 1, "b": [2]})
+    snapshot: UpdatedObject = (await host.listen_for_change({
+        "key": -1
+    }))["key"]
+    assert snapshot.object_snapshot == {"a": 1, "b": [2]}
+    assert snapshot.delta is None
+
+    # Only the changed entries are sent to up to date clients.
+    listen = asyncio.get_event_loop().create_task(
+        host.listen_for_change({
+            "key": snapshot.snapshot_id
+        }))
+    await asyncio.sleep(0.1)
+    host.notify_changed("key", {"a": 1, "b": [3], "c": 4})
+    update: UpdatedObject = (await listen)["key"]
+    assert update.object_snapshot is None
+    assert update.delta == LongPollDelta(updated={"b": [3], "c": 4})
+
+    # Deltas since the client's snapshot are merged.
+    host.notify_changed("key", {"b": [3], "c": 4})
+    host.notify_changed("key", {"a": 5, "b": [3], "c": 4})
+    update = (await host.listen_for_change({
+        "key": snapshot.snapshot_id
+    }))["key"]
+    assert update.delta == LongPollDelta(updated={"a": 5, "b": [3], "c": 4})
+    assert update.delta.apply(snapshot.object_snapshot) == {
+        "a": 5,
+        "b": [3],
+        "c": 4
+    }
+
+    # In-place updates of the notified dictionary are detected.
+    value = {"a": [1]}
+    host.notify_changed("key", value)
+    current = (await host.listen_for_change({"key": -1}))["key"]
+    value["a"].append(2)
+    host.notify_changed("key", value)
+    update = (await host.listen_for_change({
+        "key": current.snapshot_id
+    }))["key"]
+    assert update.delta == LongPollDelta(updated={"a": [1, 2]})
+
+    # Clients that are too far behind get a full snapshot.
+    for i in range(LONG_POLL_MAX_DELTAS + 1):
+        host.notify_changed("key", {"a": i})
+    update = (await host.listen_for_change({
+        "key": current.snapshot_id
+    }))["key"]
+    assert update.delta is None
+    assert update.object_snapshot == {"a": LONG_POLL_MAX_DELTAS}
+
+    # Non dictionary objects are always sent whole.
+    host.notify_changed("key", 1)
+    current = (await host.listen_for_change({"key": -1}))["key"]
+    host.notify_changed("key", 2)
+    update = (await host.listen_for_change({
+        "key": current.snapshot_id
+    }))["key"]
+    assert update.delta is None
+    assert update.object_snapshot == 2
+
+
 def test_long_poll_restarts(serve_instance):
     @ray.remote(
         max_restarts=-1,
@@ -117,6 +183,15 @@ async def test_async_client(serve_instance):
 
     assert callback_results == {"key_1": 100, "key_2": 1999}
 
+    # Dictionary updates are sent as deltas and applied by the client.
+    ray.get(host.notify_changed.remote("key_1", {"a": 1, "b": 2}))
+    ray.get(host.notify_changed.remote("key_1", {"a": 1, "b": 3}))
+    for _ in range(3):
+        if callback_results["key_1"] == {"a": 1, "b": 3}:
+            break
+        await asyncio.sleep(1)
+    assert callback_results["key_1"] == {"a": 1, "b": 3}
+
 
 if __name__ == "__main__":
     sys.exit(pytest.main(["-v", "-s", __file__]))
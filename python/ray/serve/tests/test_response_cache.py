@@ -0,0 +1,131 @@
+import time
+
+import pytest
+import requests
+
+import ray
+from ray.serve.config import ResponseCacheConfig
+from ray.serve.context import TaskContext
+from ray.serve.response_cache import ResponseCache, default_cache_key
+from ray.serve.router import Query, RequestMetadata
+from ray.test_utils import wait_for_condition
+
+
+def make_query(*args, **kwargs):
+    return Query(
+        list(args), kwargs, TaskContext.Python,
+        RequestMetadata("request-id", "endpoint", TaskContext.Python))
+
+
+def test_default_cache_key():
+    assert default_cache_key(make_query(1)) == default_cache_key(make_query(1))
+    assert default_cache_key(make_query(1)) != default_cache_key(make_query(2))
+    assert default_cache_key(make_query(1, a=1)) != default_cache_key(
+        make_query(1, a=2))
+
+
+def test_lru_eviction():
+    cache = ResponseCache(ResponseCacheConfig(max_bytes=10))
+
+    cache.put("a", "ref_a", 4)
+    cache.put("b", "ref_b", 4)
+    assert cache.get("a") == "ref_a"
+
+    # "b" is the least recently used entry, so it's evicted first.
+    cache.put("c", "ref_c", 4)
+    assert cache.get("b") is None
+    assert cache.get("a") == "ref_a"
+    assert cache.get("c") == "ref_c"
+    assert cache.num_bytes == 8
+
+    # Entries larger than the cache are never stored.
+    cache.put("d", "ref_d", 11)
+    assert cache.get("d") is None
+    assert len(cache) == 2
+
+    assert cache.num_hits == 3
+    assert cache.num_misses == 2
+
+
+def test_ttl_expiration():
+    cache = ResponseCache(ResponseCacheConfig(ttl_s=0.1))
+    cache.put("a", "ref_a", 1)
+    assert cache.get("a") == "ref_a"
+    time.sleep(0.2)
+    assert cache.get("a") is None
+    assert cache.num_bytes == 0
+
+
+def test_custom_key_fn():
+    cache = ResponseCache(
+        ResponseCacheConfig(
+            key_fn=lambda query: query.args[0] if query.args[0] else None))
+    assert cache.make_key(make_query("key")) == "key"
+    assert cache.make_key(make_query(None)) is None
+
+    # Errors in the key function skip the cache.
+    cache = ResponseCache(ResponseCacheConfig(key_fn=lambda query: 1 / 0))
+    assert cache.make_key(make_query("key")) is None
+
+
+@pytest.mark.asyncio
+async def test_put_when_ready(serve_instance):
+    cache = ResponseCache(ResponseCacheConfig())
+    object_ref = ray.put(b"x" * 1000)
+    await cache.put_when_ready("a", object_ref)
+    assert cache.get("a") == object_ref
+    # The size of the serialized response.
+    assert 1000 <= cache.num_bytes < 2000
+
+    # Errors aren't cached.
+    @ray.remote
+    def fail():
+        raise ValueError()
+
+    await cache.put_when_ready("b", fail.remote())
+    assert cache.get("b") is None
+
+
+def test_cached_endpoint(serve_instance):
+    client = serve_instance
+
+    @ray.remote(num_cpus=0)
+    class Counter:
+        def __init__(self):
+            self.count = 0
+
+        def incr(self):
+            self.count += 1
+
+        def get(self):
+            return self.count
+
+    counter = Counter.remote()
+
+    def echo(request):
+        ray.get(counter.incr.remote())
+        return request.args.get("v", "none")
+
+    client.create_backend("cached:v1", echo)
+    client.create_endpoint(
+        "cached",
+        backend="cached:v1",
+        route="/cached",
+        cache_config={"ttl_s": 60})
+
+    def check_cached():
+        for _ in range(10):
+            assert requests.get("http://127.0.0.1:8000/cached?v=1").text == "1"
+        return ray.get(counter.get.remote()) < 10
+
+    wait_for_condition(check_cached)
+
+    # Requests with different content are not answered from the cache.
+    before = ray.get(counter.get.remote())
+    assert requests.get("http://127.0.0.1:8000/cached?v=2").text == "2"
+    assert ray.get(counter.get.remote()) == before + 1
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main(["-v", "-s", __file__]))
@@ -11,6 +11,7 @@ from ray.serve.context import TaskContext
 
 import ray
 from ray.serve.controller import TrafficPolicy
+from ray.serve.long_poll import LongPollerAsyncClient, LongPollerHost
 from ray.serve.router import Query, ReplicaSet, RequestMetadata, Router
 from ray.serve.utils import get_random_letters
 from ray.test_utils import SignalActor
@@ -255,6 +256,97 @@ async def test_replica_set(ray_instance):
     assert num_queries_set == {2, 1}
 
 
+async def test_replica_set_power_of_two(ray_instance):
+    @ray.remote(num_cpus=0)
+    class MockWorker:
+        def __init__(self):
+            self._num_queries = 0
+
+        async def handle_request(self, request):
+            self._num_queries += 1
+            return "DONE"
+
+        async def num_queries(self):
+            return self._num_queries
+
+    rs = ReplicaSet()
+    rs.set_selection_policy("power_of_two")
+    workers = [MockWorker.remote() for _ in range(2)]
+    rs.update_worker_replicas(workers)
+
+    # The first replica reports a long queue from other routers, so every
+    # query should go to the second one.
+    rs.update_queue_lengths({
+        workers[0]._actor_id: 100,
+        workers[1]._actor_id: 0
+    })
+
+    query = Query([], {}, TaskContext.Python,
+                  RequestMetadata("request-id", "endpoint",
+                                  TaskContext.Python))
+    refs = [await rs.assign_replica(query) for _ in range(5)]
+    assert ray.get(refs) == ["DONE"] * 5
+
+    assert await workers[0].num_queries.remote() == 0
+    assert await workers[1].num_queries.remote() == 5
+
+    with pytest.raises(ValueError):
+        rs.set_selection_policy("unknown")
+
+
+async def test_replica_set_queue_lengths_long_poll(ray_instance):
+    @ray.remote(num_cpus=0)
+    class MockWorker:
+        def __init__(self):
+            self._num_queries = 0
+
+        async def handle_request(self, request):
+            self._num_queries += 1
+            return "DONE"
+
+        async def num_queries(self):
+            return self._num_queries
+
+    workers = [MockWorker.remote() for _ in range(2)]
+    host = ray.remote(LongPollerHost).remote()
+    ray.get(host.notify_changed.remote("worker_handles", {"b": workers}))
+    ray.get(
+        host.notify_changed.remote(
+            "replica_queue_lengths",
+            {"b": {
+                workers[0]._actor_id: 100,
+                workers[1]._actor_id: 0
+            }}))
+
+    # The handles and the queue lengths are deserialized separately, as in
+    # the router.
+    rs = ReplicaSet()
+    rs.set_selection_policy("power_of_two")
+
+    async def update_worker_handles(worker_handles):
+        rs.update_worker_replicas(worker_handles["b"])
+
+    async def update_queue_lengths(queue_lengths):
+        rs.update_queue_lengths(queue_lengths["b"])
+
+    LongPollerAsyncClient(
+        host, {
+            "worker_handles": update_worker_handles,
+            "replica_queue_lengths": update_queue_lengths,
+        })
+    while (len(rs.in_flight_queries) < 2
+           or len(rs.reported_queue_lengths) < 2):
+        await asyncio.sleep(0.1)
+
+    query = Query([], {}, TaskContext.Python,
+                  RequestMetadata("request-id", "endpoint",
+                                  TaskContext.Python))
+    refs = [await rs.assign_replica(query) for _ in range(5)]
+    assert ray.get(refs) == ["DONE"] * 5
+    assert await workers[0].num_queries.remote() == 0
+    assert await workers[1].num_queries.remote() == 5
+
+
 if __name__ == "__main__":
     import sys
     sys.exit(pytest.main(["-v", "-s", __file__]))
@@ -129,6 +129,36 @@ def test_multiple_routers():
     cluster.shutdown()
 
 
+@pytest.mark.skipif(
+    not hasattr(socket, "SO_REUSEPORT"),
+    reason=("Port sharing only works on newer verion of Linux. "
+            "This test can only be ran when port sharing is supported."))
+def test_multiple_proxies_per_node():
+    port = new_port()
+    client = serve.start(http_port=port, http_proxies_per_node=3)
+
+    routers = ray.get(client._controller.get_routers.remote())
+    assert len(routers) == 3 * len(get_all_node_ids())
+    ray.get([router.ready.remote() for router in routers.values()])
+
+    # Routes are pushed to every proxy through long poll.
+    client.create_backend("f", lambda _: "hello")
+    client.create_endpoint("f", backend="f", route="/f")
+
+    def check_all_proxies_routed():
+        # New connections are spread among the proxies by the kernel.
+        return all(
+            requests.get(f"http://127.0.0.1:{port}/f").text == "hello"
+            for _ in range(20))
+
+    wait_for_condition(check_all_proxies_routed)
+
+    with pytest.raises(ValueError):
+        serve.start(http_port=new_port(), http_proxies_per_node=0)
+
+    ray.shutdown()
+
+
 def test_middleware():
     from starlette.middleware import Middleware
     from starlette.middleware.cors import CORSMiddleware
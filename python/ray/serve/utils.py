@@ -20,7 +20,8 @@ import flask
 import ray
 from ray.serve.constants import HTTP_PROXY_TIMEOUT
 from ray.serve.context import TaskContext
-from ray.serve.http_util import build_flask_request
+from ray.serve.http_util import (build_flask_request, StreamedBody,
+                                 StreamedBodyReader)
 
 ACTOR_FAILURE_RETRY_TIMEOUT_S = 60
 
@@ -84,10 +85,21 @@ class ServeRequest:
         return self._data
 
 
-def parse_request_item(request_item):
+def parse_request_item(request_item, load_body=False):
+    """Build the argument of the backend from a query.
+
+    If load_body is set, a body streamed through the object store is read
+    into memory, so the request can be sent to another process.
+    """
     if request_item.metadata.request_context == TaskContext.Web:
-        asgi_scope, body_bytes = request_item.args
-        return build_flask_request(asgi_scope, io.BytesIO(body_bytes))
+        asgi_scope, body = request_item.args
+        if isinstance(body, StreamedBody) and load_body:
+            body_stream = io.BytesIO(b"".join(ray.get(body.chunk_refs)))
+        elif isinstance(body, StreamedBody):
+            body_stream = io.BufferedReader(StreamedBodyReader(body))
+        else:
+            body_stream = io.BytesIO(body)
+        return build_flask_request(asgi_scope, body_stream)
     else:
         arg = request_item.args[0] if len(request_item.args) == 1 else None
 
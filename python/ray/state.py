@@ -15,6 +15,40 @@ from ray._raylet import GlobalStateAccessor
 
 logger = logging.getLogger(__name__)
 
+# Default number of rows in the pages of the columnar state API.
+DEFAULT_PAGE_SIZE = 1000
+
+ActorState = gcs_utils.ActorTableData.ActorState
+
+# Map from column name to a function computing it from a table entry.
+ACTOR_COLUMNS = {
+    "actor_id": lambda actor: binary_to_hex(actor.actor_id),
+    "name": lambda actor: actor.name,
+    "job_id": lambda actor: binary_to_hex(actor.job_id),
+    "state": lambda actor: ActorState.Name(actor.state),
+    "node_id": lambda actor: binary_to_hex(actor.address.raylet_id),
+    "ip_address": lambda actor: actor.address.ip_address,
+    "port": lambda actor: actor.address.port,
+    "num_restarts": lambda actor: actor.num_restarts,
+    "timestamp": lambda actor: actor.timestamp,
+}
+OBJECT_COLUMNS = {
+    "object_id": lambda obj: binary_to_hex(obj.object_id),
+    "node_ids": lambda obj: [
+        binary_to_hex(location.manager) for location in obj.locations
+    ],
+    "spilled_url": lambda obj: obj.spilled_url,
+}
+WORKER_COLUMNS = {
+    "worker_id": lambda worker: binary_to_hex(worker.worker_address.worker_id),
+    "node_id": lambda worker: binary_to_hex(worker.worker_address.raylet_id),
+    "ip_address": lambda worker: worker.worker_address.ip_address,
+    "port": lambda worker: worker.worker_address.port,
+    "is_alive": lambda worker: worker.is_alive,
+    "is_driver": lambda worker: worker.worker_type == gcs_utils.DRIVER,
+    "timestamp": lambda worker: worker.timestamp,
+}
+
 
 class GlobalState:
     """A class used to interface with the Ray control state.
@@ -712,6 +746,152 @@ class GlobalState:
                         worker_info[b"stdout_file"])
         return workers_data
 
+    def _table_pages(self, entries, parse, row_filter, all_columns, columns,
+                     page_size):
+        """Convert serialized table entries to pages of columns.
+
+        Args:
+            entries (list): The serialized table entries.
+            parse: Function parsing an entry into a protobuf message.
+            row_filter: Function returning whether a message is included.
+            all_columns (dict): Map from column name to a function computing
+                it from a message.
+            columns (list): The columns to compute, all if None.
+            page_size (int): The maximum number of rows per page.
+
+        Returns:
+            A generator of dicts mapping column names to lists of values.
+        """
+        if page_size <= 0:
+            raise ValueError(f"page_size must be positive, got {page_size}.")
+        if columns is None:
+            columns = list(all_columns)
+        unknown_columns = set(columns) - set(all_columns)
+        if unknown_columns:
+            raise ValueError(f"Unknown columns {sorted(unknown_columns)}, "
+                             f"available columns are {list(all_columns)}.")
+        getters = [(column, all_columns[column]) for column in columns]
+
+        def generate_pages():
+            page = {column: [] for column in columns}
+            num_rows = 0
+            for i in range(len(entries)):
+                message = parse(entries[i])
+                # Drop the serialized entry once it's parsed, so that the
+                # memory used doesn't grow with the number of pages read.
+                entries[i] = None
+                if not row_filter(message):
+                    continue
+                for column, get_value in getters:
+                    page[column].append(get_value(message))
+                num_rows += 1
+                if num_rows == page_size:
+                    yield page
+                    page = {column: [] for column in columns}
+                    num_rows = 0
+            if num_rows > 0:
+                yield page
+
+        return generate_pages()
+
+    def actor_pages(self,
+                    job_id=None,
+                    actor_state=None,
+                    node_id=None,
+                    columns=None,
+                    page_size=DEFAULT_PAGE_SIZE):
+        """Fetch the actor table as pages of columns.
+
+        Args:
+            job_id: A hex string, only include the actors of this job.
+            actor_state: Only include the actors in this state, e.g.
+                "ALIVE".
+            node_id: A hex string, only include the actors on this node.
+            columns (list): The columns to include, all the columns of
+                ACTOR_COLUMNS if None.
+            page_size (int): The maximum number of actors per page.
+
+        Returns:
+            A generator of dicts mapping column names to lists of values.
+        """
+        self._check_connected()
+        if job_id is not None:
+            job_id = hex_to_binary(job_id)
+        if actor_state is not None:
+            actor_state = ActorState.Value(actor_state)
+        if node_id is not None:
+            node_id = hex_to_binary(node_id)
+
+        def row_filter(actor):
+            return ((job_id is None or actor.job_id == job_id)
+                    and (actor_state is None or actor.state == actor_state) and
+                    (node_id is None or actor.address.raylet_id == node_id))
+
+        return self._table_pages(self.global_state_accessor.get_actor_table(),
+                                 gcs_utils.ActorTableData.FromString,
+                                 row_filter, ACTOR_COLUMNS, columns, page_size)
+
+    def object_pages(self,
+                     node_id=None,
+                     columns=None,
+                     page_size=DEFAULT_PAGE_SIZE):
+        """Fetch the object table as pages of columns.
+
+        Args:
+            node_id: A hex string, only include the objects with a copy on
+                this node.
+            columns (list): The columns to include, all the columns of
+                OBJECT_COLUMNS if None.
+            page_size (int): The maximum number of objects per page.
+
+        Returns:
+            A generator of dicts mapping column names to lists of values.
+        """
+        self._check_connected()
+        if node_id is not None:
+            node_id = hex_to_binary(node_id)
+
+        def row_filter(obj):
+            return node_id is None or any(location.manager == node_id
+                                          for location in obj.locations)
+
+        return self._table_pages(self.global_state_accessor.get_object_table(),
+                                 gcs_utils.ObjectLocationInfo.FromString,
+                                 row_filter, OBJECT_COLUMNS, columns,
+                                 page_size)
+
+    def worker_pages(self,
+                     node_id=None,
+                     is_alive=None,
+                     columns=None,
+                     page_size=DEFAULT_PAGE_SIZE):
+        """Fetch the worker table, including drivers, as pages of columns.
+
+        Args:
+            node_id: A hex string, only include the workers on this node.
+            is_alive (bool): Only include the live workers if True, the dead
+                ones if False.
+            columns (list): The columns to include, all the columns of
+                WORKER_COLUMNS if None.
+            page_size (int): The maximum number of workers per page.
+
+        Returns:
+            A generator of dicts mapping column names to lists of values.
+        """
+        self._check_connected()
+        if node_id is not None:
+            node_id = hex_to_binary(node_id)
+
+        def row_filter(worker):
+            return ((node_id is None
+                     or worker.worker_address.raylet_id == node_id)
+                    and (is_alive is None or worker.is_alive == is_alive))
+
+        return self._table_pages(self.global_state_accessor.get_worker_table(),
+                                 gcs_utils.WorkerTableData.FromString,
+                                 row_filter, WORKER_COLUMNS, columns,
+                                 page_size)
+
     def add_worker(self, worker_id, worker_type, worker_info):
         """ Add a worker to the cluster.
 
@@ -927,6 +1107,78 @@ def objects(object_ref=None):
     return state.object_table(object_ref=object_ref)
 
 
+def actor_pages(job_id=None,
+                actor_state=None,
+                node_id=None,
+                columns=None,
+                page_size=DEFAULT_PAGE_SIZE):
+    """Fetch actor info as pages of columns, e.g. for dashboards.
+
+    Unlike actors(), the actors are filtered before their info is built, and
+    the info is returned in pages of at most page_size actors, as dicts
+    mapping column names to lists of values. A page can be converted to an
+    Arrow table with pyarrow.Table.from_pydict.
+
+    Args:
+        job_id: A hex string, only include the actors of this job.
+        actor_state: Only include the actors in this state, e.g. "ALIVE".
+        node_id: A hex string, only include the actors on this node.
+        columns (list): The columns to include, all the columns of
+            ACTOR_COLUMNS if None.
+        page_size (int): The maximum number of actors per page.
+
+    Returns:
+        A generator of dicts mapping column names to lists of values.
+    """
+    return state.actor_pages(
+        job_id=job_id,
+        actor_state=actor_state,
+        node_id=node_id,
+        columns=columns,
+        page_size=page_size)
+
+
+def object_pages(node_id=None, columns=None, page_size=DEFAULT_PAGE_SIZE):
+    """Fetch object info as pages of columns, see actor_pages.
+
+    Args:
+        node_id: A hex string, only include the objects with a copy on this
+            node.
+        columns (list): The columns to include, all the columns of
+            OBJECT_COLUMNS if None.
+        page_size (int): The maximum number of objects per page.
+
+    Returns:
+        A generator of dicts mapping column names to lists of values.
+    """
+    return state.object_pages(
+        node_id=node_id, columns=columns, page_size=page_size)
+
+
+def worker_pages(node_id=None,
+                 is_alive=None,
+                 columns=None,
+                 page_size=DEFAULT_PAGE_SIZE):
+    """Fetch worker and driver info as pages of columns, see actor_pages.
+
+    Args:
+        node_id: A hex string, only include the workers on this node.
+        is_alive (bool): Only include the live workers if True, the dead ones
+            if False.
+        columns (list): The columns to include, all the columns of
+            WORKER_COLUMNS if None.
+        page_size (int): The maximum number of workers per page.
+
+    Returns:
+        A generator of dicts mapping column names to lists of values.
+    """
+    return state.worker_pages(
+        node_id=node_id,
+        is_alive=is_alive,
+        columns=columns,
+        page_size=page_size)
+
+
 def timeline(filename=None):
     """Return a list of profiling events that can viewed as a timeline.
 
@@ -1,7 +1,9 @@
 # coding: utf-8
+import json
 import logging
 import os
 import pickle
+import subprocess
 import sys
 import time
 
@@ -51,6 +53,43 @@ def test_omp_threads_set(shutdown_only):
     assert os.environ["OMP_NUM_THREADS"] == "1"
 
 
+# Budget for `import ray` in a fresh interpreter. It is generous so that
+# the test isn't flaky on loaded machines, the modules that should be
+# imported lazily are checked separately.
+IMPORT_RAY_BUDGET_S = 2
+
+IMPORT_RAY_BENCHMARK = """
+import json
+import sys
+import time
+
+start = time.perf_counter()
+import ray
+duration = time.perf_counter() - start
+lazy_modules = ["ray.worker", "ray.state", "ray.util.iter", "redis"]
+print(json.dumps({
+    "duration": duration,
+    "imported": [m for m in lazy_modules if m in sys.modules],
+}))
+"""
+
+
+def test_import_time():
+    results = [
+        json.loads(
+            subprocess.check_output(
+                [sys.executable, "-c", IMPORT_RAY_BENCHMARK]))
+        for _ in range(3)
+    ]
+    assert results[0]["imported"] == []
+    assert min(result["duration"] for result in results) < IMPORT_RAY_BUDGET_S
+
+    # The lazily imported API is still usable.
+    assert ray.util.ActorPool.__name__ == "ActorPool"
+    assert callable(ray.state.nodes)
+    assert "put" in dir(ray)
+
+
 def test_submit_api(shutdown_only):
     ray.init(num_cpus=2, num_gpus=1, resources={"Custom": 1})
 
@@ -310,6 +349,53 @@ def test_put_get(shutdown_only):
         assert value_before == value_after
 
 
+def test_put_many(shutdown_only):
+    ray.init(num_cpus=0)
+
+    # Small values are stored in the in-memory store and large ones in
+    # plasma.
+    inner_ref = ray.put(0)
+    values = [i for i in range(100)] + ["h" * i for i in range(100)] + [
+        np.zeros(1024 * 1024), [inner_ref], b"raw", None
+    ]
+    object_refs = ray.put_many(values)
+    assert len(set(object_refs)) == len(values)
+    results = ray.get(object_refs)
+    assert results[:200] == values[:200]
+    assert np.array_equal(results[200], values[200])
+    assert ray.get(results[201][0]) == 0
+    assert results[202:] == [b"raw", None]
+
+    # The inner object is kept alive by the outer one.
+    del inner_ref
+    assert ray.get(ray.get(object_refs[201])[0]) == 0
+
+    assert ray.put_many([]) == []
+    with pytest.raises(TypeError):
+        ray.put_many([ray.put(0)])
+    with pytest.raises(TypeError):
+        ray.put_many(0)
+
+
+def test_put_many_store_full(shutdown_only):
+    ray.init(
+        num_cpus=0,
+        object_store_memory=10**8,
+        _system_config={"object_store_full_max_retries": 0})
+
+    # The last value doesn't fit in the store, the ones put before it must
+    # not be leaked.
+    values = [np.zeros(10**6, dtype=np.uint8) for _ in range(5)]
+    with pytest.raises(ray.exceptions.ObjectStoreFullError):
+        ray.put_many(values + [np.zeros(2 * 10**8, dtype=np.uint8)])
+    ray.test_utils.wait_for_condition(
+        lambda: len(ray.worker.global_worker.core_worker.
+                    get_all_reference_counts()) == 0)
+
+    object_refs = ray.put_many(values)
+    assert len(object_refs) == 5
+
+
 @pytest.mark.skipif(sys.platform != "linux", reason="Failing on Windows")
 def test_wait_timing(shutdown_only):
     ray.init(num_cpus=2)
@@ -1,5 +1,6 @@
 # coding: utf-8
 import logging
+import os
 import sys
 import threading
 import time
@@ -626,6 +627,48 @@ def test_duplicate_args(ray_start_regular_shared):
             arg1, arg2, arg1, kwarg1=arg1, kwarg2=arg2, kwarg1_duplicate=arg1))
 
 
+def test_definition_cache(tmp_path):
+    from ray.function_manager import DefinitionCache
+
+    cache = DefinitionCache(str(tmp_path))
+    assert cache.get(b"RemoteFunction:1", ["function"]) is None
+    cache.put(b"RemoteFunction:1", ["function", "module"], [b"f", b"m"])
+    assert cache.get(b"RemoteFunction:1",
+                     ["module", "function"]) == [b"m", b"f"]
+    # Missing fields and corrupted entries are cache misses.
+    assert cache.get(b"RemoteFunction:1", ["max_calls"]) is None
+    with open(cache._path(b"RemoteFunction:1"), "wb") as f:
+        f.write(b"corrupted")
+    assert cache.get(b"RemoteFunction:1", ["function"]) is None
+
+
+def test_definition_cache_populated(ray_start_regular_shared):
+    @ray.remote
+    def f():
+        return 1
+
+    @ray.remote
+    class Actor:
+        def ping(self):
+            return 1
+
+    assert ray.get(f.remote()) == 1
+    assert ray.get(Actor.remote().ping.remote()) == 1
+    cache_dir = os.path.join(ray.worker._global_node.get_session_dir_path(),
+                             "function_cache")
+    assert len(os.listdir(cache_dir)) >= 2
+
+
+def test_worker_preload_modules(shutdown_only):
+    ray.init(num_cpus=1, _worker_preload_modules=["colorsys", "nonexistent"])
+
+    @ray.remote
+    def preloaded():
+        return "colorsys" in sys.modules
+
+    assert ray.get(preloaded.remote())
+
+
 def test_get_correct_node_ip():
     with patch("ray.worker") as worker_mock:
         node_mock = MagicMock()
@@ -143,6 +143,50 @@ def test_global_state_actor_entry(ray_start_regular):
         actor_id=b_actor_id)["State"] == ray.gcs_utils.ActorTableData.ALIVE
 
 
+def test_global_state_pages(ray_start_regular):
+    @ray.remote
+    class Actor:
+        def ready(self):
+            pass
+
+    actors = [Actor.remote() for _ in range(5)]
+    ray.get([actor.ready.remote() for actor in actors])
+    ray.kill(actors[0])
+    dead_actor_id = actors[0]._actor_id.hex()
+
+    def dead_actor_ids():
+        return [
+            actor_id for page in ray.state.actor_pages(actor_state="DEAD")
+            for actor_id in page["actor_id"]
+        ]
+
+    ray.test_utils.wait_for_condition(
+        lambda: dead_actor_ids() == [dead_actor_id])
+
+    pages = list(
+        ray.state.actor_pages(
+            actor_state="ALIVE", columns=["actor_id", "job_id"], page_size=3))
+    assert [len(page["actor_id"]) for page in pages] == [3, 1]
+    assert set(pages[0]) == {"actor_id", "job_id"}
+    job_id = ray.worker.global_worker.current_job_id.hex()
+    assert all(actor_job_id == job_id for page in pages
+               for actor_job_id in page["job_id"])
+    assert list(ray.state.actor_pages(job_id="ffff")) == []
+
+    workers = list(ray.state.worker_pages(is_alive=True))
+    assert len(workers) == 1
+    assert set(workers[0]) == set(ray.state.WORKER_COLUMNS)
+    assert all(workers[0]["is_alive"])
+
+    for page in ray.state.object_pages():
+        assert set(page) == set(ray.state.OBJECT_COLUMNS)
+
+    with pytest.raises(ValueError):
+        ray.state.actor_pages(columns=["unknown"])
+    with pytest.raises(ValueError):
+        ray.state.actor_pages(page_size=0)
+
+
 @pytest.mark.parametrize("max_shapes", [0, 2, -1])
 @pytest.mark.skipif(new_scheduler_enabled(), reason="broken")
 def test_load_report(shutdown_only, max_shapes):
@@ -356,6 +356,75 @@ def test_repartition_consistent(ray_start_regular_shared):
         it2.gather_async())
 
 
+def test_repartition_by(ray_start_regular_shared):
+    it = from_range(
+        100, num_shards=3).repartition_by(
+            lambda x: x % 4, num_partitions=2, batch_size=7)
+    assert repr(it) == ("ParallelIterator[from_range[100, shards=3]" +
+                        ".repartition_by[num_partitions=2]]")
+    assert it.num_shards() == 2
+    shards = [list(it.get_shard(i)) for i in range(2)]
+    assert sorted(shards[0] + shards[1]) == list(range(100))
+    # All the items with the same key are in the same shard.
+    keys = [{x % 4 for x in shard} for shard in shards]
+    assert not keys[0] & keys[1]
+
+    # String keys are partitioned the same way on all the shards.
+    it = from_items(
+        ["a", "b", "c"] * 10, num_shards=4).repartition_by(
+            lambda x: x, num_partitions=3)
+    for i in range(3):
+        assert len(set(it.get_shard(i))) <= 1
+
+
+def test_repartition_skewed(ray_start_regular_shared):
+    # Partition 1 gets a single item of each round of 5 items, the 40 rounds
+    # are bucketed whatever the pace of the partitions.
+    def key(x):
+        return int(x % 10 == 0)
+
+    it = from_range(200, num_shards=1).repartition_by(key, 2, batch_size=5)
+    assert sorted(it.gather_sync()) == list(range(200))
+
+    it = from_range(200, num_shards=1).repartition_by(key, 2, batch_size=5)
+    assert list(it.get_shard(1)) == list(range(0, 200, 10))
+    assert len(list(it.get_shard(0))) == 180
+
+
+def test_repartition_release_buckets(ray_start_regular_shared):
+    worker = ParallelIteratorWorker(range(10), repeat=False)
+    worker.par_iter_init([])
+    worker.par_iter_init_buckets(
+        lambda x: x % 2, num_partitions=2, batch_size=1)
+    assert ray.get(worker.par_iter_bucket(0, 0)) == [0]
+    assert worker.par_iter_bucket(0, 1) is None
+    assert ray.get(worker.par_iter_bucket(0, 2)) == [2]
+    # The rounds stay until partition 1 fetches them.
+    assert len(worker.buckets.rounds) == 3
+    assert worker.par_iter_bucket(1, 0) is None
+    assert len(worker.buckets.rounds) == 2
+    # The buckets of a partition are freed when its consumer is gone.
+    worker.par_iter_release_buckets(1)
+    assert not worker.buckets.rounds
+    assert worker.par_iter_bucket(0, 3) is None
+    assert ray.get(worker.par_iter_bucket(0, 4)) == [4]
+
+
+def test_global_shuffle(ray_start_regular_shared):
+    it = from_range(100, num_shards=2).global_shuffle(seed=0)
+    assert repr(it) == ("ParallelIterator[from_range[100, shards=2]" +
+                        ".global_shuffle[num_partitions=2, seed=0]]")
+    shard_0 = list(it.get_shard(0))
+    shard_1 = list(it.get_shard(1))
+    assert sorted(shard_0 + shard_1) == list(range(100))
+    # Items are moved across shards.
+    assert set(shard_0) != set(range(50))
+
+    it = from_range(100, num_shards=2).global_shuffle(num_partitions=3)
+    assert it.num_shards() == 3
+    assert sorted(it.gather_async()) == list(range(100))
+
+
 def test_batch(ray_start_regular_shared):
     it = from_range(4, 1).batch(2)
     assert repr(it) == "ParallelIterator[from_range[4, shards=1].batch(2)]"
@@ -393,6 +462,33 @@ def test_gather_async_optimized(ray_start_regular_shared):
     assert sorted(it) == list(range(100))
 
 
+def test_gather_async_max_inflight_bytes(ray_start_regular_shared):
+    it = from_range(100, num_shards=4).for_each(lambda x: [x] * 1000)
+    local_it = it.gather_async(num_async=4, max_inflight_bytes=1)
+    # Only one batch fits in the budget, so the shards are left idle while
+    # the consumer is busy.
+    items = []
+    for item in local_it:
+        items.append(item[0])
+        time.sleep(0.001)
+    assert sorted(items) == list(range(100))
+    metrics = local_it.shared_metrics.get()
+    assert metrics.counters["gather_async_producer_stall_time_s"] > 0
+    assert 1 <= metrics.info["gather_async_num_async"] <= 4
+    assert metrics.info["gather_async_inflight_bytes"] == 0
+
+    it = from_range(100, num_shards=4).for_each(lambda x: time.sleep(0.01))
+    local_it = it.gather_async(num_async=4, max_inflight_bytes=10**9)
+    assert len(list(local_it)) == 100
+    # The consumer waits for the slow shards, so more batches get prefetched.
+    metrics = local_it.shared_metrics.get()
+    assert metrics.counters["gather_async_consumer_stall_time_s"] > 0
+    assert metrics.info["gather_async_num_async"] > 1
+
+    with pytest.raises(ValueError):
+        from_range(4).gather_async(max_inflight_bytes=0)
+
+
 def test_get_shard_optimized(ray_start_regular_shared):
     it = from_range(6, num_shards=3)
     shard1 = it.get_shard(shard_index=0, batch_ms=25, num_async=2)
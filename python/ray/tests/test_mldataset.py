@@ -1,5 +1,6 @@
 import ray.util.iter as parallel_it
 import ray.util.data as ml_data
+from ray.util.data.arrow import column_values, rebatch
 import pytest
 
 import pyarrow as pa
@@ -35,6 +36,69 @@ def test_read_parquet(ray_start_regular_shared, tmp_path):
     assert df2[["two"]].equals(result[1])
 
 
+def test_read_parquet_filters(ray_start_regular_shared, tmp_path):
+    df = pd.DataFrame({"one": list(range(10)), "two": list("abcdefghij")})
+    # Row groups of 2 rows: [0, 1], [2, 3], ..., [8, 9].
+    pq.write_table(
+        pa.Table.from_pandas(df),
+        os.path.join(tmp_path, "test.parquet"),
+        row_group_size=2)
+
+    def read(filters):
+        ds = ml_data.read_parquet(tmp_path, num_shards=2, filters=filters)
+        return sorted(ds.gather_sync().for_each(lambda df: df["one"].tolist())
+                      .flatten())
+
+    assert read(None) == list(range(10))
+    # Only the row groups that may match are read, with all their rows.
+    assert read([("one", "=", 3)]) == [2, 3]
+    assert read([("one", ">=", 7)]) == [6, 7, 8, 9]
+    assert read([("one", "in", {0, 9})]) == [0, 1, 8, 9]
+    assert read([("one", ">", 3), ("two", "<", "f")]) == [4, 5]
+    assert read([[("one", "<", 2)], [("two", "=", "i")]]) == [0, 1, 8, 9]
+    assert read([("one", ">", 100)]) == []
+    with pytest.raises(ValueError):
+        ml_data.read_parquet(tmp_path, num_shards=2, filters=[("one", "~", 1)])
+
+
+def test_read_parquet_partition_filters(ray_start_regular_shared, tmp_path):
+    df = pd.DataFrame({"one": [1, 2, 3, 4], "part": ["a", "a", "b", "b"]})
+    pq.write_to_dataset(
+        pa.Table.from_pandas(df), str(tmp_path), partition_cols=["part"])
+    ds = ml_data.read_parquet(
+        str(tmp_path), num_shards=1, filters=[("part", "=", "b")])
+    result = pd.concat(list(ds.gather_sync()))
+    assert sorted(result["one"]) == [3, 4]
+
+
+def test_read_parquet_arrow(ray_start_regular_shared, tmp_path):
+    df = pd.DataFrame({"one": list(range(10)), "two": list("abcdefghij")})
+    pq.write_table(
+        pa.Table.from_pandas(df),
+        os.path.join(tmp_path, "test.parquet"),
+        row_group_size=2)
+
+    for prefetch in [0, 2]:
+        ds = ml_data.read_parquet(
+            tmp_path,
+            num_shards=2,
+            columns=["one"],
+            use_threads=True,
+            prefetch=prefetch,
+            output_format="arrow")
+        tables = list(ds.gather_sync())
+        assert all(isinstance(table, pa.Table) for table in tables)
+        assert sorted(sum((t.column("one").to_pylist() for t in tables),
+                          [])) == list(range(10))
+
+        frames = list(ds.to_pandas().gather_sync())
+        assert all(isinstance(frame, pd.DataFrame) for frame in frames)
+        assert sorted(pd.concat(frames)["one"]) == list(range(10))
+
+    with pytest.raises(ValueError):
+        ml_data.read_parquet(tmp_path, num_shards=2, output_format="csv")
+
+
 def test_from_parallel_it(ray_start_regular_shared):
     para_it = parallel_it.from_range(4).for_each(lambda x: [x])
     ds = ml_data.from_parallel_iter(para_it, batch_size=2)
@@ -66,6 +130,51 @@ def test_batch(ray_start_regular_shared):
     assert list(flattened) == list(expected)
 
 
+def test_to_arrow(ray_start_regular_shared):
+    para_it = parallel_it.from_range(16).for_each(lambda x: [x, [x, x]])
+    ds = ml_data.from_parallel_iter(para_it, batch_size=3).to_arrow()
+    assert repr(ds) == ("MLDataset[from_range[16, shards=2]"
+                        ".for_each().batch(3).to_pandas().to_arrow()]")
+    collected = list(ds.gather_sync())
+    assert all(isinstance(table, pa.Table) for table in collected)
+    # Pandas column names become strings.
+    assert collected[0].schema.names == ["0", "1"]
+
+    ds = ds.batch(4)
+    collected = list(ds.gather_sync())
+    assert all(table.num_rows == 4 for table in collected)
+    assert len(collected) == 4
+    values = sorted(
+        ds.gather_sync().for_each(lambda t: column_values(t, 0).tolist())
+        .flatten())
+    assert values == list(range(16))
+
+    vectors = column_values(collected[0], 1)
+    assert vectors.shape == (4, 2)
+    assert (vectors[:, 0] == vectors[:, 1]).all()
+
+    shuffled = list(ds.local_shuffle(shuffle_buffer_size=2).gather_sync())
+    assert sorted(sum((column_values(t, 0).tolist() for t in shuffled),
+                      [])) == list(range(16))
+
+    frames = list(ds.to_pandas().gather_sync())
+    assert all(isinstance(frame, pd.DataFrame) for frame in frames)
+
+
+def test_rebatch_arrow():
+    tables = [
+        pa.Table.from_pandas(
+            pd.DataFrame({
+                "a": list(range(i, i + n))
+            }), preserve_index=False) for i, n in [(0, 3), (3, 1), (4, 5)]
+    ]
+    batches = list(rebatch(tables, 2))
+    assert [batch.num_rows for batch in batches] == [2, 2, 2, 2, 1]
+    assert [column_values(batch, "a").tolist()
+            for batch in batches] == [[0, 1], [2, 3], [4, 5], [6, 7], [8]]
+    assert list(rebatch([], 2)) == []
+
+
 def test_local_shuffle(ray_start_regular_shared):
     para_it = parallel_it.from_range(100).for_each(lambda x: [x])
 
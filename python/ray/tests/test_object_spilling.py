@@ -10,7 +10,8 @@ import numpy as np
 import pytest
 import psutil
 import ray
-from ray.external_storage import (create_url_with_offset,
+from ray.external_storage import (ExternalStorage, FileSystemStorage,
+                                  TieredStorage, create_url_with_offset,
                                   parse_url_with_offset)
 from ray.test_utils import new_scheduler_enabled, wait_for_condition
 
@@ -125,6 +126,229 @@ def test_url_generation_and_parse():
     assert parsed_result.size == size
 
 
+class InMemoryFileSystemStorage(FileSystemStorage):
+    """FileSystemStorage reading and writing a dict instead of plasma."""
+
+    def __init__(self, directory_path, objects, **kwargs):
+        super().__init__(directory_path, **kwargs)
+        # Map object_ref -> (metadata, data)
+        self.objects = objects
+        self.restored = {}
+
+    def _get_objects_from_store(self, object_refs):
+        return [(self.objects[ref][1], self.objects[ref][0])
+                for ref in object_refs]
+
+    def _put_object_to_store(self, metadata, data_size, file_like, object_ref):
+        data = bytearray(data_size)
+        view = memoryview(data)
+        index = 0
+        while index < data_size:
+            index += file_like.readinto(view[index:])
+        self.restored[object_ref] = (metadata, bytes(data))
+
+
+def test_restore_fused_objects(tmp_path):
+    objects = {
+        ray.ObjectRef.from_random(): (b"meta" * i, os.urandom(i * 1000))
+        for i in range(10)
+    }
+    storage = InMemoryFileSystemStorage(str(tmp_path), objects, io_threads=2)
+    refs = list(objects.keys())
+    # Fuse the objects into 3 files.
+    urls = (storage.spill_objects(refs[:3]) + storage.spill_objects(refs[3:7])
+            + storage.spill_objects(refs[7:]))
+    assert len(list(tmp_path.iterdir())) == 3
+
+    # Restore objects from several files, out of order.
+    order = list(range(len(refs)))
+    random.shuffle(order)
+    storage.restore_spilled_objects([refs[i] for i in order],
+                                    [urls[i] for i in order])
+    assert storage.restored == objects
+
+    # Restoring from a single file doesn't use the thread pool.
+    storage.restored = {}
+    storage.restore_spilled_objects(refs[3:7], urls[3:7])
+    assert storage.restored == {ref: objects[ref] for ref in refs[3:7]}
+
+    with pytest.raises(ValueError):
+        FileSystemStorage(str(tmp_path), io_threads=0)
+
+
+def test_compressed_spilling(tmp_path):
+    compressible_ref = ray.ObjectRef.from_random()
+    random_ref = ray.ObjectRef.from_random()
+    small_ref = ray.ObjectRef.from_random()
+    objects = {
+        compressible_ref: (b"meta", b"a" * 1024 * 1024),
+        random_ref: (b"meta", os.urandom(1024 * 1024)),
+        small_ref: (b"", b"a" * 100),
+    }
+    refs = list(objects.keys())
+
+    uncompressed_dir = tmp_path / "uncompressed"
+    storage = InMemoryFileSystemStorage(str(uncompressed_dir), objects)
+    uncompressed_urls = storage.spill_objects(refs)
+
+    compressed_dir = tmp_path / "compressed"
+    storage = InMemoryFileSystemStorage(
+        str(compressed_dir), objects, compression="zlib")
+    urls = storage.spill_objects(refs)
+
+    # Only the large and compressible object is compressed.
+    sizes = [parse_url_with_offset(url.decode()).size for url in urls]
+    uncompressed_sizes = [
+        parse_url_with_offset(url.decode()).size for url in uncompressed_urls
+    ]
+    assert sizes[0] < uncompressed_sizes[0] / 10
+    assert sizes[1:] == uncompressed_sizes[1:]
+
+    storage.restore_spilled_objects(refs, urls)
+    assert storage.restored == objects
+
+    # Objects spilled without compression can still be restored.
+    storage.restored = {}
+    storage.restore_spilled_objects(refs, uncompressed_urls)
+    assert storage.restored == objects
+
+    with pytest.raises(ValueError):
+        FileSystemStorage(str(tmp_path), compression="unknown")
+
+
+def test_delete_and_compact_fused_objects(tmp_path):
+    objects = {
+        ray.ObjectRef.from_random(): (b"meta", os.urandom(1000 + i))
+        for i in range(8)
+    }
+    refs = list(objects.keys())
+    storage = InMemoryFileSystemStorage(
+        str(tmp_path), objects, compaction_threshold=0.25)
+    urls = storage.spill_objects(refs)
+    filename = parse_url_with_offset(urls[0].decode()).base_url
+
+    # The file is kept while most of its objects are alive. Deleting an
+    # object twice is a no-op.
+    storage.delete_spilled_objects(urls[:2])
+    storage.delete_spilled_objects(urls[:1])
+    assert os.path.exists(filename)
+    storage.restore_spilled_objects(refs[2:], urls[2:])
+    assert storage.restored == {ref: objects[ref] for ref in refs[2:]}
+
+    # Once less than a quarter of the objects are alive, the live objects
+    # are moved to a smaller file and can still be restored from their
+    # original urls.
+    size = os.path.getsize(filename)
+    storage.delete_spilled_objects(urls[2:7])
+    assert not os.path.exists(filename)
+    assert os.path.getsize(filename + ".compacted") < size / 4
+    storage.restored = {}
+    storage.restore_spilled_objects(refs[7:], urls[7:])
+    assert storage.restored == {refs[7]: objects[refs[7]]}
+
+    # Everything is removed once all the objects are deleted.
+    storage.delete_spilled_objects(urls[7:])
+    assert list(tmp_path.iterdir()) == []
+    storage.delete_spilled_objects(urls)
+    assert list(tmp_path.iterdir()) == []
+
+    # Without compaction, the file is kept until all objects are deleted.
+    storage = InMemoryFileSystemStorage(
+        str(tmp_path), objects, compaction_threshold=0)
+    urls = storage.spill_objects(refs)
+    storage.delete_spilled_objects(urls[1:])
+    assert os.path.exists(filename)
+    storage.delete_spilled_objects(urls[:1])
+    assert list(tmp_path.iterdir()) == []
+
+    with pytest.raises(ValueError):
+        FileSystemStorage(str(tmp_path), compaction_threshold=2)
+
+
+def test_tiered_spilling(tmp_path, monkeypatch):
+    objects = {
+        ray.ObjectRef.from_random(): (b"meta", os.urandom(10000))
+        for i in range(12)
+    }
+    restored = {}
+
+    def put_object_to_store(self, metadata, data_size, file_like, object_ref):
+        restored[object_ref] = (metadata, file_like.read(data_size))
+
+    # The tiers create their FileSystemStorage themselves.
+    monkeypatch.setattr(
+        ExternalStorage, "_get_objects_from_store",
+        lambda self, refs: [(objects[ref][1], objects[ref][0]) for ref in refs]
+    )
+    monkeypatch.setattr(ExternalStorage, "_put_object_to_store",
+                        put_object_to_store)
+
+    fast_dir = tmp_path / "fast"
+    slow_dir = tmp_path / "slow"
+    storage = TieredStorage(
+        [{
+            "type": "filesystem",
+            "params": {
+                "directory_path": str(fast_dir)
+            },
+            "capacity": 50000
+        }, {
+            "type": "filesystem",
+            "params": {
+                "directory_path": str(slow_dir)
+            },
+            "capacity": 100000
+        }],
+        migration_threshold=0.5,
+        migration_interval_s=0)
+    refs = list(objects.keys())
+
+    # Objects are spilled to the fast tier until it's full.
+    urls = []
+    for i in range(0, 10, 2):
+        urls += storage.spill_objects(refs[i:i + 2])
+        time.sleep(0.01)
+    assert len(list(fast_dir.iterdir())) == 3
+    assert len(list(slow_dir.iterdir())) == 2
+
+    # The oldest files are migrated until the fast tier is below the
+    # threshold.
+    storage.delete_spilled_objects(urls[:1])
+    assert storage.migrate_cold_files() > 0
+    assert len(list(fast_dir.iterdir())) == 1
+    assert len([f for f in slow_dir.iterdir() if "." not in f.name]) == 4
+
+    # Objects are restored and deleted from whichever tier holds them.
+    storage.restore_spilled_objects(refs[1:10], urls[1:10])
+    assert restored == {ref: objects[ref] for ref in refs[1:10]}
+    storage.delete_spilled_objects(urls[1:10])
+    assert list(fast_dir.iterdir()) == []
+    assert list(slow_dir.iterdir()) == []
+
+    # Spilling fails once every tier is full.
+    storage.spill_objects(refs)
+    storage.spill_objects(refs)
+    with pytest.raises(RuntimeError):
+        storage.spill_objects(refs[:1])
+
+    with pytest.raises(ValueError):
+        TieredStorage([])
+    # Only the last tier can be a storage other than a filesystem.
+    filesystem_config = {
+        "type": "filesystem",
+        "params": {
+            "directory_path": str(tmp_path)
+        }
+    }
+    with pytest.raises(ValueError):
+        TieredStorage([{
+            "type": "tiered",
+            "params": {
+                "tiers": [filesystem_config]
+            }
+        }, filesystem_config])
+
+
 @pytest.mark.skipif(
     platform.system() == "Windows", reason="Failing on Windows.")
 def test_spill_objects_manually(object_spilling_config, shutdown_only):
@@ -1,8 +1,10 @@
+import time
+
 import pytest
 
 import ray
 from ray.exceptions import GetTimeoutError
-from ray.util.queue import Queue, Empty, Full
+from ray.util.queue import (CoalescingWriter, Empty, Full, Queue, ShardedQueue)
 
 
 @ray.remote
@@ -122,6 +124,85 @@ def test_qsize(ray_start_regular_shared):
         assert q.qsize() == size
 
 
+def test_batch(ray_start_regular_shared):
+    q = Queue(5)
+
+    q.put_batch([1, 2, 3])
+    with pytest.raises(Full):
+        q.put_batch([4, 5, 6], block=False)
+    assert q.qsize() == 3
+    with pytest.raises(Full):
+        q.put_batch([4, 5, 6], timeout=0.2)
+    assert q.qsize() == 5
+
+    assert q.get_batch(2) == [1, 2]
+    assert q.get_batch(10) == [3, 4, 5]
+    with pytest.raises(Empty):
+        q.get_batch(10, block=False)
+    with pytest.raises(Empty):
+        q.get_batch(10, timeout=0.2)
+    with pytest.raises(ValueError):
+        q.get_batch(0)
+
+
+def test_sharded_queue(ray_start_regular_shared):
+    q = ShardedQueue(3)
+
+    items = list(range(10))
+    q.put_batch(items)
+    assert sorted(shard.qsize() for shard in q.shards) == [3, 3, 4]
+    assert len(q) == 10
+
+    got = q.get_batch(4)
+    assert len(got) == 4
+    got += q.get_batch(10)
+    assert sorted(got) == items
+    assert q.empty()
+
+    q.put(1)
+    assert q.get() == 1
+    with pytest.raises(Empty):
+        q.get(timeout=0.2)
+
+    @ray.remote
+    def put_later(q):
+        time.sleep(0.5)
+        q.put(2)
+
+    put_later.remote(q)
+    assert q.get() == 2
+
+    # Non-blocking gets find the items in any shard.
+    for i in range(3):
+        q.shards[i].put(i)
+        assert q.get_nowait() == i
+        with pytest.raises(Empty):
+            q.get_nowait()
+
+
+def test_coalescing_writer(ray_start_regular_shared):
+    q = Queue()
+
+    start = time.time()
+    with CoalescingWriter(q, max_batch_size=3, flush_interval_s=5) as writer:
+        writer.put(0)
+        writer.put(1)
+        assert q.qsize() == 0
+        writer.put(2)
+        assert q.qsize() == 3
+        writer.put(3)
+    assert q.get_batch(10) == [0, 1, 2, 3]
+    # Closing doesn't wait for the flush interval.
+    assert time.time() - start < 5
+
+    writer = CoalescingWriter(q, max_batch_size=100, flush_interval_s=0.1)
+    writer.put(4)
+    assert q.get(timeout=5) == 4
+    writer.close()
+    with pytest.raises(ValueError):
+        writer.put(5)
+
+
 if __name__ == "__main__":
     import sys
     sys.exit(pytest.main(["-v", __file__]))
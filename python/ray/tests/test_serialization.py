@@ -598,6 +598,55 @@ def test_buffer_alignment(ray_start_shared_local_modes):
         assert y.ctypes.data % 8 == 0
 
 
+def test_buffer_container_serialization(ray_start_shared_local_modes):
+    context = ray.worker.global_worker.get_serialization_context()
+    batch = {
+        "obs": np.random.normal(size=(100, 4)),
+        "actions": np.arange(100),
+        "dones": np.zeros(100, dtype=bool),
+        "times": np.arange(3).astype("datetime64[ns]"),
+        "fortran": np.asfortranarray(np.ones((3, 2))),
+        b"empty": np.zeros((2, 0)),
+        1: [np.array(0, dtype=np.float32), "info", None],
+        "shape": (100, 4),
+    }
+    serialized = context.serialize(batch)
+    assert serialized.metadata == (
+        ray.ray_constants.OBJECT_METADATA_TYPE_BUFFER_CONTAINER)
+
+    result = ray.get(ray.put(batch))
+    assert result.keys() == batch.keys()
+    for key in ["obs", "actions", "dones", "times", "fortran", b"empty"]:
+        assert result[key].dtype == batch[key].dtype
+        assert result[key].shape == batch[key].shape
+        assert np.array_equal(result[key], batch[key])
+    assert result[1] == batch[1]
+    assert result["shape"] == (100, 4)
+    # The arrays are read-only views of the object.
+    with pytest.raises(ValueError):
+        result["obs"][0, 0] = 1.
+
+    class MyDict(dict):
+        pass
+
+    # Other objects are pickled.
+    for value in [
+            MyDict(a=np.zeros(1)), [np.array([None])], {
+                (1, 2): np.zeros(1)
+            }, [np.zeros(1)] * 2000, [2**64, np.zeros(1)], [1, "a"]
+    ]:
+        assert context.serialize(value).metadata != (
+            ray.ray_constants.OBJECT_METADATA_TYPE_BUFFER_CONTAINER)
+        result = ray.get(ray.put(value))
+        assert type(result) is type(value)
+        assert len(result) == len(value)
+
+    pa = pytest.importorskip("pyarrow")
+    buffer = pa.py_buffer(b"arrow data")
+    result = ray.get(ray.put({"buffer": buffer}))
+    assert result["buffer"].equals(buffer)
+
+
 if __name__ == "__main__":
     import pytest
     sys.exit(pytest.main(["-v", __file__]))
@@ -1,11 +1,22 @@
-from ray.util import iter
-from ray.util.actor_pool import ActorPool
-from ray.util.check_serialize import inspect_serializability
-from ray.util.debug import log_once, disable_log_once_globally, \
-    enable_periodic_logging
-from ray.util.placement_group import (placement_group, placement_group_table,
-                                      remove_placement_group)
-from ray.util import rpdb as pdb
+from ray._private.lazy_import import lazy_attributes
+
+lazy_attributes(
+    __name__, {
+        "ActorPool": "ray.util.actor_pool:ActorPool",
+        "inspect_serializability": ("ray.util.check_serialize:"
+                                    "inspect_serializability"),
+        "iter": "ray.util.iter",
+        "pdb": "ray.util.rpdb",
+        "disable_log_once_globally": ("ray.util.debug:"
+                                      "disable_log_once_globally"),
+        "enable_periodic_logging": "ray.util.debug:enable_periodic_logging",
+        "log_once": "ray.util.debug:log_once",
+        "placement_group": "ray.util.placement_group:placement_group",
+        "placement_group_table": ("ray.util.placement_group:"
+                                  "placement_group_table"),
+        "remove_placement_group": ("ray.util.placement_group:"
+                                   "remove_placement_group"),
+    })
 
 __all__ = [
     "ActorPool", "disable_log_once_globally", "enable_periodic_logging",
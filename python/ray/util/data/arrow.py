@@ -0,0 +1,88 @@
+"""Helpers for MLDataset records that are pyarrow.Table.
+
+The records of a MLDataset are either pandas.DataFrame or pyarrow.Table.
+The helpers below work on Arrow buffers without converting to pandas:
+rebatching slices and concatenates the chunks of the tables without
+copying them, and the columns are converted to numpy directly.
+"""
+from typing import Any, Iterable, List, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+Record = Union[pd.DataFrame, pa.Table]
+
+
+def is_arrow(record: Record) -> bool:
+    return isinstance(record, pa.Table)
+
+
+def to_arrow(record: Record) -> pa.Table:
+    if is_arrow(record):
+        return record
+    return pa.Table.from_pandas(record, preserve_index=False)
+
+
+def num_rows(record: Record) -> int:
+    if is_arrow(record):
+        return record.num_rows
+    return record.shape[0]
+
+
+def rebatch(tables: Iterable[pa.Table], batch_size: int) -> Iterable[pa.Table]:
+    """Yields tables of batch_size rows, the last one may have fewer.
+
+    The tables are sliced and concatenated without copying their buffers, so
+    the returned tables may have several chunks.
+    """
+    buffer: List[pa.Table] = []
+    num_buffered = 0
+    for table in tables:
+        buffer.append(table)
+        num_buffered += table.num_rows
+        if num_buffered < batch_size:
+            continue
+        table = pa.concat_tables(buffer)
+        start = 0
+        while table.num_rows - start >= batch_size:
+            yield table.slice(start, batch_size)
+            start += batch_size
+        num_buffered = table.num_rows - start
+        buffer = [table.slice(start)] if num_buffered > 0 else []
+    if num_buffered > 0:
+        yield pa.concat_tables(buffer)
+
+
+def shuffle_rows(record: Record, seed: int = None) -> Record:
+    if is_arrow(record):
+        indices = np.random.RandomState(seed).permutation(record.num_rows)
+        return record.take(indices)
+    return record.sample(frac=1, random_state=seed)
+
+
+def _array_to_numpy(array: pa.Array) -> np.ndarray:
+    if pa.types.is_list(array.type) and array.null_count == 0:
+        # Lists of the same length are converted to a single array with an
+        # extra dimension, instead of an array of arrays.
+        lengths = np.diff(array.offsets.to_numpy())
+        if len(lengths) > 0 and (lengths == lengths[0]).all():
+            values = _array_to_numpy(array.flatten())
+            return values.reshape(len(array), lengths[0], *values.shape[1:])
+    # Doesn't copy the primitive arrays without nulls.
+    return array.to_numpy(zero_copy_only=False)
+
+
+def column_values(record: Record, column: Any) -> np.ndarray:
+    """Returns the values of a column as a numpy array."""
+    if not is_arrow(record):
+        return record[column].values
+    if column not in record.schema.names:
+        # Arrow converts the pandas column names to strings.
+        column = str(column)
+    chunks = record.column(column).chunks
+    if len(chunks) == 1:
+        return _array_to_numpy(chunks[0])
+    if len(chunks) == 0:
+        return np.empty(0)
+    return np.concatenate([_array_to_numpy(chunk) for chunk in chunks])
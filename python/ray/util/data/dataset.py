@@ -1,8 +1,10 @@
+import itertools
 import random
-from typing import Callable, List, Iterable, Iterator
+from typing import Any, Callable, List, Iterable, Iterator
 
 import pandas as pd
 
+from ray.util.data.arrow import is_arrow, rebatch, shuffle_rows, to_arrow
 from ray.util.iter import (_NextValueNotReady, LocalIterator, ParallelIterator,
                            T, U)
 
@@ -10,7 +12,9 @@ from ray.util.iter import (_NextValueNotReady, LocalIterator, ParallelIterator,
 class MLDataset(ParallelIterator[pd.DataFrame]):
     """A distributed ML dataset implemented based on ParallelIterator
 
-    All item should be a list like object or dataclass instance.
+    All item should be a list like object or dataclass instance. The
+    records are pandas.DataFrame, or pyarrow.Table after to_arrow(), which
+    keeps the data in Arrow buffers until it is converted to tensors.
 
     Args:
         batch_size (int): The batch size of the current dataset. It should be
@@ -78,17 +82,68 @@ class MLDataset(ParallelIterator[pd.DataFrame]):
         return self._with_transform(lambda local_it: local_it.transform(fn),
                                     ".transform()")
 
+    def to_pandas(self, use_threads: bool = False) -> "MLDataset":
+        """Convert the pyarrow.Table records to pandas.DataFrame
+
+        The records of read_parquet(..., output_format="arrow") are
+        pyarrow.Table. They are converted in the shards, so this should be
+        called before the transforms that need pandas.DataFrame records.
+        Records that are already pandas.DataFrame are kept.
+
+        Args:
+            use_threads (bool): whether to convert with multiple threads
+        Returns:
+            A new MLDataset
+        """
+
+        def convert_fn(it: Iterable[Any]) -> Iterable[pd.DataFrame]:
+            for record in it:
+                if not isinstance(record, pd.DataFrame):
+                    record = record.to_pandas(use_threads=use_threads)
+                yield record
+
+        return self._with_transform(
+            lambda local_it: local_it.transform(convert_fn), ".to_pandas()")
+
+    def to_arrow(self) -> "MLDataset":
+        """Convert the pandas.DataFrame records to pyarrow.Table
+
+        The index of the pandas.DataFrame is dropped, and the column names
+        become strings. The batch, local_shuffle and to_torch/to_tf
+        conversions then work on the Arrow buffers without going through
+        pandas. Records that are already pyarrow.Table are kept.
+        """
+
+        def convert_fn(it: Iterable[Any]) -> Iterable[Any]:
+            for record in it:
+                yield to_arrow(record)
+
+        return self._with_transform(
+            lambda local_it: local_it.transform(convert_fn), ".to_arrow()")
+
     def batch(self, batch_size: int) -> "MLDataset":
-        """Rebatch the number of rows for each pandas.DataFrame record
+        """Rebatch the number of rows for each record
 
         Unlike the ParallelIterator.batch. This method rebatch the underlying
-        the pandas DataFrame, and each pandas DataFrame will have batch_size
-        rows.
+        the pandas DataFrame or pyarrow.Table, and each record will have
+        batch_size rows.
         """
         if batch_size == self._batch_size:
             return self
 
-        def batch_fn(it: Iterable[pd.DataFrame]) -> Iterable[pd.DataFrame]:
+        def batch_fn(it: Iterable[Any]) -> Iterable[Any]:
+            it = iter(it)
+            first = next(it, None)
+            if first is None:
+                return
+            it = itertools.chain([first], it)
+            if is_arrow(first):
+                yield from rebatch(it, batch_size)
+            else:
+                yield from pandas_batch_fn(it)
+
+        def pandas_batch_fn(
+                it: Iterable[pd.DataFrame]) -> Iterable[pd.DataFrame]:
             it = iter(it)
             return_df = None
             while True:
@@ -153,10 +208,9 @@ class MLDataset(ParallelIterator[pd.DataFrame]):
         """
         ds = super().local_shuffle(shuffle_buffer_size, seed)
 
-        def shuffle_fn(it: Iterable[pd.DataFrame]) -> Iterable[pd.DataFrame]:
-            for df in it:
-                df = df.sample(frac=1, random_state=seed)
-                yield df
+        def shuffle_fn(it: Iterable[Any]) -> Iterable[Any]:
+            for record in it:
+                yield shuffle_rows(record, seed)
 
         ds = ds._with_transform(
             lambda local_it: local_it.transform(shuffle_fn),
@@ -369,11 +423,11 @@ class _RepeatableIterator(Iterator[T]):
                         item = buffer.pop(
                             shuffle_random.randint(0,
                                                    len(buffer) - 1))
-                        item = item.sample(frac=1, random_state=self._seed)
+                        item = shuffle_rows(item, self._seed)
                         yield item
             while len(buffer) > 0:
                 item = buffer.pop(shuffle_random.randint(0, len(buffer) - 1))
-                item = item.sample(frac=1, random_state=self._seed)
+                item = shuffle_rows(item, self._seed)
                 yield item
 
         return LocalIterator(
@@ -0,0 +1,77 @@
+"""Compares the pandas and the Arrow records of a MLDataset.
+
+Both datasets are rebatched and converted to the numpy arrays that
+to_torch/to_tf turn into tensors, with a scalar column and a column of
+fixed size vectors.
+
+Usage: python arrow_benchmark.py --num-rows 1000000 --batch-size 1024
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import ray
+import ray.util.iter as parallel_it
+from ray.util.data import MLDataset
+from ray.util.data.arrow import column_values
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--num-rows", type=int, default=1000000)
+parser.add_argument("--rows-per-record", type=int, default=10000)
+parser.add_argument("--vector-size", type=int, default=16)
+parser.add_argument("--batch-size", type=int, default=1024)
+parser.add_argument("--num-shards", type=int, default=2)
+parser.add_argument("--num-trials", type=int, default=3)
+
+
+def make_dataset(args) -> MLDataset:
+    num_records = args.num_rows // args.rows_per_record
+
+    def make_record(i):
+        rng = np.random.RandomState(i)
+        vectors = rng.rand(args.rows_per_record, args.vector_size)
+        return pd.DataFrame({
+            "x": rng.rand(args.rows_per_record),
+            "vector": list(vectors),
+            "y": rng.rand(args.rows_per_record)
+        })
+
+    it = parallel_it.from_range(
+        num_records, num_shards=args.num_shards).for_each(make_record)
+    return MLDataset.from_parallel_it(it, batch_size=args.rows_per_record)
+
+
+def to_numpy(record):
+    arrays = []
+    for column in ["x", "vector", "y"]:
+        values = column_values(record, column)
+        if values.dtype == np.object:
+            values = np.stack(values)
+        arrays.append(values)
+    return arrays
+
+
+def run(ds: MLDataset, batch_size: int) -> float:
+    start = time.time()
+    num_rows = 0
+    for record in ds.batch(batch_size).gather_sync():
+        num_rows += len(to_numpy(record)[0])
+    return num_rows / (time.time() - start)
+
+
+def main():
+    args = parser.parse_args()
+    ray.init()
+    ds = make_dataset(args)
+    for name, records in [("pandas", ds), ("arrow", ds.to_arrow())]:
+        throughputs = [
+            run(records, args.batch_size) for _ in range(args.num_trials)
+        ]
+        print(f"{name} records: {np.mean(throughputs):.0f} +- "
+              f"{np.std(throughputs):.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
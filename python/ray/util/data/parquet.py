@@ -1,6 +1,8 @@
+import queue
 import random
-from typing import Iterable
-from typing import List, Optional, Union
+import threading
+from typing import Any, Callable, Dict, Iterable
+from typing import List, Optional, Tuple, Union
 
 import pyarrow.parquet as pq
 from pandas import DataFrame
@@ -9,15 +11,30 @@ import ray.util.iter as para_iter
 from .dataset import MLDataset
 from .interface import _SourceShard
 
+# The formats of the records of the MLDataset returned by read_parquet.
+OUTPUT_FORMATS = ("pandas", "arrow")
+
+_FILTER_OPS = ("=", "==", "!=", "<", "<=", ">", ">=", "in", "not in")
+
+Filter = Tuple[str, str, Any]
+
 
 class ParquetSourceShard(_SourceShard):
-    def __init__(self, data_pieces: List[pq.ParquetDatasetPiece],
+    def __init__(self,
+                 data_pieces: List[pq.ParquetDatasetPiece],
                  columns: Optional[List[str]],
-                 partitions: Optional[pq.ParquetPartitions], shard_id: int):
+                 partitions: Optional[pq.ParquetPartitions],
+                 shard_id: int,
+                 use_threads: bool = False,
+                 prefetch: int = 0,
+                 output_format: str = "pandas"):
         self._data_pieces = data_pieces
         self._columns = columns
         self._partitions = partitions
         self._shard_id = shard_id
+        self._use_threads = use_threads
+        self._prefetch = prefetch
+        self._output_format = output_format
 
     def prefix(self) -> str:
         return "Parquet"
@@ -26,12 +43,156 @@ class ParquetSourceShard(_SourceShard):
     def shard_id(self) -> int:
         return self._shard_id
 
+    def _read(self, piece: pq.ParquetDatasetPiece):
+        table = piece.read(
+            columns=self._columns,
+            use_threads=self._use_threads,
+            partitions=self._partitions)
+        if self._output_format == "arrow":
+            return table
+        return table.to_pandas(use_threads=self._use_threads)
+
     def __iter__(self) -> Iterable[DataFrame]:
-        for piece in self._data_pieces:
-            yield piece.read(
-                columns=self._columns,
-                use_threads=False,
-                partitions=self._partitions).to_pandas()
+        if self._prefetch > 0:
+            yield from _read_ahead(self._read, self._data_pieces,
+                                   self._prefetch)
+        else:
+            for piece in self._data_pieces:
+                yield self._read(piece)
+
+
+def _read_ahead(read_fn: Callable, pieces: List, num_pieces: int) -> Iterable:
+    """Yields read_fn(piece) for each piece, reading up to num_pieces ahead
+    of the consumer in a background thread."""
+    results = queue.Queue(maxsize=num_pieces)
+    stopped = threading.Event()
+    done = object()
+
+    def put(result):
+        while not stopped.is_set():
+            try:
+                results.put(result, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def read_pieces():
+        try:
+            for piece in pieces:
+                if not put((read_fn(piece), None)):
+                    return
+        except Exception as e:
+            put((None, e))
+            return
+        put((done, None))
+
+    thread = threading.Thread(target=read_pieces, daemon=True)
+    thread.start()
+    try:
+        while True:
+            result, error = results.get()
+            if error is not None:
+                raise error
+            if result is done:
+                return
+            yield result
+    finally:
+        # Unblock the thread if the consumer stops early.
+        stopped.set()
+
+
+def _normalize_filters(filters) -> List[List[Filter]]:
+    """Returns the filters in disjunctive normal form, i.e. a list of
+    conjunctions of predicates."""
+    if not filters:
+        return []
+    if isinstance(filters[0], tuple):
+        filters = [filters]
+    for conjunction in filters:
+        for predicate in conjunction:
+            if len(predicate) != 3 or predicate[1] not in _FILTER_OPS:
+                raise ValueError(
+                    f"invalid filter {predicate}, filters should be "
+                    f"(column, op, value) tuples with op in {_FILTER_OPS}")
+    return filters
+
+
+def _may_match(op: str, value: Any, min_value: Any, max_value: Any) -> bool:
+    """Whether a predicate may hold for values between min_value and
+    max_value."""
+    try:
+        if op in ("=", "=="):
+            return min_value <= value <= max_value
+        if op == "!=":
+            return not min_value == max_value == value
+        if op == "<":
+            return min_value < value
+        if op == "<=":
+            return min_value <= value
+        if op == ">":
+            return max_value > value
+        if op == ">=":
+            return max_value >= value
+        if op == "in":
+            return any(min_value <= v <= max_value for v in value)
+        if op == "not in":
+            return not (min_value == max_value and min_value in value)
+    except TypeError:
+        # The value isn't comparable with the statistics.
+        pass
+    return True
+
+
+def _column_ranges(metadata: pq.FileMetaData, row_group: int,
+                   partition_values: Dict[str, Any]) -> Dict[str, Tuple]:
+    """Returns the known (min, max) of the columns of a row group."""
+    ranges = {name: (value, value) for name, value in partition_values.items()}
+    row_group_metadata = metadata.row_group(row_group)
+    for i in range(row_group_metadata.num_columns):
+        column = row_group_metadata.column(i)
+        statistics = column.statistics
+        if statistics is not None and statistics.has_min_max:
+            ranges[column.path_in_schema] = (statistics.min, statistics.max)
+    return ranges
+
+
+def _row_group_may_match(ranges: Dict[str, Tuple],
+                         filters: List[List[Filter]]) -> bool:
+    if not filters:
+        return True
+    # Predicates on columns without statistics may always match.
+    return any(
+        all(
+            _may_match(op, value, *ranges[column])
+            for column, op, value in conjunction if column in ranges)
+        for conjunction in filters)
+
+
+def _partition_values(
+        piece: pq.ParquetDatasetPiece,
+        partitions: Optional[pq.ParquetPartitions]) -> Dict[str, Any]:
+    if not piece.partition_keys or partitions is None:
+        return {}
+    return {
+        name: partitions.levels[level].dictionary[index].as_py()
+        for level, (name, index) in enumerate(piece.partition_keys)
+    }
+
+
+def _split_row_groups(
+        piece: pq.ParquetDatasetPiece, metadata: pq.FileMetaData,
+        partitions: Optional[pq.ParquetPartitions],
+        filters: List[List[Filter]]) -> List[pq.ParquetDatasetPiece]:
+    """Splits a file into the pieces of its row groups that may match the
+    filters."""
+    partition_values = _partition_values(piece, partitions)
+    return [
+        pq.ParquetDatasetPiece(piece.path, piece.open_file_func,
+                               piece.file_options, i, piece.partition_keys)
+        for i in range(metadata.num_row_groups) if _row_group_may_match(
+            _column_ranges(metadata, i, partition_values), filters)
+    ]
 
 
 def read_parquet(paths: Union[str, List[str]],
@@ -40,6 +201,10 @@ def read_parquet(paths: Union[str, List[str]],
                  shuffle: bool = False,
                  shuffle_seed: int = None,
                  columns: Optional[List[str]] = None,
+                 filters: Optional[List] = None,
+                 use_threads: bool = False,
+                 prefetch: int = 0,
+                 output_format: str = "pandas",
                  **kwargs) -> MLDataset:
     """Read parquet format data from hdfs like filesystem into a MLDataset.
 
@@ -66,28 +231,47 @@ def read_parquet(paths: Union[str, List[str]],
             divide into shards
         shuffle_seed (int): the shuffle seed
         columns (Optional[List[str]]): a list of column names to read
+        filters (Optional[List]): predicates in the pyarrow format, a list of
+            (column, op, value) tuples that must all hold, or a list of such
+            lists of which any must hold. The row groups whose statistics or
+            partition keys show that no row can match are not read. The
+            rows of the other row groups are returned unfiltered.
+        use_threads (bool): whether to decode the columns of a row group
+            and convert them to pandas with multiple threads
+        prefetch (int): the number of row groups each shard reads ahead in
+            a background thread, 0 to read them on demand
+        output_format (str): "pandas" for records of pandas.DataFrame, or
+            "arrow" for records of pyarrow.Table, which can be converted to
+            pandas later with MLDataset.to_pandas()
         kwargs: the other parquet read options
     Returns:
         A MLDataset
     """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"output_format should be one of {OUTPUT_FORMATS}, "
+                         f"got {output_format}")
+    if prefetch < 0:
+        raise ValueError("prefetch must be non-negative")
+    filters = _normalize_filters(filters)
+
     pq_ds = pq.ParquetDataset(paths, **kwargs)
     pieces = pq_ds.pieces
     data_pieces = []
     if rowgroup_split:
-        # split base on rowgroup
+        # split base on rowgroup, skipping the row groups that can't match
+        num_data_pieces = 0
         for piece in pieces:
-            num_row_groups = piece.get_metadata().to_dict()["num_row_groups"]
-            for i in range(num_row_groups):
-                data_pieces.append(
-                    pq.ParquetDatasetPiece(piece.path, piece.open_file_func,
-                                           piece.file_options, i,
-                                           piece.partition_keys))
+            metadata = piece.get_metadata()
+            num_data_pieces += metadata.num_row_groups
+            data_pieces.extend(
+                _split_row_groups(piece, metadata, pq_ds.partitions, filters))
     else:
         # split base on file pieces
         data_pieces = pieces.copy()
+        num_data_pieces = len(data_pieces)
 
-    if len(data_pieces) < num_shards:
-        raise ValueError(f"number of data pieces: {len(data_pieces)} should "
+    if num_data_pieces < num_shards:
+        raise ValueError(f"number of data pieces: {num_data_pieces} should "
                          f"larger than num_shards: {num_shards}")
 
     if shuffle:
@@ -97,15 +281,14 @@ def read_parquet(paths: Union[str, List[str]],
     for i, item in enumerate(data_pieces):
         shard = shards[i % num_shards]
         if item.row_group is None:
-            for number in item.get_metadata().to_dict()["num_row_groups"]:
-                shard.append(
-                    pq.ParquetDatasetPiece(item.path, item.open_file_func,
-                                           item.file_options, number,
-                                           item.partition_keys))
+            shard.extend(
+                _split_row_groups(item, item.get_metadata(), pq_ds.partitions,
+                                  filters))
         else:
             shard.append(item)
 
     for i, shard in enumerate(shards):
-        shards[i] = ParquetSourceShard(shard, columns, pq_ds.partitions, i)
+        shards[i] = ParquetSourceShard(shard, columns, pq_ds.partitions, i,
+                                       use_threads, prefetch, output_format)
     it = para_iter.from_iterators(shards, False, "parquet")
     return MLDataset.from_parallel_it(it, batch_size=0, repeated=False)
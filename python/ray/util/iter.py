@@ -1,11 +1,14 @@
 from contextlib import contextmanager
 import collections
+import pickle
 import random
 import threading
 import time
+import zlib
 from typing import TypeVar, Generic, Iterable, List, Callable, Any
 
 import ray
+from ray.util import iter_metrics
 from ray.util.iter_metrics import MetricsContext, SharedMetrics
 
 # The type of an iterator element.
@@ -430,6 +433,168 @@ class ParallelIterator(Generic[T]):
         return ParallelIterator(
             [_ActorSet(actors, [])], name, parent_iterators=[self])
 
+    def repartition_by(self,
+                       key_fn: Callable[[T], Any],
+                       num_partitions: int,
+                       batch_size: int = 1000) -> "ParallelIterator[T]":
+        """Returns a new ParallelIterator with the items partitioned by key.
+
+        Items with equal keys, as computed by key_fn, end up in the same
+        shard, e.g. to group items by key across shards. The keys are hashed
+        the same way in all processes, so they must be ints, strings, bytes
+        or values with a deterministic pickle, like tuples of those.
+
+        This is an all-to-all exchange through the object store: each shard
+        of this iterator reads batch_size items at a time, splits them into
+        one bucket per partition and puts the buckets in the object store,
+        where the partitions fetch them from. A shard holds at most
+        batch_size items in memory, and the buckets not fetched yet can be
+        spilled by the object store, so the partitions can be consumed at
+        different paces or one after the other.
+
+        Args:
+            key_fn (func): Function computing the key of an item.
+            num_partitions (int): The number of shards of the new
+                ParallelIterator.
+            batch_size (int): The number of items each shard of this
+                iterator buckets at a time.
+
+        Returns:
+            A ParallelIterator with num_partitions shards, each with all the
+            items of some of the keys.
+
+        Examples:
+            >>> it = from_range(8, 2).repartition_by(lambda x: x % 3, 3)
+            >>> sorted(it.get_shard(0))
+            [0, 3, 6]
+            >>> sorted(it.get_shard(1))
+            [1, 4, 7]
+        """
+        return self._exchange(
+            lambda shard_index: _key_partition_fn(key_fn, num_partitions),
+            num_partitions, batch_size,
+            self.name + f".repartition_by[num_partitions={num_partitions}]")
+
+    def global_shuffle(self,
+                       num_partitions: int = None,
+                       seed: int = None,
+                       shuffle_buffer_size: int = 1000,
+                       batch_size: int = 1000) -> "ParallelIterator[T]":
+        """Returns a new ParallelIterator with the items shuffled across
+        shards.
+
+        Each item is sent to a random partition with the all-to-all exchange
+        of repartition_by(), then each partition shuffles the items it
+        receives like local_shuffle().
+
+        Args:
+            num_partitions (int): The number of shards of the new
+                ParallelIterator, the number of shards of this one if None.
+            seed (int): Seed to use for randomness. Default value is None.
+            shuffle_buffer_size (int): The size of the buffer each partition
+                shuffles its items with, see local_shuffle().
+            batch_size (int): The number of items each shard of this
+                iterator buckets at a time.
+
+        Returns:
+            A ParallelIterator with num_partitions shards and the items of
+            this ParallelIterator shuffled among them.
+        """
+        if num_partitions is None:
+            num_partitions = self.num_shards()
+
+        def make_partition_fn(shard_index):
+            # Each shard of this iterator needs its own random sequence.
+            shard_seed = None if seed is None else f"{seed}-{shard_index}"
+            return _random_partition_fn(num_partitions, shard_seed)
+
+        name = (
+            self.name + f".global_shuffle[num_partitions={num_partitions}, "
+            f"seed={seed}]")
+        it = self._exchange(make_partition_fn, num_partitions, batch_size,
+                            name).local_shuffle(shuffle_buffer_size, seed)
+        it.name = name
+        return it
+
+    def _exchange(self, make_partition_fn, num_partitions, batch_size, name):
+        """All-to-all exchange of the items through the object store.
+
+        Args:
+            make_partition_fn (func): Function returning the function
+                computing the partition of an item, given the index of the
+                shard of this iterator that calls it.
+            num_partitions (int): The number of shards of the new iterator.
+            batch_size (int): The number of items each shard of this
+                iterator buckets at a time.
+            name (str): The name of the new iterator.
+        """
+        if num_partitions < 1:
+            raise ValueError("num_partitions must be a positive number")
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive number")
+
+        # initialize the local iterators for all the actors
+        all_actors = []
+        for actor_set in self.actor_sets:
+            actor_set.init_actors()
+            all_actors.extend(actor_set.actors)
+        ray.get([
+            a.par_iter_init_buckets.remote(
+                make_partition_fn(i), num_partitions, batch_size)
+            for i, a in enumerate(all_actors)
+        ])
+
+        def base_iterator(partition_index, timeout=None):
+            # Every shard of this iterator buckets items in rounds, fetch the
+            # buckets of this partition round by round.
+            next_rounds = {a: 0 for a in all_actors}
+            futures = {
+                a.par_iter_bucket.remote(partition_index, 0): a
+                for a in all_actors
+            }
+            try:
+                while futures:
+                    pending = list(futures)
+                    if timeout is None:
+                        # First try to do a batch wait for efficiency.
+                        ready, _ = ray.wait(
+                            pending, num_returns=len(pending), timeout=0)
+                        # Fall back to a blocking wait.
+                        if not ready:
+                            ready, _ = ray.wait(pending, num_returns=1)
+                    else:
+                        ready, _ = ray.wait(
+                            pending, num_returns=len(pending), timeout=timeout)
+                    for obj_ref in ready:
+                        actor = futures.pop(obj_ref)
+                        try:
+                            bucket_ref = ray.get(obj_ref)
+                        except StopIteration:
+                            continue
+                        next_rounds[actor] += 1
+                        futures[actor.par_iter_bucket.remote(
+                            partition_index, next_rounds[actor])] = actor
+                        if bucket_ref is not None:
+                            for item in ray.get(bucket_ref):
+                                yield item
+                    # Always yield after each round of wait with timeout.
+                    if timeout is not None:
+                        yield _NextValueNotReady()
+            finally:
+                # Don't keep the buckets of this partition if it stops early.
+                for actor in all_actors:
+                    actor.par_iter_release_buckets.remote(partition_index)
+
+        def make_gen_i(i):
+            return lambda: base_iterator(i)
+
+        generators = [make_gen_i(s) for s in range(num_partitions)]
+        worker_cls = ray.remote(ParallelIteratorWorker)
+        actors = [worker_cls.remote(g, repeat=False) for g in generators]
+        # need explicit reference to self so actors in this instance do not die
+        return ParallelIterator(
+            [_ActorSet(actors, [])], name, parent_iterators=[self])
+
     def gather_sync(self) -> "LocalIterator[T]":
         """Returns a local iterable for synchronous iteration.
 
@@ -490,7 +655,8 @@ class ParallelIterator(Generic[T]):
         name = f"{self}.batch_across_shards()"
         return LocalIterator(base_iterator, SharedMetrics(), name=name)
 
-    def gather_async(self, batch_ms=0, num_async=1) -> "LocalIterator[T]":
+    def gather_async(self, batch_ms=0, num_async=1,
+                     max_inflight_bytes=None) -> "LocalIterator[T]":
         """Returns a local iterable for asynchronous iteration.
 
         New items will be fetched from the shards asynchronously as soon as
@@ -504,6 +670,19 @@ class ParallelIterator(Generic[T]):
             num_async (int): The max number of async requests in flight
                 per actor. Increasing this improves the amount of pipeline
                 parallelism in the iterator.
+            max_inflight_bytes (int): If set, bounds the bytes of the batches
+                requested but not consumed yet, so that a slow consumer
+                doesn't fill the object store. The number of requests in
+                flight per actor then starts at 1 and grows up to num_async
+                each time the consumer waits for the shards. The size of a
+                batch is estimated by the size of the previous batch of the
+                same shard, which the shards compute by serializing their
+                batches an extra time. A request is always sent when nothing
+                is in flight, so a single batch can exceed the budget.
+
+        The time the consumer waited for the shards and the time shards
+        were left idle because of max_inflight_bytes are counted in the
+        metrics, see ray.util.iter_metrics.
 
         Examples:
             >>> it = from_range(100, 1).gather_async()
@@ -519,6 +698,8 @@ class ParallelIterator(Generic[T]):
             raise ValueError("queue depth must be positive")
         if batch_ms < 0:
             raise ValueError("batch time must be positive")
+        if max_inflight_bytes is not None and max_inflight_bytes <= 0:
+            raise ValueError("max_inflight_bytes must be positive")
 
         # Forward reference to the returned iterator.
         local_iter = None
@@ -528,29 +709,29 @@ class ParallelIterator(Generic[T]):
             for actor_set in self.actor_sets:
                 actor_set.init_actors()
                 all_actors.extend(actor_set.actors)
-            futures = {}
-            for _ in range(num_async):
-                for a in all_actors:
-                    futures[a.par_iter_next_batch.remote(batch_ms)] = a
-            while futures:
-                pending = list(futures)
+            metrics = local_iter.shared_metrics.get()
+            prefetch = _Prefetcher(all_actors, batch_ms, num_async,
+                                   max_inflight_bytes, metrics)
+            prefetch.request_all()
+            while prefetch.futures:
+                pending = list(prefetch.futures)
                 if timeout is None:
                     # First try to do a batch wait for efficiency.
                     ready, _ = ray.wait(
                         pending, num_returns=len(pending), timeout=0)
                     # Fall back to a blocking wait.
                     if not ready:
+                        start = time.time()
                         ready, _ = ray.wait(pending, num_returns=1)
+                        prefetch.on_consumer_stall(time.time() - start)
                 else:
                     ready, _ = ray.wait(
                         pending, num_returns=len(pending), timeout=timeout)
                 for obj_ref in ready:
-                    actor = futures.pop(obj_ref)
+                    actor = prefetch.futures[obj_ref]
                     try:
-                        local_iter.shared_metrics.get().current_actor = actor
-                        batch = ray.get(obj_ref)
-                        futures[actor.par_iter_next_batch.remote(
-                            batch_ms)] = actor
+                        metrics.current_actor = actor
+                        batch = prefetch.get(obj_ref)
                         for item in batch:
                             yield item
                     except StopIteration:
@@ -1136,6 +1317,7 @@ class ParallelIteratorWorker(object):
         self.transforms = []
         self.local_it = None
         self.next_ith_buffer = None
+        self.buckets = None
 
     def par_iter_init(self, transforms):
         """Implements ParallelIterator worker init."""
@@ -1168,6 +1350,14 @@ class ParallelIteratorWorker(object):
                     pass
         return batch
 
+    def par_iter_next_batch_with_size(self, batch_ms: int):
+        """Batches par_iter_next, also returning the serialized size of the
+        batch."""
+        batch = self.par_iter_next_batch(batch_ms)
+        serialization_context = ray.worker.global_worker.\
+            get_serialization_context()
+        return batch, serialization_context.serialize(batch).total_bytes
+
     def par_iter_slice(self, step: int, start: int):
         """Iterates in increments of step starting from start."""
         assert self.local_it is not None, "must call par_iter_init()"
@@ -1208,6 +1398,219 @@ class ParallelIteratorWorker(object):
                     pass
         return batch
 
+    def par_iter_init_buckets(self, partition_fn: Callable[[Any], int],
+                              num_partitions: int, batch_size: int):
+        """Implements the map side of an all-to-all exchange.
+
+        Args:
+            partition_fn (func): Function computing the partition of an item.
+            num_partitions (int): The number of partitions.
+            batch_size (int): The number of items bucketed per round.
+        """
+        assert self.local_it is not None, "must call par_iter_init()"
+        self.buckets = _Buckets(partition_fn, num_partitions, batch_size)
+
+    def par_iter_bucket(self, partition_index: int, round_index: int):
+        """Returns the ref of a partition's bucket of a round, None if the
+        bucket is empty.
+
+        The partitions fetch the rounds in order, the first partition to
+        fetch a round reads the next batch of items and buckets them. A
+        bucket stays in the object store, which can spill it, until its
+        partition fetches it or is released.
+        """
+        assert self.buckets is not None, "must call par_iter_init_buckets()"
+        buckets = self.buckets
+        if round_index >= buckets.num_rounds:
+            if buckets.exhausted:
+                raise StopIteration
+            batch = []
+            for item in self.local_it:
+                batch.append(item)
+                if len(batch) == buckets.batch_size:
+                    break
+            else:
+                buckets.exhausted = True
+            if not batch:
+                raise StopIteration
+            buckets.add_round(batch)
+        return buckets.fetch(partition_index, round_index)
+
+    def par_iter_release_buckets(self, partition_index: int):
+        """Releases the buckets of a partition whose consumer is gone."""
+        assert self.buckets is not None, "must call par_iter_init_buckets()"
+        self.buckets.release(partition_index)
+
+
+class _Prefetcher:
+    """Requests batches from the shards for gather_async().
+
+    Without max_inflight_bytes, keeps num_async requests in flight per
+    shard. With it, the number of requests per shard starts at 1 and grows
+    up to num_async each time the consumer stalls, while the estimated
+    bytes in flight stay within max_inflight_bytes.
+    """
+
+    def __init__(self, actors, batch_ms, num_async, max_inflight_bytes,
+                 metrics):
+        self.actors = actors
+        self.batch_ms = batch_ms
+        self.num_async = num_async
+        self.max_inflight_bytes = max_inflight_bytes
+        self.metrics = metrics
+        self.depth = num_async if max_inflight_bytes is None else 1
+        # Map from the pending requests to their actor, and to their
+        # estimated bytes.
+        self.futures = {}
+        self.future_bytes = {}
+        self.inflight_bytes = 0
+        self.num_inflight = {actor: 0 for actor in actors}
+        # Estimated bytes of the next batch of each actor.
+        self.batch_bytes = {actor: 0 for actor in actors}
+        self.exhausted = set()
+        # Map from the actors left idle because of max_inflight_bytes to
+        # the time they became idle.
+        self.idle_since = {}
+        self.metrics.info[iter_metrics.NUM_ASYNC] = self.depth
+
+    def _can_request(self, actor):
+        if (actor in self.exhausted or self.num_inflight[actor] >= self.depth):
+            return False
+        if self.max_inflight_bytes is None or not self.futures:
+            return True
+        return (self.inflight_bytes + self.batch_bytes[actor] <=
+                self.max_inflight_bytes)
+
+    def _request(self, actor):
+        if self.max_inflight_bytes is None:
+            future = actor.par_iter_next_batch.remote(self.batch_ms)
+        else:
+            future = actor.par_iter_next_batch_with_size.remote(self.batch_ms)
+        self.futures[future] = actor
+        self.future_bytes[future] = self.batch_bytes[actor]
+        self.inflight_bytes += self.batch_bytes[actor]
+        self.num_inflight[actor] += 1
+
+    def request(self, actor):
+        """Sends as many requests to the actor as allowed."""
+        while self._can_request(actor):
+            self._request(actor)
+        if actor in self.idle_since and self.num_inflight[actor] > 0:
+            self.metrics.counters[iter_metrics.PRODUCER_STALL_TIME_S] += (
+                time.time() - self.idle_since.pop(actor))
+        elif (actor not in self.idle_since and actor not in self.exhausted
+              and self.num_inflight[actor] == 0):
+            self.idle_since[actor] = time.time()
+        self.metrics.info[iter_metrics.INFLIGHT_BYTES] = self.inflight_bytes
+
+    def request_all(self):
+        # Start with the actors that have the fewest requests in flight.
+        for actor in sorted(self.actors, key=self.num_inflight.get):
+            self.request(actor)
+
+    def get(self, future):
+        """Gets the batch of a ready request and sends new requests.
+
+        Raises:
+            StopIteration if the actor has no more items.
+        """
+        actor = self.futures.pop(future)
+        self.inflight_bytes -= self.future_bytes.pop(future)
+        self.num_inflight[actor] -= 1
+        try:
+            result = ray.get(future)
+        except StopIteration:
+            self.exhausted.add(actor)
+            self.idle_since.pop(actor, None)
+            if self.max_inflight_bytes is not None:
+                self.request_all()
+            raise
+        if self.max_inflight_bytes is None:
+            batch = result
+            self.request(actor)
+        else:
+            batch, self.batch_bytes[actor] = result
+            # The bytes of this batch are no longer in flight, so the other
+            # actors may get requests too.
+            self.request_all()
+        return batch
+
+    def on_consumer_stall(self, duration):
+        self.metrics.counters[iter_metrics.CONSUMER_STALL_TIME_S] += duration
+        if self.max_inflight_bytes is not None and self.depth < self.num_async:
+            # The shards don't keep up with the consumer, prefetch more.
+            self.depth += 1
+            self.metrics.info[iter_metrics.NUM_ASYNC] = self.depth
+            self.request_all()
+
+
+class _Buckets:
+    """State of the map side of an all-to-all exchange."""
+
+    def __init__(self, partition_fn, num_partitions, batch_size):
+        self.partition_fn = partition_fn
+        self.num_partitions = num_partitions
+        self.batch_size = batch_size
+        self.num_rounds = 0
+        self.exhausted = False
+        # Map from round index to the bucket refs of each partition, None
+        # once the partition fetched its bucket.
+        self.rounds = {}
+        # The next round of each partition, None once its consumer is gone.
+        self.next_rounds = [0] * num_partitions
+
+    def min_next_round(self):
+        next_rounds = [r for r in self.next_rounds if r is not None]
+        return min(next_rounds) if next_rounds else self.num_rounds
+
+    def add_round(self, batch):
+        buckets = [[] for _ in range(self.num_partitions)]
+        for item in batch:
+            buckets[self.partition_fn(item)].append(item)
+        self.rounds[self.num_rounds] = [
+            ray.put(bucket) if bucket else None for bucket in buckets
+        ]
+        self.num_rounds += 1
+
+    def fetch(self, partition_index, round_index):
+        bucket_ref = self.rounds[round_index][partition_index]
+        self.rounds[round_index][partition_index] = None
+        self.next_rounds[partition_index] = round_index + 1
+        self._free_rounds()
+        return bucket_ref
+
+    def release(self, partition_index):
+        self.next_rounds[partition_index] = None
+        for bucket_refs in self.rounds.values():
+            bucket_refs[partition_index] = None
+        self._free_rounds()
+
+    def _free_rounds(self):
+        # Forget the rounds that all the partitions fetched.
+        min_next_round = self.min_next_round()
+        for round_index in [r for r in self.rounds if r < min_next_round]:
+            del self.rounds[round_index]
+
+
+def _stable_hash(key):
+    """Hash of a key that is the same in all processes, unlike hash()."""
+    if isinstance(key, int):
+        return key
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    elif not isinstance(key, bytes):
+        key = pickle.dumps(key, protocol=4)
+    return zlib.crc32(key)
+
+
+def _key_partition_fn(key_fn, num_partitions):
+    return lambda item: _stable_hash(key_fn(item)) % num_partitions
+
+
+def _random_partition_fn(num_partitions, seed):
+    rng = random.Random(seed)
+    return lambda item: rng.randrange(num_partitions)
+
 
 def _randomized_int_cast(float_value):
     base = int(float_value)
@@ -3,6 +3,18 @@ from typing import List
 
 from ray.util.timer import _Timer
 
+# Counter of the seconds gather_async() waited for the shards to produce
+# items, i.e. the consumer was faster than the producers.
+CONSUMER_STALL_TIME_S = "gather_async_consumer_stall_time_s"
+# Counter of the seconds shards were left without a request because
+# gather_async() had max_inflight_bytes in flight, i.e. the producers were
+# faster than the consumer.
+PRODUCER_STALL_TIME_S = "gather_async_producer_stall_time_s"
+# Info of the estimated bytes of the batches gather_async() has in flight.
+INFLIGHT_BYTES = "gather_async_inflight_bytes"
+# Info of the current number of requests in flight per shard.
+NUM_ASYNC = "gather_async_num_async"
+
 
 class MetricsContext:
     """Metrics context object for a local iterator.
@@ -1,7 +1,13 @@
 import asyncio
+import random
+import threading
+import time
 
 import ray
 
+# How long ShardedQueue.get blocks on one shard before checking the others.
+SHARDED_GET_POLL_INTERVAL_S = 0.1
+
 
 class Empty(Exception):
     pass
@@ -87,6 +93,51 @@ class Queue:
             else:
                 return ray.get(self.actor.get.remote(timeout))
 
+    def put_batch(self, items, block=True, timeout=None):
+        """Adds a list of items to the queue with a single actor call.
+
+        Raises:
+            Full if there isn't room for all the items and blocking is False.
+                No item is added in this case.
+            Full if blocking is True and the queue is still full after
+                timeout. The items added until then stay in the queue.
+            ValueError if timeout is negative.
+        """
+        if not block:
+            ray.get(self.actor.put_nowait_batch.remote(items))
+        else:
+            if timeout is not None and timeout < 0:
+                raise ValueError("'timeout' must be a non-negative number")
+            else:
+                ray.get(self.actor.put_batch.remote(items, timeout))
+
+    def get_batch(self, max_items, block=True, timeout=None):
+        """Gets up to max_items items from the queue with a single actor call.
+
+        Waits for the first item like get(), then takes the items that are
+        available without waiting.
+
+        Returns:
+            A list of between 1 and max_items items.
+
+        Raises:
+            Empty if the queue is empty and blocking is False.
+            Empty if the queue is empty, blocking is True, and it timed out.
+            ValueError if timeout is negative or max_items isn't positive.
+        """
+        if max_items < 1:
+            raise ValueError("'max_items' must be a positive number")
+        if not block:
+            items = ray.get(self.actor.get_nowait_batch.remote(max_items))
+            if not items:
+                raise Empty
+            return items
+        else:
+            if timeout is not None and timeout < 0:
+                raise ValueError("'timeout' must be a non-negative number")
+            else:
+                return ray.get(self.actor.get_batch.remote(max_items, timeout))
+
     def put_nowait(self, item):
         """Equivalent to put(item, block=False).
 
@@ -104,6 +155,272 @@ class Queue:
         return self.get(block=False)
 
 
+class ShardedQueue:
+    """Queue spread over several actors, for a higher throughput.
+
+    Each shard is a Queue. Items are put into the shards round robin and
+    batches are split over all the shards, so FIFO order is only kept
+    within a shard. Getting from an empty ShardedQueue polls the shards, so
+    it may return an item up to SHARDED_GET_POLL_INTERVAL_S after it was
+    put.
+
+    Args:
+        num_shards (int): number of actors the items are spread over.
+        maxsize (int): maximum size of each shard. If zero, size is
+            unbounded.
+    """
+
+    def __init__(self, num_shards, maxsize=0):
+        if num_shards < 1:
+            raise ValueError("'num_shards' must be a positive number")
+        self.shards = [Queue(maxsize) for _ in range(num_shards)]
+        self._reset_shard_cursors()
+
+    def __getstate__(self):
+        return self.shards
+
+    def __setstate__(self, shards):
+        self.shards = shards
+        self._reset_shard_cursors()
+
+    def _reset_shard_cursors(self):
+        # Start at a random shard, so that copies of the queue passed to
+        # different tasks don't all use the same shards.
+        self._next_put_shard = random.randrange(len(self.shards))
+        self._next_get_shard = random.randrange(len(self.shards))
+
+    def _split(self, num_items, first_shard):
+        """Number of items per shard, the remainder going to the shards
+        from first_shard on."""
+        counts = [num_items // len(self.shards)] * len(self.shards)
+        for i in range(num_items % len(self.shards)):
+            counts[(first_shard + i) % len(self.shards)] += 1
+        return counts
+
+    def __len__(self):
+        return self.size()
+
+    def size(self):
+        """The total size of the shards."""
+        return sum(
+            ray.get([shard.actor.qsize.remote() for shard in self.shards]))
+
+    def qsize(self):
+        """The total size of the shards."""
+        return self.size()
+
+    def empty(self):
+        """Whether all the shards are empty."""
+        return self.size() == 0
+
+    def put(self, item, block=True, timeout=None):
+        """Adds an item to the next shard, see Queue.put."""
+        shard = self.shards[self._next_put_shard]
+        self._next_put_shard = (self._next_put_shard + 1) % len(self.shards)
+        shard.put(item, block=block, timeout=timeout)
+
+    def put_batch(self, items, block=True, timeout=None):
+        """Adds a list of items, split over the shards in parallel.
+
+        Raises:
+            Full if a shard doesn't have room for its part of the items and
+                blocking is False. The other shards may have added theirs.
+            Full if blocking is True and a shard is still full after
+                timeout.
+            ValueError if timeout is negative.
+        """
+        if block and timeout is not None and timeout < 0:
+            raise ValueError("'timeout' must be a non-negative number")
+        counts = self._split(len(items), self._next_put_shard)
+        self._next_put_shard = (
+            (self._next_put_shard + len(items)) % len(self.shards))
+        refs = []
+        start = 0
+        for shard, count in zip(self.shards, counts):
+            if count == 0:
+                continue
+            batch = items[start:start + count]
+            start += count
+            if block:
+                refs.append(shard.actor.put_batch.remote(batch, timeout))
+            else:
+                refs.append(shard.actor.put_nowait_batch.remote(batch))
+        ray.get(refs)
+
+    def get(self, block=True, timeout=None):
+        """Gets an item from any shard, see Queue.get."""
+        return self.get_batch(1, block=block, timeout=timeout)[0]
+
+    def get_batch(self, max_items, block=True, timeout=None):
+        """Gets up to max_items items from the shards.
+
+        The available items are taken from the shards in parallel, and
+        from the other shards in turn if those are empty. If there are none
+        and blocking is True, waits for an item from the shards in turn.
+
+        Returns:
+            A list of between 1 and max_items items.
+
+        Raises:
+            Empty if the shards are empty and blocking is False.
+            Empty if the shards are empty, blocking is True, and it timed
+                out.
+            ValueError if timeout is negative or max_items isn't positive.
+        """
+        if max_items < 1:
+            raise ValueError("'max_items' must be a positive number")
+        if block and timeout is not None and timeout < 0:
+            raise ValueError("'timeout' must be a non-negative number")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            counts = self._split(max_items, self._next_get_shard)
+            self._next_get_shard = (
+                (self._next_get_shard + max_items) % len(self.shards))
+            items = []
+            for batch in ray.get([
+                    shard.actor.get_nowait_batch.remote(count)
+                    for shard, count in zip(self.shards, counts) if count > 0
+            ]):
+                items.extend(batch)
+            if items:
+                return items
+            # The other shards may have items, ask them in turn.
+            for shard, count in zip(self.shards, counts):
+                if count == 0:
+                    items = ray.get(
+                        shard.actor.get_nowait_batch.remote(max_items))
+                    if items:
+                        return items
+            if not block:
+                raise Empty
+
+            wait_s = SHARDED_GET_POLL_INTERVAL_S
+            if deadline is not None:
+                wait_s = min(wait_s, deadline - time.monotonic())
+                if wait_s <= 0:
+                    raise Empty
+            shard = self.shards[self._next_get_shard]
+            self._next_get_shard = (self._next_get_shard + 1) % len(
+                self.shards)
+            try:
+                return shard.get_batch(max_items, timeout=wait_s)
+            except Empty:
+                pass
+
+    def put_nowait(self, item):
+        """Equivalent to put(item, block=False)."""
+        return self.put(item, block=False)
+
+    def get_nowait(self):
+        """Equivalent to get(block=False)."""
+        return self.get(block=False)
+
+
+class CoalescingWriter:
+    """Puts items into a queue in batches.
+
+    Items put into the writer are buffered, and sent with a single
+    put_batch once max_batch_size items are buffered or flush_interval_s
+    after the first one was buffered. This trades a little latency for a
+    much higher throughput than one actor call per item. Items are added to
+    the queue in the order they were put.
+
+    Errors from flushes in the background are raised by the next call to
+    put or flush. The items of the failed batch are lost.
+
+    Args:
+        queue (Queue|ShardedQueue): the queue to put the items into.
+        max_batch_size (int): number of buffered items that triggers a
+            flush.
+        flush_interval_s (float): maximum time an item is buffered for.
+    """
+
+    def __init__(self, queue, max_batch_size=100, flush_interval_s=0.01):
+        if max_batch_size < 1:
+            raise ValueError("'max_batch_size' must be a positive number")
+        self.queue = queue
+        self.max_batch_size = max_batch_size
+        self.flush_interval_s = flush_interval_s
+        self._buffer = []
+        self._closed = False
+        self._error = None
+        # Protects the buffer.
+        self._lock = threading.Lock()
+        # Notified when the buffer gets an item or the writer is closed.
+        self._buffer_not_empty = threading.Condition(self._lock)
+        # Serializes the batches sent, so that they are added in order.
+        self._flush_lock = threading.Lock()
+        self._flush_thread = threading.Thread(
+            target=self._flush_periodically, daemon=True)
+        self._flush_thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _raise_background_error(self):
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def put(self, item):
+        """Buffers an item to add to the queue.
+
+        Blocks while the buffer is flushed if the queue is full.
+        """
+        self._raise_background_error()
+        with self._lock:
+            if self._closed:
+                raise ValueError("Cannot put into a closed writer.")
+            self._buffer.append(item)
+            if len(self._buffer) == 1:
+                self._buffer_not_empty.notify()
+            should_flush = len(self._buffer) >= self.max_batch_size
+        if should_flush:
+            self._flush()
+
+    def flush(self):
+        """Adds the buffered items to the queue."""
+        self._raise_background_error()
+        self._flush()
+
+    def _flush(self):
+        with self._flush_lock:
+            with self._lock:
+                items, self._buffer = self._buffer, []
+            if items:
+                self.queue.put_batch(items)
+
+    def close(self):
+        """Flushes the buffered items and stops the background flushes."""
+        with self._lock:
+            self._closed = True
+            self._buffer_not_empty.notify()
+        self._flush_thread.join()
+        self.flush()
+
+    def _flush_periodically(self):
+        while True:
+            with self._lock:
+                while not self._buffer and not self._closed:
+                    self._buffer_not_empty.wait()
+                # Wait for the flush interval, close() wakes the thread up.
+                deadline = time.monotonic() + self.flush_interval_s
+                while not self._closed:
+                    wait_s = deadline - time.monotonic()
+                    if wait_s <= 0:
+                        break
+                    self._buffer_not_empty.wait(wait_s)
+                if self._closed:
+                    return
+            try:
+                self._flush()
+            except Exception as e:
+                self._error = e
+
+
 @ray.remote
 class _QueueActor:
     def __init__(self, maxsize):
@@ -135,3 +452,33 @@ class _QueueActor:
 
     def get_nowait(self):
         return self.queue.get_nowait()
+
+    async def put_batch(self, items, timeout=None):
+        try:
+            await asyncio.wait_for(self._put_all(items), timeout)
+        except asyncio.TimeoutError:
+            raise Full
+
+    async def _put_all(self, items):
+        for item in items:
+            await self.queue.put(item)
+
+    async def get_batch(self, max_items, timeout=None):
+        try:
+            first_item = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            raise Empty
+        return [first_item] + self.get_nowait_batch(max_items - 1)
+
+    def put_nowait_batch(self, items):
+        if (self.queue.maxsize > 0
+                and len(items) + self.queue.qsize() > self.queue.maxsize):
+            raise Full(f"Cannot add {len(items)} items to a queue of size "
+                       f"{self.queue.qsize()} and maxsize "
+                       f"{self.queue.maxsize}.")
+        for item in items:
+            self.queue.put_nowait(item)
+
+    def get_nowait_batch(self, max_items):
+        num_items = min(max_items, self.queue.qsize())
+        return [self.queue.get_nowait() for _ in range(num_items)]
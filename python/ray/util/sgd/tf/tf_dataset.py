@@ -4,6 +4,7 @@ from typing import Any, List, Optional
 import tensorflow as tf
 
 from ray.util.data import MLDataset
+from ray.util.data.arrow import column_values, num_rows
 
 
 class TFMLDataset:
@@ -107,12 +108,11 @@ class TFMLDataset:
 
         def make_generator():
             for df in iter(it):
-                num_rows = df.shape[0]
                 feature_columns = [
-                    df[col].values for col in self._feature_columns
+                    column_values(df, col) for col in self._feature_columns
                 ]
-                label_column = df[self._label_column].values
-                for i in range(num_rows):
+                label_column = column_values(df, self._label_column)
+                for i in range(num_rows(df)):
                     features = [f[i] for f in feature_columns]
                     if len(features) > 1:
                         yield tuple(features), label_column[i]
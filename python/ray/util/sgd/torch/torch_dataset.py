@@ -10,6 +10,7 @@ import pandas as pd
 from torch.utils.data import IterableDataset
 
 from ray.util.data import MLDataset
+from ray.util.data.arrow import column_values, num_rows
 
 
 def convert_to_tensor(df, feature_columns: List[Any],
@@ -19,7 +20,7 @@ def convert_to_tensor(df, feature_columns: List[Any],
     feature_tensor = []
     for col, shape, dtype in zip(feature_columns, feature_shapes,
                                  feature_types):
-        column = df[col].values
+        column = column_values(df, col)
         if column.dtype == np.object:
             if isinstance(column[0], np.ndarray):
                 column = np.stack(column)
@@ -38,7 +39,7 @@ def convert_to_tensor(df, feature_columns: List[Any],
             t = t.view(-1, 1)
         feature_tensor.append(t)
 
-    label_df = df[label_column].values
+    label_df = column_values(df, label_column)
     label_tensor = torch.as_tensor(label_df, dtype=label_type)
     if label_shape:
         label_tensor = label_tensor.view(-1, label_shape)
@@ -164,9 +165,8 @@ class TorchIterableDataset(IterableDataset):
 
     def __iter__(self):
         for df in iter(self._it):
-            num_rows = df.shape[0]
             feature_tensor, label_tensor = self._convert_fn(df)
-            for i in range(num_rows):
+            for i in range(num_rows(df)):
                 features = [tensor[i] for tensor in feature_tensor]
                 label = label_tensor[i]
                 yield (*features, label)
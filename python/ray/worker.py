@@ -264,6 +264,33 @@ class Worker:
                 serialized_value, object_ref=object_ref,
                 pin_object=pin_object))
 
+    def put_objects(self, values, pin_object=True):
+        """Put many values in the local object store.
+
+        This is equivalent to calling put_object for each value, but the
+        serialized values are put with a single call to the core worker.
+
+        Args:
+            values (list): The values to put in the object store.
+            pin_object: If set, the objects will be pinned at the raylet.
+
+        Returns:
+            List[ObjectRef]: The object refs of the values, in order.
+        """
+        context = self.get_serialization_context()
+        serialized_values = []
+        for value in values:
+            if isinstance(value, ObjectRef):
+                raise TypeError(
+                    "Calling 'put_many' on an ray.ObjectRef is not allowed. "
+                    "If you really want to do this, you can wrap the "
+                    "ray.ObjectRef in a list and call 'put_many' on it.")
+            serialized_values.append(context.serialize(value))
+        # See put_object, the core worker constructs each python ObjectRef
+        # right after its object is put.
+        return self.core_worker.put_serialized_objects(
+            serialized_values, pin_object=pin_object)
+
     def deserialize_objects(self, data_metadata_pairs, object_refs):
         context = self.get_serialization_context()
         return context.deserialize_objects(data_metadata_pairs, object_refs)
@@ -470,6 +497,7 @@ def init(
         _redis_password=ray_constants.REDIS_DEFAULT_PASSWORD,
         _java_worker_options=None,
         _code_search_path=None,
+        _worker_preload_modules=None,
         _temp_dir=None,
         _load_code_from_local=False,
         _lru_evict=False,
@@ -563,6 +591,8 @@ def init(
             module or from the GCS.
         _java_worker_options: Overwrite the options to start Java workers.
         _code_search_path (list): Java classpath or python import path.
+        _worker_preload_modules (list): Modules imported by the Python
+            workers before they run any task, e.g. ["numpy", "torch"].
         _lru_evict (bool): If True, when an object store is full, it will evict
             objects in LRU order to make more space and when under memory
             pressure, ray.ObjectLostError may be thrown. If False, then
@@ -684,6 +714,7 @@ def init(
             load_code_from_local=_load_code_from_local,
             java_worker_options=_java_worker_options,
             code_search_path=_code_search_path,
+            worker_preload_modules=_worker_preload_modules,
             start_initial_python_workers_for_first_job=True,
             _system_config=_system_config,
             lru_evict=_lru_evict,
@@ -1385,6 +1416,32 @@ def put(value):
         return object_ref
 
 
+def put_many(values):
+    """Store many objects in the object store.
+
+    This is equivalent to ``[ray.put(value) for value in values]``, but
+    much faster for small values as they are put in a single batch.
+
+    Args:
+        values (list): The Python objects to be stored.
+
+    Returns:
+        The list of the object refs assigned to the values.
+    """
+    worker = global_worker
+    worker.check_connected()
+    if not isinstance(values, list):
+        raise TypeError("'values' must be a list.")
+    with profiling.profile("ray.put_many"):
+        try:
+            return worker.put_objects(values, pin_object=True)
+        except ObjectStoreFullError:
+            logger.info(
+                "Put failed since the values were either too large or the "
+                "store was full of pinned objects.")
+            raise
+
+
 # Global variable to make sure we only send out the warning once.
 blocking_wait_inside_async_warned = False
 
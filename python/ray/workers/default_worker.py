@@ -1,6 +1,8 @@
 import argparse
 import base64
+import importlib
 import json
+import logging
 import time
 import sys
 import os
@@ -110,6 +112,29 @@ parser.add_argument(
     help="A list of directories or jar files separated by colon that specify "
     "the search path for user code. This will be used as `CLASSPATH` in "
     "Java and `PYTHONPATH` in Python.")
+parser.add_argument(
+    "--preload-modules",
+    default=None,
+    type=str,
+    help="A comma-separated list of modules to import before registering "
+    "with the raylet, so that the first tasks using them start fast.")
+
+logger = logging.getLogger(__name__)
+
+
+def preload_modules(module_names):
+    """Import the given modules, logging the ones that fail to import."""
+    for module_name in module_names:
+        start = time.time()
+        try:
+            importlib.import_module(module_name)
+        except Exception:
+            logger.exception(f"Failed to preload module {module_name}.")
+            continue
+        logger.debug(f"Preloaded module {module_name} in "
+                     f"{time.time() - start:.3f}s.")
+
+
 if __name__ == "__main__":
     # NOTE(sang): For some reason, if we move the code below
     # to a separate function, tensorflow will capture that method
@@ -151,6 +176,12 @@ if __name__ == "__main__":
                 p = os.path.dirname(p)
             sys.path.append(p)
 
+    # The raylet only assigns tasks to the worker once it registered, so
+    # the modules are imported while the worker is starting, e.g. when it's
+    # prestarted, rather than when running its first task.
+    if mode == ray.WORKER_MODE and args.preload_modules:
+        preload_modules(args.preload_modules.split(","))
+
     ray_params = RayParams(
         node_ip_address=args.node_ip_address,
         raylet_ip_address=raylet_ip_address,
@@ -243,19 +243,8 @@ void LocalObjectManager::AddSpilledUrls(
           *num_bytes_spilled += it->second->GetSize();
           objects_pending_spill_.erase(it);
 
-          // Update the object_id -> url_ref_count to use it for deletion later.
-          // We need to track the references here because a single file can contain
-          // multiple objects, and we shouldn't delete the file until
-          // all the objects are gone out of scope.
-          // object_url is equivalent to url_with_offset.
-          auto parsed_url = ParseURL(object_url);
-          const auto base_url_it = parsed_url->find("url");
-          RAY_CHECK(base_url_it != parsed_url->end());
-          if (!url_ref_count_.contains(base_url_it->second)) {
-            url_ref_count_[base_url_it->second] = 1;
-          } else {
-            url_ref_count_[base_url_it->second] += 1;
-          }
+          // Remember the url to delete the object from the external storage
+          // once it goes out of scope.
           spilled_objects_url_.emplace(object_id, object_url);
 
           (*num_remaining)--;
@@ -314,24 +303,10 @@ void LocalObjectManager::ProcessSpilledObjectsDeleteQueue(uint32_t max_batch_siz
     // Object id is either spilled or not spilled at this point.
     const auto spilled_objects_url_it = spilled_objects_url_.find(object_id);
     if (spilled_objects_url_it != spilled_objects_url_.end()) {
-      // If the object was spilled, see if we can delete it. We should first check the ref
-      // count.
-      std::string &object_url = spilled_objects_url_it->second;
-      // Note that here, we need to parse the object url to obtain the base_url.
-      auto parsed_url = ParseURL(object_url);
-      const auto base_url_it = parsed_url->find("url");
-      RAY_CHECK(base_url_it != parsed_url->end());
-      const auto &url_ref_count_it = url_ref_count_.find(base_url_it->second);
-      RAY_CHECK(url_ref_count_it != url_ref_count_.end())
-          << "url_ref_count_ should exist when spilled_objects_url_ exists. Please "
-             "submit a Github issue if you see this error.";
-      url_ref_count_it->second -= 1;
-
-      // If there's no more refs, delete the object.
-      if (url_ref_count_it->second == 0) {
-        url_ref_count_.erase(url_ref_count_it);
-        object_urls_to_delete.emplace_back(object_url);
-      }
+      // If the object was spilled, delete it. A single file can contain
+      // multiple objects, so the url is sent for every object, and the
+      // external storage reclaims the file once all its objects are deleted.
+      object_urls_to_delete.emplace_back(spilled_objects_url_it->second);
       spilled_objects_url_.erase(spilled_objects_url_it);
     }
     spilled_object_pending_delete_.pop();
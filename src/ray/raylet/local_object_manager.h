@@ -203,11 +203,6 @@ class LocalObjectManager {
   /// Mapping from object id to url_with_offsets. We cannot reuse pinned_objects_ because
   /// pinned_objects_ entries are deleted when spilling happens.
   absl::flat_hash_map<ObjectID, std::string> spilled_objects_url_ GUARDED_BY(mutex_);
-
-  /// Base URL -> ref_count. It is used because there could be multiple objects
-  /// within a single spilled file. We need to ref count to avoid deleting the file
-  /// before all objects within that file are out of scope.
-  absl::flat_hash_map<std::string, uint64_t> url_ref_count_ GUARDED_BY(mutex_);
 };
 
 };  // namespace raylet
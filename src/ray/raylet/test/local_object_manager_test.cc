@@ -570,9 +570,10 @@ TEST_F(LocalObjectManagerTest, TestDeleteSpilledObjects) {
   ASSERT_EQ(deleted_urls_size, object_ids_to_spill.size());
 }
 
-TEST_F(LocalObjectManagerTest, TestDeleteURLRefCount) {
-  // Make sure an url is deleted only when every object stored in that url is deleted
-  // (when ref_count == 0).
+TEST_F(LocalObjectManagerTest, TestDeleteFusedObjects) {
+  // Make sure the url of every object stored in a fused file is sent for deletion
+  // as soon as the object is out of scope. The external storage reclaims the file
+  // once every object stored in it is deleted.
   rpc::Address owner_address;
   owner_address.set_worker_id(WorkerID::FromRandom().Binary());
   std::vector<ObjectID> object_ids;
@@ -611,20 +612,19 @@ TEST_F(LocalObjectManagerTest, TestDeleteURLRefCount) {
     ASSERT_TRUE(object_table.ReplyAsyncAddSpilledUrl());
   }
 
-  // Everything is evicted except the last object. In this case, ref count is still > 0.
+  // Everything is evicted except the last object.
   for (size_t i = 0; i < free_objects_batch_size - 1; i++) {
     ASSERT_TRUE(owner_client->ReplyObjectEviction());
   }
   manager.ProcessSpilledObjectsDeleteQueue(/* max_batch_size */ 30);
   int deleted_urls_size = worker_pool.io_worker_client->ReplyDeleteSpilledObjects();
-  // Nothing is deleted yet because the ref count is > 0.
-  ASSERT_EQ(deleted_urls_size, 0);
+  // The evicted objects are deleted although the file still has a live object.
+  ASSERT_EQ(deleted_urls_size, free_objects_batch_size - 1);
 
-  // The last reference is deleted.
+  // The last object is evicted.
   ASSERT_TRUE(owner_client->ReplyObjectEviction());
   manager.ProcessSpilledObjectsDeleteQueue(/* max_batch_size */ 30);
   deleted_urls_size = worker_pool.io_worker_client->ReplyDeleteSpilledObjects();
-  // Now the object is deleted.
   ASSERT_EQ(deleted_urls_size, 1);
 }
 